@@ -0,0 +1,345 @@
+# 로컬 기사 저장소
+# 뉴스 API에서 가져온 기사를 정규화(태그 제거, 발행 시각 변환, 대표 URL)해 SQLite 파일에 한 번만 저장하고,
+# 검색어(피드)마다 어떤 기사가 검색되었는지와 어디까지 가져왔는지 기록합니다.
+# 같은 주에 다시 생성하거나 여러 이슈가 같은 검색어를 쓰면 저장소의 기사를 함께 사용하고,
+# 새 기사만 API에서 가져오면 됩니다. (news_feed 참고)
+# 제목과 요약은 FTS5 전문 검색 색인(가능하면 한국어 부분 문자열도 찾는 trigram 토크나이저)에 넣습니다.
+# 이슈에 실은 기사의 MinHash 서명도 기록해 다음 이슈에서 같은 기사를 거를 수 있게 합니다. (near_duplicates 참고)
+import hashlib
+import html
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from response_cache import CACHE_DIR
+
+# 기사 저장소 파일 위치
+ARTICLE_DB_PATH = os.path.join(CACHE_DIR, "articles.sqlite3")
+
+# 저장소에 남겨 둘 기사 기간 (초) - 이보다 오래된 기사는 새 기사를 저장할 때 지움
+ARTICLE_RETENTION = 60 * 60 * 24 * 30
+
+# 스키마 버전 (다르면 저장소를 새로 만들고 다시 가져옴)
+SCHEMA_VERSION = 3
+
+# 대표 URL에서 지우는 추적용 쿼리 파라미터
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def clean_text(text):
+    """<b> 같은 HTML 태그와 엔티티(&quot; 등)를 없애고 공백을 정리합니다."""
+    if not text:
+        return ""
+    return " ".join(html.unescape(HTML_TAG_PATTERN.sub("", text)).split())
+
+
+def canonical_url(url):
+    """호스트를 소문자로 바꾸고 프래그먼트와 추적용 파라미터를 없앤 대표 URL을 반환합니다."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith(TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+
+def url_hash(url):
+    """대표 URL의 해시(16진수 16자리)를 반환합니다."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_naver_date(value):
+    """네이버 pubDate(RFC 822)를 유닉스 시각으로 변환합니다. 읽을 수 없으면 None입니다."""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_iso_date(value):
+    """NewsAPI publishedAt(ISO 8601)을 유닉스 시각으로 변환합니다. 읽을 수 없으면 None입니다."""
+    try:
+        published = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.timestamp()
+
+
+def normalize_article(source, item):
+    """API 응답 항목을 저장소 형식 {url, url_hash, title, description, published_at}으로 정규화합니다.
+    네이버는 언론사 원문 링크(originallink)를, 없으면 네이버 링크(link)를 대표 URL로 사용합니다."""
+    if source == "news_api":
+        url = item.get("url")
+        published_at = parse_iso_date(item.get("publishedAt"))
+    else:
+        url = item.get("originallink") or item.get("link")
+        published_at = parse_naver_date(item.get("pubDate"))
+    url = canonical_url(url)
+    return {
+        "url": url,
+        "url_hash": url_hash(url),
+        "title": clean_text(item.get("title")),
+        "description": clean_text(item.get("description")),
+        "published_at": published_at,
+    }
+
+
+class ArticleStore:
+    """정규화한 기사와 피드(소스, 검색어, 언어)별 검색 결과, 가져오기 상태를 SQLite 파일에 저장하는 저장소"""
+
+    def __init__(self, path=ARTICLE_DB_PATH, retention=ARTICLE_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != ":memory:":
+            # 여러 프로세스가 같은 파일을 읽고 쓸 수 있도록 WAL 모드 사용
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            for table in ("articles_fts", "article_queries", "articles", "feeds", "issue_articles"):
+                self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                url_hash TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                published_at REAL,
+                fetched_at REAL NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_source_url ON articles (source, url_hash);
+            CREATE INDEX IF NOT EXISTS idx_articles_url_hash ON articles (url_hash);
+            CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at);
+
+            CREATE TABLE IF NOT EXISTS article_queries (
+                source TEXT NOT NULL,
+                query TEXT NOT NULL,
+                language TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                PRIMARY KEY (source, query, language, article_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_article_queries_article ON article_queries (article_id);
+
+            CREATE TABLE IF NOT EXISTS feeds (
+                source TEXT NOT NULL,
+                query TEXT NOT NULL,
+                language TEXT NOT NULL,
+                newest_published REAL,
+                covered_since REAL,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (source, query, language)
+            );
+
+            CREATE TABLE IF NOT EXISTS issue_articles (
+                series TEXT NOT NULL,
+                issue INTEGER NOT NULL,
+                url_hash TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                used_at REAL NOT NULL,
+                PRIMARY KEY (series, issue, url_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_issue_articles_used ON issue_articles (used_at);
+        """)
+        self.fts_enabled = self._create_fts()
+        self._conn.commit()
+
+    def _create_fts(self):
+        """제목과 요약의 전문 검색 색인을 만듭니다. 이 SQLite에서 FTS5를 쓸 수 없으면 False를 반환합니다."""
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+                    f"title, description, content='articles', content_rowid='id', tokenize='{tokenizer}')"
+                )
+                break
+            except sqlite3.OperationalError:
+                continue
+        else:
+            return False
+        self._conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO articles_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+            END;
+        """)
+        return True
+
+    def get_feed(self, source, query, language=""):
+        """피드의 가져오기 상태를 반환합니다. 한 번도 가져오지 않았으면 None입니다.
+        newest_published는 저장된 가장 최근 기사의 발행 시각, covered_since는 가져온 기간의 시작 시각,
+        checked_at은 마지막으로 API를 확인한 시각입니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_published, covered_since, etag, last_modified, checked_at FROM feeds "
+                "WHERE source = ? AND query = ? AND language = ?", (source, query, language)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("newest_published", "covered_since", "etag", "last_modified", "checked_at"), row))
+
+    def known_hashes(self, source, query, language="", since=None):
+        """피드에서 검색된 기사의 대표 URL 해시 집합을 반환합니다. since가 있으면 그 이후에 발행된 기사만 포함합니다."""
+        sql = ("SELECT a.url_hash FROM article_queries q JOIN articles a ON a.id = q.article_id "
+               "WHERE q.source = ? AND q.query = ? AND q.language = ?")
+        params = [source, query, language]
+        if since is not None:
+            sql += " AND (a.published_at IS NULL OR a.published_at >= ?)"
+            params.append(since)
+        with self._lock:
+            return {row[0] for row in self._conn.execute(sql, params)}
+
+    def save_fetch(self, source, query, language, items, covered_since, etag=None, last_modified=None):
+        """새로 가져온 API 응답 항목을 정규화해 저장하고 피드 상태를 갱신합니다.
+        같은 소스의 같은 대표 URL은 한 번만 저장하며(새 내용으로 갱신), 보존 기간이 지난 기사는 지웁니다."""
+        now = time.time()
+        with self._lock:
+            for item in items:
+                article = normalize_article(source, item)
+                if not article["url"]:
+                    continue
+                self._conn.execute(
+                    "INSERT INTO articles (source, url, url_hash, title, description, published_at, fetched_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (source, url_hash) DO UPDATE SET title = excluded.title, "
+                    "description = excluded.description, published_at = excluded.published_at, "
+                    "fetched_at = excluded.fetched_at, data = excluded.data",
+                    (source, article["url"], article["url_hash"], article["title"], article["description"],
+                     article["published_at"], now, json.dumps(item, ensure_ascii=False))
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO article_queries (source, query, language, article_id) "
+                    "SELECT ?, ?, ?, id FROM articles WHERE source = ? AND url_hash = ?",
+                    (source, query, language, source, article["url_hash"])
+                )
+            newest = self._conn.execute(
+                "SELECT MAX(a.published_at) FROM article_queries q JOIN articles a ON a.id = q.article_id "
+                "WHERE q.source = ? AND q.query = ? AND q.language = ?",
+                (source, query, language)
+            ).fetchone()[0]
+            previous = self._conn.execute(
+                "SELECT covered_since FROM feeds WHERE source = ? AND query = ? AND language = ?",
+                (source, query, language)
+            ).fetchone()
+            if previous is not None and previous[0] is not None:
+                covered_since = min(covered_since, previous[0])
+            covered_since = max(covered_since, now - self.retention)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feeds "
+                "(source, query, language, newest_published, covered_since, etag, last_modified, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (source, query, language, newest, covered_since, etag, last_modified, now)
+            )
+            if self._conn.execute("DELETE FROM articles WHERE published_at < ?", (now - self.retention,)).rowcount:
+                self._conn.execute("DELETE FROM article_queries WHERE article_id NOT IN (SELECT id FROM articles)")
+            self._conn.commit()
+
+    def recent(self, source, query, language="", since=None, limit=None):
+        """피드에서 검색된 기사(API 응답 항목)를 최신순으로 반환합니다.
+        since가 있으면 그 이후에 발행된 기사만(발행 시각을 모르는 기사 포함), limit이 있으면 그 개수까지만 반환합니다."""
+        sql = ("SELECT a.data FROM article_queries q JOIN articles a ON a.id = q.article_id "
+               "WHERE q.source = ? AND q.query = ? AND q.language = ?")
+        params = [source, query, language]
+        if since is not None:
+            sql += " AND (a.published_at IS NULL OR a.published_at >= ?)"
+            params.append(since)
+        sql += " ORDER BY a.published_at IS NULL, a.published_at DESC, a.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def search(self, text, since=None, sources=None, limit=20):
+        """제목이나 요약에 text가 들어 있는 기사를 최신순으로 반환합니다. (모든 피드 대상)
+        각 항목은 정규화한 필드(source, url, title, description, published_at)와 원래 응답 항목(item)입니다."""
+        if self.fts_enabled and len(text) >= 3:
+            # 따옴표로 묶어 FTS 연산자 없이 구절로 검색
+            match_sql = "a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)"
+            params = ['"' + text.replace('"', '""') + '"']
+        else:
+            # 전문 검색 색인이 없거나 trigram으로 찾을 수 없는 짧은 검색어는 LIKE로 찾음
+            match_sql = "(a.title LIKE ? ESCAPE '\\' OR a.description LIKE ? ESCAPE '\\')"
+            pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params = [pattern, pattern]
+        sql = f"SELECT a.source, a.url, a.title, a.description, a.published_at, a.data FROM articles a WHERE {match_sql}"
+        if since is not None:
+            sql += " AND (a.published_at IS NULL OR a.published_at >= ?)"
+            params.append(since)
+        if sources:
+            sql += f" AND a.source IN ({', '.join('?' * len(sources))})"
+            params.extend(sources)
+        sql += " ORDER BY a.published_at IS NULL, a.published_at DESC, a.id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"source": source, "url": url, "title": title, "description": description,
+             "published_at": published_at, "item": json.loads(data)}
+            for source, url, title, description, published_at, data in rows
+        ]
+
+    def record_issue_articles(self, series, issue, articles):
+        """뉴스레터(series)의 이슈에 실은 기사 목록 [(대표 URL 해시, 서명 bytes)]을 기록합니다.
+        같은 뉴스레터의 같은 호수를 다시 생성하면 이전 기록을 바꾸며, 보존 기간이 지난 기록은 지웁니다."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM issue_articles WHERE (series = ? AND issue = ?) OR used_at < ?",
+                (series, issue, now - self.retention)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO issue_articles (series, issue, url_hash, signature, used_at) VALUES (?, ?, ?, ?, ?)",
+                [(series, issue, hash_, signature, now) for hash_, signature in articles]
+            )
+            self._conn.commit()
+
+    def issue_articles(self, series, since, before_issue=None):
+        """뉴스레터(series)에서 since 이후에 생성한 이슈에 실은 기사의 (대표 URL 해시, 서명 bytes) 목록을 반환합니다.
+        before_issue가 있으면 그보다 앞선 호수만 포함합니다."""
+        sql = "SELECT url_hash, signature FROM issue_articles WHERE series = ? AND used_at >= ?"
+        params = [series, since]
+        if before_issue is not None:
+            sql += " AND issue < ?"
+            params.append(before_issue)
+        with self._lock:
+            return self._conn.execute(sql + " ORDER BY used_at", params).fetchall()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_article_store():
+    """프로세스 전역에서 공유하는 ArticleStore 인스턴스를 반환합니다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArticleStore()
+    return _store
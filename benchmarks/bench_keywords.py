@@ -0,0 +1,179 @@
+# evaluate_educational_value 벤치마크
+# 호출마다 키워드를 소문자로 바꾸고 정규식으로 감점 패턴을 찾던 기존 구현(legacy)과
+# 미리 만들어 둔 KeywordMatcher 구현의 점수가 완전히 같은지 무작위 검색 결과로 확인하고,
+# 항목당 평가 시간을 비교합니다.
+#
+#   python benchmarks/bench_keywords.py [--items 5000] [--seed 0]
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.logger import set_log_level
+
+set_log_level("error")
+
+from streamlit_app_v2 import (
+    EDUCATION_KEYWORDS,
+    NEGATIVE_KEYWORDS,
+    TOPIC_KEYWORDS,
+    WEEKLY_CURRICULUM,
+    evaluate_educational_value,
+    remove_html_tags,
+)
+
+
+# 기존 구현 (비교 기준)
+def legacy_evaluate_educational_value(item, topic=None):
+    """검색 결과의 교육적 가치를 평가하는 함수 - 완화된 버전"""
+    score = 10  # 기본 점수를 더 높게 시작 (원래 0에서 시작)
+    title = item.get("title", "").lower()
+    description = item.get("description", "").lower()
+    source_type = item.get("source_type", "")
+
+    # HTML 태그 제거
+    title = remove_html_tags(title)
+    description = remove_html_tags(description)
+
+    # 전체 텍스트
+    full_text = f"{title} {description}".lower()
+
+    # 1. 교육 관련 키워드 점수 (점수 증가)
+    for keyword in EDUCATION_KEYWORDS["high"]:
+        if keyword.lower() in full_text:
+            score += 6  # 8 -> 6으로 감소 (이미 기본 점수가 높아짐)
+        elif keyword.lower() in title:
+            score += 8  # 10 -> 8로 감소
+
+    for keyword in EDUCATION_KEYWORDS["medium"]:
+        if keyword.lower() in full_text:
+            score += 4  # 5 -> 4로 감소
+
+    for keyword in EDUCATION_KEYWORDS["low"]:
+        if keyword.lower() in full_text:
+            score += 2  # 3 -> 2로 감소
+
+    # 2. 주제별 키워드 점수 (점수 유지)
+    if topic:
+        topic_lower = topic.lower()
+        # 주제와 정확히 일치하면 점수 추가
+        if topic_lower in full_text:
+            score += 8  # 10 -> 8로 감소
+
+        # 주제 관련 키워드 확인
+        for key, keywords in TOPIC_KEYWORDS.items():
+            if key.lower() in topic_lower or topic_lower in key.lower():
+                for keyword in keywords:
+                    if keyword.lower() in full_text:
+                        score += 5  # 7 -> 5로 감소
+
+    # 3. 스트림릿 언급 점수 (필수 항목이므로 점수 유지)
+    for keyword in ["streamlit", "스트림릿"]:
+        if keyword in title.lower():
+            score += 10  # 12 -> 10으로 감소
+        elif keyword in description.lower():
+            score += 5  # 6 -> 5로 감소
+
+    # 4. 소스 유형별 가중치 (약간 완화)
+    if source_type == "youtube":
+        score *= 1.1  # 1.2 -> 1.1로 감소
+    elif source_type == "naver_blog":
+        score *= 1.0  # 변경 없음
+    elif source_type == "naver_web":
+        score *= 1.05  # 1.1 -> 1.05로 감소
+
+    # 5. 부정적 요소 감점 (감점 완화)
+    negative_patterns = [
+        r"\?", "궁금", "문제", "에러", "오류", "해결", "질문", "안되", "않아",
+        "실패", "이슈", "버그", "도와", "조언", "help", "error", "issue", "bug", "problem"
+    ]
+
+    for pattern in negative_patterns:
+        if re.search(pattern, title):
+            score -= 2  # 5 -> 2로 감소
+
+    # 6. 설명 길이 평가 (감점 완화)
+    if len(description) < 30:
+        score -= 2  # 5 -> 2로 감소
+    elif len(description) > 200:
+        score += 3  # 변경 없음
+
+    return score
+
+
+# 검색 결과 문장을 만들 때 쓰는 단어 - 모든 키워드와 일반 단어, 대소문자/HTML 변형 포함
+FILLER_WORDS = [
+    "data", "app", "python", "파이썬", "만들기", "the", "and", "with", "사용", "웹", "앱", "대시보드",
+    "분석", "프로젝트", "코드", "정리", "후기", "공부", "개발", "for", "your", "using", "in", "of", "to",
+    "Streamlit", "STREAMLIT", "<b>streamlit</b>", "스트림<b>릿</b>", "&amp;", "&quot;", "Tutorial!", "How To",
+]
+SOURCE_TYPES = ["youtube", "naver_blog", "naver_web", "naver_news", ""]
+
+
+def make_items(count, seed, keyword_ratio=0.15):
+    """무작위 검색 결과 항목과 평가 주제 목록을 만듭니다.
+    keyword_ratio는 문장 속 단어 중 평가 키워드의 비율입니다."""
+    rng = random.Random(seed)
+    keywords = [keyword for keywords in EDUCATION_KEYWORDS.values() for keyword in keywords]
+    keywords += [keyword for keywords in TOPIC_KEYWORDS.values() for keyword in keywords]
+    keywords += NEGATIVE_KEYWORDS
+
+    def choose_word():
+        return rng.choice(keywords) if rng.random() < keyword_ratio else rng.choice(FILLER_WORDS)
+
+    def sentence(low, high):
+        return " ".join(choose_word() for _ in range(rng.randint(low, high)))
+
+    items = [
+        {"title": sentence(2, 12), "description": sentence(0, 45), "source_type": rng.choice(SOURCE_TYPES)}
+        for _ in range(count)
+    ]
+    topics = [None] + list(TOPIC_KEYWORDS)
+    topics += [topic["name"] for week in WEEKLY_CURRICULUM.values() for topic in week["topics"]]
+    return items, topics
+
+
+def time_per_item(func, items, topic, repeat=3):
+    """items 전체를 평가하는 데 걸린 가장 빠른 시간을 항목당 마이크로초로 반환합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item, topic)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="evaluate_educational_value 벤치마크")
+    parser.add_argument("--items", type=int, default=5000, help="무작위 검색 결과 항목 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    items, topics = make_items(args.items, args.seed)
+    dense_items, _ = make_items(args.items, args.seed, keyword_ratio=1.0)
+
+    print("== 점수 일치 여부 ==")
+    for topic in topics:
+        for item in items + dense_items:
+            expected = legacy_evaluate_educational_value(item, topic)
+            actual = evaluate_educational_value(item, topic)
+            if expected != actual:
+                raise SystemExit(f"점수가 기존 구현과 다릅니다: {expected!r} != {actual!r} (주제={topic!r}, 항목={item!r})")
+    print(f"{len(items) * 2:,}개 항목 x {len(topics)}개 주제 모두 일치")
+
+    print("\n== 항목당 평가 시간 ==")
+    for label, batch in (("일반", items), ("키워드 밀집", dense_items)):
+        for topic in ("차트", "Installation", None):
+            legacy_time = time_per_item(legacy_evaluate_educational_value, batch, topic)
+            new_time = time_per_item(evaluate_educational_value, batch, topic)
+            print(f"{label:<8} 주제={topic!s:<14} legacy={legacy_time:6.1f}us  new={new_time:6.1f}us"
+                  f"  ({legacy_time / new_time:.1f}배)")
+
+
+if __name__ == "__main__":
+    main()
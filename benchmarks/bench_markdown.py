@@ -0,0 +1,282 @@
+# convert_markdown_to_html 벤치마크
+# 기존 정규식 구현(legacy)과 선형 스캐너 구현의 출력이 같은지 확인하고,
+# 일반 섹션 형식과 1MB 크기의 악성(역추적 유발) 입력에 대한 실행 시간을 비교합니다.
+#
+#   python benchmarks/bench_markdown.py [--size 1048576] [--legacy-budget 5]
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from markdown_renderer import convert_markdown_to_html
+
+
+# 기존 구현 (비교 기준)
+def legacy_convert_markdown_to_html(text):
+    """마크다운 텍스트를 HTML로 변환합니다."""
+    # AT/DT 팁 섹션 특별 처리
+    if "이번 주 팁:" in text or "핵심 프롬프트 예시" in text:
+        # "이번 주 팁:" 제목을 특별 클래스로 처리
+        text = re.sub(r'^## 이번 주 팁: (.*?)$', r'<div class="tip-title">이번 주 팁: \1</div>', text, flags=re.MULTILINE)
+        
+        # "핵심 프롬프트 예시:" 부분을 특별 클래스로 처리
+        text = re.sub(r'\*\*핵심 프롬프트 예시:\*\*', r'<div class="prompt-examples-title">핵심 프롬프트 예시:</div>', text)
+        
+        # 프롬프트 템플릿 처리 (Chain of Thought/Chain of Draft 등)
+        # 각 템플릿은 제목(색상 강조), 예시, 내용으로 구성됨
+        
+        # 첫 번째 템플릿 (Chain of Thought)
+        text = re.sub(
+            r'- (첫 번째 프롬프트 템플릿 \(Chain of Thought 활용\):)(.*?)(?=- 두 번째 프롬프트|$)',
+            r'<div class="prompt-template">'
+            r'<div class="template-title">\1</div>'
+            r'<div class="template-content">\2</div>'
+            r'</div>',
+            text, 
+            flags=re.DOTALL
+        )
+        
+        # 두 번째 템플릿 (Chain of Draft)
+        text = re.sub(
+            r'- (두 번째 프롬프트 템플릿 \(Chain of Draft 활용\):)(.*?)(?=- 세 번째 프롬프트|$)',
+            r'<div class="prompt-template">'
+            r'<div class="template-title">\1</div>'
+            r'<div class="template-content">\2</div>'
+            r'</div>',
+            text, 
+            flags=re.DOTALL
+        )
+        
+        # 세 번째 템플릿 (Chain of Thought와 Chain of Draft 결합)
+        text = re.sub(
+            r'- (세 번째 프롬프트 템플릿 \(Chain of Thought와 Chain of Draft 결합\):)(.*?)(?=이 팁을|$)',
+            r'<div class="prompt-template">'
+            r'<div class="template-title">\1</div>'
+            r'<div class="template-content">\2</div>'
+            r'</div>',
+            text, 
+            flags=re.DOTALL
+        )
+        
+        # 각 템플릿 내에서 예시와 프롬프트 순서 바꾸기
+        # 예시: 로 시작하는 부분을 <div class="example-label">예시:</div><div class="example-content">내용</div> 로 변환
+        text = re.sub(
+            r'<div class="template-content">(.*?)예시:(.*?)프롬프트:(.*?)</div>',
+            r'<div class="template-content"><div class="example-label">예시:</div><div class="example-content">\2</div><div class="prompt-label">프롬프트:</div><div class="prompt-content">\3</div></div>',
+            text,
+            flags=re.DOTALL
+        )
+        
+        # 마지막 문장 스타일 적용 (약간의 여백과 이탤릭체)
+        if "다음 주에는" in text:
+            text = re.sub(r'(다음 주에는.*?\.)', r'<div class="tip-footer">\1</div>', text)
+    
+    # 제목 변환 (# 제목)
+    text = re.sub(r'^# (.*)$', r'<h1>\1</h1>', text, flags=re.MULTILINE)
+    text = re.sub(r'^## (.*)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
+    text = re.sub(r'^### (.*)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
+    
+    # 굵은 텍스트 (**텍스트**)
+    text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
+    
+    # 기울임 텍스트 (*텍스트*)
+    text = re.sub(r'\*(.*?)\*', r'<em>\1</em>', text)
+    
+    # 링크 변환 ([텍스트](URL))
+    text = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', text)
+    
+    # 일반적인 글머리 기호 (- 항목) 처리 (이미 처리된 AT/DT 팁 예시는 제외)
+    if "prompt-template" not in text:
+        text = re.sub(r'^\- (.*?)$', r'<li>\1</li>', text, flags=re.MULTILINE)
+    
+    # 색상 표시 강조 - 주요 소식에서 사용할 수 있는 색상 강조 기능
+    text = re.sub(r'\[강조\](.*?)\[\/강조\]', r'<span style="color:#e74c3c; font-weight:bold;">\1</span>', text)
+    
+    # 줄바꿈을 <br>과 <p>로 변환
+    paragraphs = text.split('\n\n')
+    for i, paragraph in enumerate(paragraphs):
+        if not paragraph.startswith('<h') and not paragraph.startswith('<li') and not paragraph.startswith('<div'):
+            # 이미 HTML 태그가 아닌 경우만 <p> 태그로 감싸기
+            if '<li>' in paragraph:
+                # 리스트 항목이 있는 경우 <ul> 태그로 감싸기
+                paragraph = f'<ul>{paragraph}</ul>'
+            else:
+                paragraph = f'<p>{paragraph}</p>'
+        paragraphs[i] = paragraph.replace('\n', '<br>')
+    
+    return ''.join(paragraphs)
+
+
+# 기존 섹션 형식 예시 (LLM 출력 형태)
+SAMPLE_SECTIONS = {
+    "main_news": """## OpenAI의 새로운 추론 모델은 주목할만합니다.
+
+OpenAI가 복잡한 문제를 단계적으로 해결하는 새 모델을 공개했습니다. **수학 벤치마크 정확도가 83%**로 이전 모델보다 크게 향상되었습니다.
+
+2025년 3월 10일, [TechCrunch](https://techcrunch.com/openai-reasoning)
+
+## 통신사의 AI 네트워크 자동화는 확인됐습니다.
+
+주요 통신사가 *AI 기반 장애 예측*으로 네트워크 다운타임을 30% 줄였다고 발표했습니다. [강조]운영 비용 절감[/강조] 효과도 확인됐습니다.
+
+2025년 3월 9일, [Reuters](https://reuters.com/telecom-ai)
+""",
+    "aidt_tips": """## 이번 주 팁: 복잡한 업무를 단계별로 쪼개는 프롬프트 작성법
+
+AI에게 복잡한 요청을 한 번에 하면 결과가 부정확해지기 쉽습니다. Chain of Thought와 Chain of Draft를 활용하면 AI가 생각의 과정을 드러내고 초안을 다듬게 할 수 있습니다.
+
+**핵심 프롬프트 예시:**
+- 첫 번째 프롬프트 템플릿 (Chain of Thought 활용):
+  예시: 지난 분기 장애 보고서에서 원인을 분석하고 싶을 때
+  프롬프트: "다음 장애 보고서를 읽고, 단계별로 생각하며 주요 원인을 3가지로 정리해주세요."
+
+- 두 번째 프롬프트 템플릿 (Chain of Draft 활용):
+  예시: 고객 안내 메일을 작성할 때
+  프롬프트: "먼저 핵심만 담은 초안을 작성하고, 그 다음 공손한 어조로 다듬어 최종본을 제시해주세요."
+
+- 세 번째 프롬프트 템플릿 (Chain of Thought와 Chain of Draft 결합):
+  예시: 신규 서비스 기획안을 만들 때
+  프롬프트: "문제 정의부터 해결책까지 단계별로 생각한 뒤, 초안을 작성하고 개선점을 반영한 최종 기획안을 작성해주세요."
+
+이 팁을 활용하면 보고서 작성 시간을 절반으로 줄이면서도 결과물의 논리성을 높일 수 있습니다.
+
+다음 주에는 다른 AI 기본기 팁을 알려드리겠습니다.
+""",
+    "success_story": """## 삼성전자의 AI 혁신 사례
+
+삼성전자는 생산 라인의 불량품 검출률을 높이기 위해 AI 비전 시스템 도입을 결정했습니다.
+기존 수동 검사 방식은 약 92%의 정확도를 보였습니다.
+
+딥러닝 기반 컴퓨터 비전 시스템을 구축하고 수십만 장의 이미지로 모델을 학습시켰습니다.
+
+불량품 검출 정확도가 **98.5%**로 향상되었고 검사 시간은 60% 단축되었습니다.
+
+## Google의 AI 혁신 사례
+
+Google은 데이터 센터의 에너지 효율성을 개선하기 위해 DeepMind AI 시스템을 도입했습니다.
+
+강화학습으로 냉각 시스템을 실시간 최적화했습니다.
+
+냉각 에너지 소비가 약 40% 감소했습니다.
+""",
+    "ai_use_case": """## 생성형 AI로 회의록 자동 정리하기
+
+**요약:** 한 스타트업이 회의 녹취록을 AI로 요약해 회의 후속 업무 시간을 줄였습니다.
+
+**단계별 방법:**
+- 회의 녹음을 텍스트로 변환
+- GPT로 핵심 결정 사항과 할 일을 추출
+- 담당자별로 정리해 메신저로 자동 공유
+
+**추천 프롬프트:** "다음 회의록에서 결정 사항, 할 일, 담당자를 표로 정리해주세요."
+""",
+    "learning_tip": """## 이번 주 팁: st.columns로 깔끔한 레이아웃 만들기
+
+스트림릿 앱이 길어지면 한 눈에 보기 어렵습니다. 컬럼을 활용하면 정보를 나란히 배치할 수 있습니다.
+
+**핵심 학습 포인트:**
+
+1. 첫 번째 학습 포인트: 컬럼 나누기
+  예시: `col1, col2 = st.columns(2)`
+  설명: 화면을 두 영역으로 나눕니다.
+
+2. 두 번째 학습 포인트: 비율 지정
+  예시: `st.columns([1, 2])`
+  설명: 컬럼 너비 비율을 지정합니다.
+
+이 팁을 활용하면 대시보드 가독성이 크게 좋아집니다.
+
+다음 주에는 다른 스트림릿 학습 팁을 알려드리겠습니다.
+""",
+    "project_ideas": """### 프로젝트: 개인 지출 대시보드
+
+**목표:** CSV로 업로드한 지출 내역을 시각화하는 대시보드를 만듭니다.
+
+**필요한 학습 요소:**
+- st.file_uploader와 st.dataframe
+- plotly 차트
+
+**구현 단계:**
+1. CSV 업로드 기능을 만듭니다.
+2. 카테고리별 합계를 계산합니다.
+3. 차트로 시각화합니다.
+
+**도전 과제:** 월별 예산 초과 알림을 추가해보세요.
+""",
+}
+
+
+def make_adversarial_inputs(size):
+    """기존 정규식 구현에서 역추적이 크게 일어나는 입력들을 size 바이트 정도로 만듭니다."""
+    def fill(unit, prefix=""):
+        unit_size = len(unit.encode("utf-8"))
+        return prefix + unit * max(1, (size - len(prefix.encode("utf-8"))) // unit_size)
+
+    return {
+        # 한 줄에 닫히지 않는 링크 시작 문자만 가득한 경우
+        "unclosed_links": fill("[a"),
+        # 닫히지 않는 [강조] 표시가 반복되는 경우
+        "unclosed_emphasis": fill("[강조]가"),
+        # 마침표 없이 '다음 주에는'이 반복되는 팁 섹션
+        "footer_without_period": fill("다음 주에는 ", "## 이번 주 팁: 제목\n"),
+        # 예시는 있지만 '프롬프트:'가 없는 템플릿 내용이 반복되는 경우
+        "template_without_prompt": fill('<div class="template-content">예시: 내용 ', "핵심 프롬프트 예시\n"),
+        # 끝나지 않는 프롬프트 템플릿 블록 뒤에 긴 본문이 이어지는 경우
+        "unterminated_template": fill("본문 *기울임 **굵게 [링크](x)\n", "핵심 프롬프트 예시\n- 첫 번째 프롬프트 템플릿 (Chain of Thought 활용):\n"),
+        # 일반적인 긴 문서 (짧은 문단이 매우 많은 경우)
+        "many_paragraphs": fill("## 제목\n\n- 항목 **굵게** [링크](https://example.com)\n\n본문 *기울임*\n\n"),
+    }
+
+
+def time_call(func, text, repeat=1):
+    """func(text)를 repeat번 실행하고 가장 빠른 실행 시간(초)을 반환합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="convert_markdown_to_html 벤치마크")
+    parser.add_argument("--size", type=int, default=1024 * 1024, help="악성 입력 크기 (바이트)")
+    parser.add_argument("--legacy-budget", type=float, default=5.0,
+                        help="기존 구현 측정 시간 한도 (초). 한도를 넘는 크기부터는 기존 구현을 건너뜁니다.")
+    args = parser.parse_args()
+
+    print("== 기존 섹션 형식: 출력 일치 여부와 1회 변환 시간 ==")
+    for name, text in SAMPLE_SECTIONS.items():
+        same = convert_markdown_to_html(text) == legacy_convert_markdown_to_html(text)
+        legacy_time = time_call(legacy_convert_markdown_to_html, text, repeat=200)
+        new_time = time_call(convert_markdown_to_html, text, repeat=200)
+        print(f"{name:<16} 일치={same!s:<5} legacy={legacy_time * 1e6:8.1f}us  new={new_time * 1e6:8.1f}us")
+        if not same:
+            raise SystemExit(f"출력이 기존 구현과 다릅니다: {name}")
+
+    print(f"\n== 악성 입력 ({args.size:,} 바이트) ==")
+    for name, text in make_adversarial_inputs(args.size).items():
+        new_time = time_call(convert_markdown_to_html, text)
+
+        # 기존 구현은 작은 입력부터 키워가며, 예상 시간(최악 O(n^2))이 한도 안일 때만 측정
+        legacy_result = "건너뜀"
+        sample_size, last = 2 * 1024, None
+        while last is None or last[0] < len(text):
+            sample_size = min(sample_size, len(text))
+            if last is not None and last[1] * (sample_size / last[0]) ** 2 > args.legacy_budget:
+                break
+            sample = text[:sample_size]
+            if convert_markdown_to_html(sample) != legacy_convert_markdown_to_html(sample):
+                raise SystemExit(f"출력이 기존 구현과 다릅니다: {name} ({sample_size}자)")
+            last = (sample_size, time_call(legacy_convert_markdown_to_html, sample))
+            legacy_result = (f"legacy={last[1] * 1000:.1f}ms / new={time_call(convert_markdown_to_html, sample) * 1000:.1f}ms"
+                             f" @ {sample_size:,}자")
+            sample_size *= 4
+
+        print(f"{name:<24} new={new_time * 1000:.1f}ms @ {len(text):,}자   {legacy_result}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# select_best_materials 벤치마크
+# 항목을 하나씩 평가하고 (점수, 항목) 튜플을 정렬하던 기존 선별 방식(legacy)과
+# 일괄 평가 방식(evaluate_educational_value_batch)이 같은 항목을 같은 순서로 고르는지 무작위 검색 결과로 확인하고,
+# 후보 수에 따른 선별 시간을 비교합니다.
+#
+# 기존 방식은 점수가 같은 항목이 있으면 딕셔너리끼리 비교하다 TypeError가 나므로,
+# 비교 기준에서는 점수만으로 안정 정렬(동점이면 검색 결과 순서 유지)하도록 고쳐서 사용합니다.
+#
+#   python benchmarks/bench_materials.py [--sizes 10,100,1000,5000] [--seed 0]
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit.logger import set_log_level
+
+set_log_level("error")
+
+from bench_keywords import make_items
+from streamlit_app_v2 import evaluate_educational_value, logger, remove_html_tags, select_best_materials
+
+# 기존 선별 방식과 같은 소스별 제한
+LEGACY_SOURCE_LIMITS = {"youtube": 3, "naver_blog": 2, "naver_web": 2, "naver_news": 1}
+
+
+# 기존 구현 (비교 기준) - 정렬만 점수 기준 안정 정렬로 수정
+def legacy_select_best_materials(search_results, topic=None, max_total=4):
+    all_scored_items = []
+    for source, result in search_results.items():
+        if "items" not in result or "error" in result or len(result.get("items", [])) == 0:
+            continue
+        for item in result.get("items", []):
+            score = evaluate_educational_value(item, topic)
+            logger.info(f"항목 평가: '{remove_html_tags(item.get('title', '제목 없음'))[:30]}...' - 점수: {score}")
+            all_scored_items.append((score, item))
+    if not all_scored_items:
+        return []
+
+    all_scored_items.sort(key=lambda scored: scored[0], reverse=True)
+
+    source_counters = {}
+    selected_items = []
+    for score, item in all_scored_items:
+        source_type = item.get("source_type", "unknown")
+        if source_counters.get(source_type, 0) >= LEGACY_SOURCE_LIMITS.get(source_type, 0):
+            continue
+        if score < 5:
+            logger.info(f"낮은 점수로 제외: {remove_html_tags(item.get('title', '제목 없음'))[:30]}... - 점수: {score}")
+            continue
+        selected_items.append(item)
+        source_counters[source_type] = source_counters.get(source_type, 0) + 1
+        if len(selected_items) >= max_total:
+            break
+
+    if len(selected_items) < 2 and all_scored_items:
+        add_count = min(2 - len(selected_items), len(all_scored_items))
+        already_selected = set(item.get('link', '') for item in selected_items)
+        for score, item in all_scored_items:
+            if item.get('link', '') not in already_selected:
+                selected_items.append(item)
+                add_count -= 1
+                if add_count <= 0:
+                    break
+    return selected_items
+
+
+def make_search_results(count, seed, keyword_ratio=0.15):
+    """무작위 항목을 parallel_search 결과 형식({소스: {"items": [...]}})으로 묶습니다."""
+    items, topics = make_items(count, seed, keyword_ratio)
+    search_results = {}
+    for i, item in enumerate(items):
+        item["link"] = f"https://example.com/{seed}/{i}"
+        search_results.setdefault(item["source_type"] or "etc", {"items": []})["items"].append(item)
+    return search_results, topics
+
+
+def best_time(func, search_results, topic, repeat=3):
+    """선별 한 번에 걸린 가장 빠른 시간(밀리초)을 반환합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(search_results, topic)
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="select_best_materials 벤치마크")
+    parser.add_argument("--sizes", default="10,100,1000,5000", help="후보 수 목록 (쉼표로 구분)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    # 로그 출력은 시간 측정에서 제외 (기존 구현의 항목별 로그 메시지는 출력되지 않아도 만들어짐)
+    logger.setLevel(logging.ERROR)
+
+    print("== 선별 결과 일치 여부 ==")
+    rng = random.Random(args.seed)
+    checked = 0
+    cases = [(size, 0.15) for size in sizes] + [(size, 1.0) for size in sizes]
+    # 점수 기준을 넘는 항목이 적어 상위 항목을 보충하는 경우를 포함하도록 작은 묶음도 확인
+    cases += [(rng.randint(1, 8), rng.choice((0.0, 0.15, 1.0))) for _ in range(300)]
+    for i, (size, ratio) in enumerate(cases):
+        search_results, topics = make_search_results(size, args.seed + i, ratio)
+        for topic in topics:
+            for max_total in (1, 4, 10):
+                expected = legacy_select_best_materials(search_results, topic, max_total)
+                actual = select_best_materials(search_results, topic, max_total)
+                if [id(item) for item in expected] != [id(item) for item in actual]:
+                    raise SystemExit(f"선별 결과가 기존 구현과 다릅니다 (후보 {size}개, 주제={topic!r}, max_total={max_total})")
+                checked += 1
+    print(f"{checked:,}건 모두 일치")
+
+    print("\n== 선별 시간 ==")
+    for size in sizes:
+        search_results, _ = make_search_results(size, args.seed)
+        for topic in ("차트", None):
+            legacy_time = best_time(legacy_select_best_materials, search_results, topic)
+            new_time = best_time(select_best_materials, search_results, topic)
+            print(f"후보 {size:>6,}개 주제={topic!s:<6} legacy={legacy_time:8.2f}ms  batch={new_time:8.2f}ms"
+                  f"  ({legacy_time / new_time:.1f}배)")
+
+
+if __name__ == "__main__":
+    main()
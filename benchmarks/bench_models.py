@@ -0,0 +1,156 @@
+# 섹션별 모델 비교 벤치마크
+# 앱이 기록한 섹션 프롬프트(NEWSLETTER_PROMPT_LOG로 기록한 JSON Lines 파일)를 여러 모델로 다시 요청해
+# 섹션별로 첫 토큰까지의 시간, 전체 응답 시간, 입력/출력 토큰 수, 호출당 예상 비용을 비교하고,
+# 지금의 섹션별 모델 정책(model_routing.SECTION_POLICIES)과 모든 섹션을 한 모델로 만들 때의 합계를 보여 줍니다.
+# 캐시, 속도 제한, 대체 모델 없이 모델을 직접 호출하며, 토큰 수는 prompt_budget.count_tokens로 셉니다.
+#
+#   NEWSLETTER_PROMPT_LOG=.cache/prompts.jsonl streamlit run streamlit_app.py   # 프롬프트 기록
+#   OPENAI_API_KEY=... python benchmarks/bench_models.py --prompts .cache/prompts.jsonl [--models gpt-4-turbo-preview,gpt-4o-mini]
+#   python benchmarks/bench_models.py --prompts .cache/prompts.jsonl --dry-run       # 호출 없이 입력 토큰과 비용만
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_routing import FAST_MODEL, STRONG_MODEL, estimate_cost, section_policy
+from prompt_budget import count_tokens
+
+
+def load_prompts(path, sections=None, per_section=3):
+    """기록된 프롬프트를 섹션별로 최근 것부터 서로 다른 프롬프트 per_section개까지 읽습니다."""
+    records = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if sections and record["section"] not in sections:
+                continue
+            records[(record["section"], record["system"], record["prompt"])] = record
+    by_section = {}
+    for record in sorted(records.values(), key=lambda record: record["recorded_at"], reverse=True):
+        chosen = by_section.setdefault(record["section"], [])
+        if len(chosen) < per_section:
+            chosen.append(record)
+    return by_section
+
+
+def run_prompt(client, model, record):
+    """프롬프트 하나를 스트리밍으로 요청하고 (첫 토큰까지 시간, 전체 시간, 응답 텍스트)를 반환합니다."""
+    options = {} if record["max_tokens"] is None else {"max_tokens": record["max_tokens"]}
+    started = time.perf_counter()
+    first = None
+    chunks = []
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": record["system"]},
+            {"role": "user", "content": record["prompt"]}
+        ],
+        temperature=record["temperature"],
+        stream=True,
+        **options
+    )
+    for chunk in stream:
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        if first is None:
+            first = time.perf_counter() - started
+        chunks.append(chunk.choices[0].delta.content)
+    total = time.perf_counter() - started
+    return first if first is not None else total, total, "".join(chunks)
+
+
+def measure(client, models, by_section, repeat, dry_run):
+    """섹션 x 모델별 측정 결과 목록을 반환합니다."""
+    results = []
+    for section, records in sorted(by_section.items()):
+        for model in models:
+            first_times, total_times, input_tokens, output_tokens = [], [], [], []
+            for record in records:
+                prompt_tokens = count_tokens(record["system"], model) + count_tokens(record["prompt"], model)
+                for _ in range(repeat):
+                    input_tokens.append(prompt_tokens)
+                    if dry_run:
+                        continue
+                    first, total, text = run_prompt(client, model, record)
+                    first_times.append(first)
+                    total_times.append(total)
+                    output_tokens.append(count_tokens(text, model))
+            mean_input = statistics.mean(input_tokens)
+            mean_output = statistics.mean(output_tokens) if output_tokens else 0
+            results.append({
+                "section": section,
+                "model": model,
+                "calls": len(input_tokens),
+                "first_token_s": statistics.median(first_times) if first_times else None,
+                "total_s": statistics.median(total_times) if total_times else None,
+                "input_tokens": mean_input,
+                "output_tokens": mean_output,
+                "cost_usd": estimate_cost(model, mean_input, mean_output),
+            })
+    return results
+
+
+def _format(value, spec, missing="-"):
+    return missing if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="섹션별 모델 비교 벤치마크")
+    parser.add_argument("--prompts", default=os.environ.get("NEWSLETTER_PROMPT_LOG", ".cache/prompts.jsonl"),
+                        help="기록된 프롬프트 파일 (JSON Lines)")
+    parser.add_argument("--models", default=f"{STRONG_MODEL},{FAST_MODEL}", help="비교할 모델 (쉼표로 구분)")
+    parser.add_argument("--sections", default="", help="비교할 섹션 (쉼표로 구분, 비우면 모두)")
+    parser.add_argument("--per-section", type=int, default=3, help="섹션별로 사용할 최근 프롬프트 수")
+    parser.add_argument("--repeat", type=int, default=1, help="프롬프트마다 반복 요청 횟수")
+    parser.add_argument("--dry-run", action="store_true", help="모델을 호출하지 않고 입력 토큰 수와 입력 비용만 계산")
+    args = parser.parse_args()
+
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+    sections = {section.strip() for section in args.sections.split(",") if section.strip()}
+    if not os.path.exists(args.prompts):
+        parser.error(f"프롬프트 기록 파일이 없습니다: {args.prompts} (NEWSLETTER_PROMPT_LOG를 설정하고 뉴스레터를 생성하세요)")
+    by_section = load_prompts(args.prompts, sections, args.per_section)
+    if not by_section:
+        parser.error("비교할 프롬프트가 없습니다.")
+
+    client = None
+    if not args.dry_run:
+        from openai import OpenAI
+        client = OpenAI(max_retries=0)
+
+    results = measure(client, models, by_section, args.repeat, args.dry_run)
+
+    print(f"== 섹션별 모델 비교 ({args.prompts}, 섹션별 프롬프트 최대 {args.per_section}개 x {args.repeat}회) ==")
+    print(f"{'섹션':<16}{'모델':<22}{'호출':>5}{'첫 토큰(s)':>11}{'전체(s)':>9}{'입력':>8}{'출력':>7}{'비용($)':>10}")
+    for row in results:
+        print(f"{row['section']:<16}{row['model']:<22}{row['calls']:>5}{_format(row['first_token_s'], '.2f'):>11}"
+              f"{_format(row['total_s'], '.2f'):>9}{row['input_tokens']:>8.0f}{row['output_tokens']:>7.0f}"
+              f"{_format(row['cost_usd'], '.5f'):>10}")
+
+    # 이슈 한 개(섹션마다 한 번 호출)의 합계 - 섹션은 병렬로 생성되므로 시간은 가장 느린 섹션 기준
+    rows = {(row["section"], row["model"]): row for row in results}
+    plans = {f"모두 {model}": {section: model for section in by_section} for model in models}
+    plans["섹션별 정책"] = {section: section_policy(section)["models"][0] for section in by_section}
+    print("\n== 이슈 한 개 합계 (섹션마다 한 번 호출) ==")
+    for label, plan in plans.items():
+        chosen = [rows.get((section, model)) for section, model in plan.items()]
+        if any(row is None for row in chosen):
+            print(f"{label:<28} (비교하지 않은 모델 포함: {', '.join(sorted(set(plan.values()) - set(models)))})")
+            continue
+        costs = [row["cost_usd"] for row in chosen]
+        cost = None if any(c is None for c in costs) else sum(costs)
+        slowest = None if args.dry_run else max(row["total_s"] for row in chosen)
+        print(f"{label:<28} 입력 {sum(row['input_tokens'] for row in chosen):>7.0f}  "
+              f"출력 {sum(row['output_tokens'] for row in chosen):>6.0f}  비용 ${_format(cost, '.4f')}  "
+              f"가장 느린 섹션 {_format(slowest, '.2f')}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# 근접 중복 기사 탐지 벤치마크
+# 무작위 기사와 그 기사를 조금 고쳐 쓴 사본을 섞은 후보 목록으로
+#   - MinHash 추정으로 찾은 근접 중복 쌍이 정확한 3-gram 자카드 유사도로 찾은 쌍과 얼마나 같은지(재현율, 정밀도)
+#   - drop_near_duplicates가 후보 목록을 거르는 시간(빈 색인, 최근 이슈 기사로 채운 색인)
+# 을 확인하고, 파이썬 집합으로 모든 쌍의 자카드 유사도를 계산하는 방법과 시간을 비교합니다.
+#
+#   python benchmarks/bench_near_duplicates.py [--items 300] [--seed 0]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_duplicates import (
+    NEAR_DUPLICATE_THRESHOLD,
+    SHINGLE_SIZE,
+    NearDuplicateIndex,
+    _normalized_codes,
+    article_text,
+    drop_near_duplicates,
+    minhash_many,
+)
+
+
+def make_vocabulary(rng, size=3000):
+    """한글 음절 2~4개로 된 무작위 단어와 영어 단어를 섞은 어휘를 만듭니다."""
+    words = set()
+    while len(words) < size:
+        if rng.random() < 0.8:
+            words.add("".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 4))))
+        else:
+            words.add("".join(chr(rng.randint(ord("a"), ord("z"))) for _ in range(rng.randint(3, 9))))
+    return sorted(words)
+
+
+def make_items(count, seed, duplicate_ratio=0.1):
+    """무작위 기사 목록을 만듭니다. duplicate_ratio 비율은 앞선 기사를 고쳐 쓴 사본(단어 일부 교체, 말머리 추가)입니다.
+    단어는 자주 쓰는 단어가 더 자주 나오도록(지프 분포) 고릅니다."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def sentence(low, high):
+        return " ".join(rng.choices(vocabulary, weights, k=rng.randint(low, high)))
+
+    items = []
+    for _ in range(count):
+        if items and rng.random() < duplicate_ratio:
+            original = rng.choice(items)
+            words = original["description"].split()
+            for _ in range(max(1, len(words) // 8)):
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            items.append({
+                "title": rng.choice(["[속보] ", "<b>단독</b> ", ""]) + original["title"],
+                "description": " ".join(words[:len(words) - rng.randint(0, 3)]) + " &quot;" + sentence(1, 2) + "&quot;",
+            })
+        else:
+            items.append({"title": sentence(4, 10), "description": sentence(15, 35)})
+    return items
+
+
+def shingle_sets(items):
+    """기사별 정규화한 텍스트의 3-gram 집합을 만듭니다. (minhash_many와 같은 정규화)"""
+    codes, doc_ids = _normalized_codes([article_text(item) for item in items])
+    texts = [[] for _ in items]
+    for code, doc_id in zip(codes.tolist(), doc_ids.tolist()):
+        texts[doc_id].append(chr(code))
+    return [{text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+            for text in ("".join(chars) for chars in texts)]
+
+
+def exact_pairs(items, threshold):
+    """모든 쌍의 정확한 자카드 유사도로 근접 중복 쌍을 찾습니다. (비교 기준)"""
+    sets = shingle_sets(items)
+    pairs = set()
+    for later in range(len(sets)):
+        for earlier in range(later):
+            union = len(sets[earlier] | sets[later])
+            if union and len(sets[earlier] & sets[later]) >= threshold * union:
+                pairs.add((earlier, later))
+    return pairs
+
+
+def best_time(func, repeat=7):
+    """func를 repeat번 실행한 가장 빠른 시간을 밀리초로 반환합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="근접 중복 기사 탐지 벤치마크")
+    parser.add_argument("--items", type=int, default=300, help="후보 기사 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--threshold", type=float, default=NEAR_DUPLICATE_THRESHOLD, help="자카드 유사도 기준")
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.seed)
+    previous = make_items(args.items, args.seed + 1)
+
+    print("== 근접 중복 쌍 (정확한 자카드 유사도 기준) ==")
+    expected = exact_pairs(items, args.threshold)
+    index = NearDuplicateIndex(args.threshold)
+    found = {
+        (earlier, later)
+        for later, neighbors in enumerate(index.neighbors(minhash_many([article_text(item) for item in items])))
+        for earlier in neighbors
+    }
+    matched = len(expected & found)
+    print(f"정확한 쌍 {len(expected)}개, 찾은 쌍 {len(found)}개, 일치 {matched}개 "
+          f"(재현율 {matched / max(len(expected), 1):.1%}, 정밀도 {matched / max(len(found), 1):.1%})")
+
+    print("\n== 후보 목록 거르기 시간 ==")
+    seeded = NearDuplicateIndex(args.threshold)
+    drop_near_duplicates(previous, seeded)
+    for label, make_index in (("빈 색인", lambda: NearDuplicateIndex(args.threshold)),
+                              (f"최근 기사 {len(seeded)}개 색인", lambda: _copy(seeded))):
+        kept = len(drop_near_duplicates(items, make_index()))
+        elapsed = best_time(lambda: drop_near_duplicates(items, make_index()))
+        print(f"{label:<18} {len(items)}개 -> {kept}개  {elapsed:6.2f}ms")
+    exact_time = best_time(lambda: exact_pairs(items, args.threshold), repeat=1)
+    print(f"{'정확한 자카드(모든 쌍)':<18} {len(items)}개          {exact_time:6.2f}ms")
+
+
+def _copy(index):
+    """색인을 복사합니다. (시간 측정마다 같은 상태에서 시작)"""
+    copy = NearDuplicateIndex(index.threshold)
+    copy.add(index.signatures, index.keys)
+    return copy
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+# 오프라인 파이프라인 벤치마크
+# benchmarks/fixtures에 녹화해 둔 NewsAPI, 네이버(뉴스/블로그/웹문서), 유튜브 응답과 OpenAI 완성 결과를 재생해
+# API 키와 네트워크 없이 뉴스레터 생성 과정 전체의 시간을 잽니다.
+#   - 검색 API: http_client.set_transport(httpx.MockTransport)로 요청 호스트/경로에 맞는 녹화 응답을 돌려줌
+#     (검색어마다 항목 순서를 돌려 다른 결과를 주고, 날짜는 재생 시각 기준으로 바꿔 최근 N일 필터를 통과시킴)
+#   - OpenAI: 127.0.0.1의 대역 서버(OPENAI_BASE_URL)가 프롬프트의 섹션 이름에 맞는 완성 결과를 돌려줌 (스트리밍 포함)
+# 측정 대상
+#   - streamlit_app.generate_combined_newsletter, streamlit_app_v2.generate_learning_newsletter
+#     : 표본마다 빈 캐시 디렉터리를 쓰는 하위 프로세스에서 처음 실행(cold)과 같은 입력으로 다시 실행(warm)
+#   - convert_markdown_to_html, select_best_materials, render_aidt_newsletter, render_learning_newsletter
+#     : 재생한 파이프라인 결과를 입력으로 같은 프로세스에서 반복 측정
+# 재생 중에는 속도 제한과 일일 할당량을 끕니다. (토큰 버킷 대기 시간이 결과를 덮지 않도록)
+# --json으로 결과를 저장하고, --baseline으로 이전 결과와 비교해 중앙값이 --max-regression보다 더 느려졌거나
+# 녹화되지 않은 요청이 있었으면 종료 코드 1을 반환하므로 CI에서 그대로 사용할 수 있습니다.
+#
+#   python benchmarks/bench_pipeline.py [--repeat 5] [--json results.json] [--baseline baseline.json]
+import argparse
+import asyncio
+import atexit
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 모듈을 불러오기 전에 캐시를 빈 임시 디렉터리로 바꾸고 속도 제한과 할당량을 끔 (하위 프로세스도 각자 새 디렉터리 사용)
+CACHE_DIR = tempfile.mkdtemp(prefix="bench-pipeline-")
+atexit.register(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+os.environ["NEWSLETTER_CACHE_DIR"] = CACHE_DIR
+for provider in ("NAVER", "YOUTUBE", "NEWS_API", "OPENAI"):
+    os.environ.setdefault(f"NEWSLETTER_LIMIT_{provider}_RATE", "none")
+    os.environ.setdefault(f"NEWSLETTER_LIMIT_{provider}_QUOTA", "none")
+
+import httpx
+from streamlit import config as streamlit_config
+from streamlit.logger import set_log_level
+
+set_log_level("error")
+
+import http_client
+import streamlit_app
+import streamlit_app_v2
+from html_template import render_aidt_newsletter, render_learning_newsletter
+from markdown_renderer import convert_markdown_to_html
+
+# 앱 모듈이 켜 둔 요청별 INFO 로그는 숨김 (오류는 표시)
+logging.getLogger().setLevel(logging.ERROR)
+
+# (호스트, 경로) -> (응답 파일, 항목 목록 키, 개수 매개변수)
+ROUTES = {
+    ("openapi.naver.com", "/v1/search/news.json"): ("naver_news.json", "items", "display"),
+    ("openapi.naver.com", "/v1/search/blog.json"): ("naver_blog.json", "items", "display"),
+    ("openapi.naver.com", "/v1/search/webkr.json"): ("naver_webkr.json", "items", "display"),
+    ("newsapi.org", "/v2/everything"): ("newsapi_everything.json", "articles", "pageSize"),
+    ("www.googleapis.com", "/youtube/v3/search"): ("youtube_search.json", "items", "maxResults"),
+}
+
+KST = timezone(timedelta(hours=9))
+
+# 재생에 쓰는 가짜 API 키 (실제 서버로는 나가지 않음)
+API_KEYS = {
+    "openai_api_key": "bench-openai-key",
+    "news_api_key": "bench-news-key",
+    "naver_client_id": "bench-naver-id",
+    "naver_client_secret": "bench-naver-secret",
+}
+SEARCH_CREDENTIALS = {"naver": ("bench-naver-id", "bench-naver-secret"), "youtube": "bench-youtube-key"}
+
+ISSUE = {"news_query_en": "Telecommunication AND AI", "news_query_ko": "AI 인공지능 통신", "issue_number": 1}
+LEARNING_WEEK = "1"
+
+# 생성 결과에 이 문구가 있으면 재생이 어긋난 것으로 봄 (섹션 오류를 기본 콘텐츠나 오류 문구로 대체한 경우)
+FAILURE_MARKERS = ("콘텐츠 생성 오류", "API 오류", "오류가 발생했습니다", "가져오기 실패", "찾을 수 없습니다")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def refresh_dates(name, index, item, now):
+    """녹화 응답 항목의 날짜를 재생 시각 기준으로 바꾼 사본을 반환합니다. (index번째 항목일수록 오래됨)"""
+    item = dict(item)
+    if name == "naver_news.json":
+        item["pubDate"] = format_datetime((now - timedelta(hours=2 * (index + 1))).astimezone(KST))
+    elif name == "naver_blog.json":
+        item["postdate"] = (now - timedelta(days=index)).astimezone(KST).strftime("%Y%m%d")
+    elif name == "newsapi_everything.json":
+        item["publishedAt"] = (now - timedelta(hours=3 * (index + 1))).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return item
+
+
+class SearchReplay:
+    """녹화한 검색 API 응답을 돌려주는 httpx.MockTransport 처리기 (http_client 이벤트 루프에서만 호출됨)"""
+
+    def __init__(self, latency=0.0):
+        self.fixtures = {name: load_fixture(name) for name, _, _ in ROUTES.values()}
+        self.latency = latency
+        self.requests = 0
+        self.unmatched = []
+        # 같은 기사는 어느 검색어로 받든 재생하는 동안 같은 날짜를 갖도록 기준 시각을 한 번만 정함 (실제 API처럼)
+        self.now = datetime.now(timezone.utc)
+
+    async def __call__(self, request):
+        route = ROUTES.get((request.url.host, request.url.path))
+        if route is None:
+            self.unmatched.append(f"GET {request.url.host}{request.url.path}")
+            return httpx.Response(404, json={"error": "녹화된 응답이 없습니다."})
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        name, key, count_param = route
+        params = request.url.params
+        body = dict(self.fixtures[name])
+        pool = body[key]
+        # 검색어마다 시작 위치를 달리해 섹션별로 다른(일부 겹치는) 결과를 줌
+        offset = zlib.crc32((params.get("query") or params.get("q") or "").encode("utf-8")) % len(pool)
+        positions = list(range(offset, len(pool))) + list(range(offset))
+        start = int(params.get("start", 1)) - 1
+        count = int(params.get(count_param, len(positions)))
+        # 날짜는 녹화 목록에서의 위치로 정함 (기사 저장소는 같은 기사를 URL로 합침)
+        body[key] = [refresh_dates(name, index, pool[index], self.now) for index in positions[start:start + count]]
+        if "display" in body:
+            body["display"] = len(body[key])
+        return httpx.Response(200, json=body)
+
+
+class CompletionServer(ThreadingHTTPServer):
+    """녹화한 OpenAI 완성 결과를 돌려주는 대역 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _CompletionHandler)
+        fixture = load_fixture("openai_completions.json")
+        self.completions = fixture["completions"]
+        self.default = fixture["default"]
+        self.usage = fixture["usage"]
+        self.latency = latency
+        self.requests = 0
+        self.unmatched = []
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def pick(self, prompt):
+        """프롬프트에 섹션 이름(match)이 들어 있는 완성 결과를 반환합니다."""
+        with self._lock:
+            self.requests += 1
+            for completion in self.completions:
+                if completion["match"] in prompt:
+                    return completion["content"]
+            self.unmatched.append("POST /chat/completions: " + " ".join(prompt.split())[:60])
+            return self.default
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, "application/json", json.dumps({"error": {"message": "not found"}}))
+            return
+        content = self.server.pick("\n".join(message["content"] for message in request["messages"]))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        base = {"id": "chatcmpl-bench", "created": int(time.time()), "model": request["model"]}
+        if request.get("stream"):
+            # 토큰 조각처럼 잘게 나눈 SSE 응답
+            chunks = [content[i:i + 16] for i in range(0, len(content), 16)]
+            events = [{**base, "object": "chat.completion.chunk",
+                       "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]} for chunk in chunks]
+            events.append({**base, "object": "chat.completion.chunk",
+                           "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            body = "".join(f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events) + "data: [DONE]\n\n"
+            self._send(200, "text/event-stream", body)
+            return
+        body = {**base, "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {**self.server.usage,
+                          "total_tokens": self.server.usage["prompt_tokens"] + self.server.usage["completion_tokens"]}}
+        self._send(200, "application/json", json.dumps(body, ensure_ascii=False))
+
+    def _send(self, status, content_type, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_replay(fetch_latency=0.0, llm_latency=0.0):
+    """검색 API 재생 전송 계층과 OpenAI 대역 서버를 설치하고 (SearchReplay, CompletionServer)를 반환합니다."""
+    streamlit_config.set_option("global.showWarningOnDirectExecution", False)
+    replay = SearchReplay(fetch_latency)
+    http_client.set_transport(httpx.MockTransport(replay))
+    server = CompletionServer(llm_latency)
+    threading.Thread(target=server.serve_forever, name="completion-server", daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    # 학습 뉴스레터는 API 설정 여부와 검색 인증 정보를 세션 상태에서 읽는데, streamlit run 밖에서는 세션 상태가 항상 비어 있음
+    # - 검색 인증 정보는 가짜 값으로, NewsAPI는 같은 수집 경로(news_feed + 응답 캐시)를 쓰는 메인 앱 함수로 바꿔 끼움
+    streamlit_app_v2.get_search_credentials = lambda: dict(SEARCH_CREDENTIALS)
+    streamlit_app_v2.fetch_real_time_news = streamlit_app.fetch_real_time_news
+    return replay, server
+
+
+def find_problems(name, html):
+    return [f"{name}: '{marker}'" for marker in FAILURE_MARKERS if marker in html]
+
+
+def run_pipeline_sample(fetch_latency, llm_latency):
+    """빈 캐시에서 두 파이프라인을 실행(cold)하고 같은 입력으로 다시 실행(warm)한 시간(초)과 재생 점검 결과를 반환합니다."""
+    replay, server = start_replay(fetch_latency, llm_latency)
+    timings = {}
+    problems = []
+    try:
+        for phase in ("cold", "warm"):
+            started = time.perf_counter()
+            html = streamlit_app.generate_combined_newsletter(
+                API_KEYS["openai_api_key"], API_KEYS["news_api_key"],
+                API_KEYS["naver_client_id"], API_KEYS["naver_client_secret"],
+                ISSUE["news_query_en"], ISSUE["news_query_ko"], issue_num=ISSUE["issue_number"]
+            )
+            timings[f"generate_combined_newsletter.{phase}"] = time.perf_counter() - started
+            problems += find_problems(f"generate_combined_newsletter.{phase}", html)
+
+            started = time.perf_counter()
+            html = streamlit_app_v2.generate_learning_newsletter(
+                LEARNING_WEEK, API_KEYS["openai_api_key"], API_KEYS["news_api_key"]
+            )
+            timings[f"generate_learning_newsletter.{phase}"] = time.perf_counter() - started
+            problems += find_problems(f"generate_learning_newsletter.{phase}", html)
+    finally:
+        http_client.close()
+        server.shutdown()
+    return {
+        "timings": timings,
+        "fetch_requests": replay.requests,
+        "llm_requests": server.requests,
+        "unmatched": replay.unmatched + server.unmatched,
+        "problems": problems,
+    }
+
+
+def measure(func, number, repeat):
+    """func를 number번 호출하는 시간을 repeat번 재서 호출당 시간(초) 목록을 반환합니다."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return samples
+
+
+def prepare_inputs():
+    """재생한 수집/생성 결과로 단계별 측정에 쓸 입력을 만듭니다."""
+    artifact = streamlit_app.generate_newsletter_content(
+        API_KEYS["openai_api_key"], API_KEYS["news_api_key"],
+        API_KEYS["naver_client_id"], API_KEYS["naver_client_secret"],
+        ISSUE["news_query_en"], ISSUE["news_query_ko"], issue_num=ISSUE["issue_number"]
+    )
+    week = streamlit_app_v2.get_weekly_content(LEARNING_WEEK)
+    search_results = streamlit_app_v2.search_topics(week["topics"])
+    topic = week["topics"][0]["name"]
+    materials = streamlit_app_v2.select_best_materials(search_results[topic], topic)
+    completions = {completion["match"]: completion["content"]
+                   for completion in load_fixture("openai_completions.json")["completions"]}
+    learning_content = {
+        "study_materials": "".join(
+            f"<div class='material-card'><h4 class='card-title'><a href='{m['link']}'>{m['title']}</a></h4>"
+            f"<p class='card-description'>{m['description']}</p></div>" for m in materials),
+        "learning_tip": convert_markdown_to_html(completions["'이번 주 학습 팁'"]),
+        "project_ideas": convert_markdown_to_html(completions["'실습 프로젝트 아이디어'"]),
+        "streamlit_news": convert_markdown_to_html(completions["'최신 스트림릿 소식'"]),
+    }
+    return {
+        "artifact": artifact,
+        "week": week,
+        "search_results": search_results[topic],
+        "topic": topic,
+        "markdown": list(completions.values()),
+        "learning_content": learning_content,
+    }
+
+
+def run_stage_benchmarks(inputs, number, repeat):
+    """단계별 함수의 호출당 시간(초) 목록을 반환합니다."""
+    artifact = inputs["artifact"]
+    week = inputs["week"]
+    highlight = streamlit_app.DEFAULT_HIGHLIGHT_SETTINGS
+    markdown = inputs["markdown"]
+    return {
+        # 녹화한 완성 결과 전체를 한 번씩 변환
+        "convert_markdown_to_html": measure(lambda: [convert_markdown_to_html(text) for text in markdown], number, repeat),
+        "select_best_materials": measure(
+            lambda: streamlit_app_v2.select_best_materials(inputs["search_results"], inputs["topic"]), number, repeat),
+        "render_aidt_newsletter": measure(
+            lambda: render_aidt_newsletter(artifact["sections"], artifact["issue_number"], artifact["date"], highlight),
+            number, repeat),
+        "render_learning_newsletter": measure(
+            lambda: render_learning_newsletter(inputs["learning_content"], LEARNING_WEEK, artifact["date"],
+                                               week["title"], week["level"], week["topics"]),
+            number, repeat),
+    }
+
+
+def summarize(samples):
+    """초 단위 표본 목록을 밀리초 단위 요약으로 바꿉니다."""
+    values = [sample * 1000 for sample in samples]
+    return {"unit": "ms", "median": statistics.median(values), "min": min(values), "max": max(values),
+            "samples": [round(value, 4) for value in values]}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_with_baseline(results, baseline, max_regression):
+    """기준 결과보다 중앙값이 max_regression 비율 넘게 느려진 항목의 설명 목록을 반환합니다."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or base["median"] <= 0:
+            continue
+        ratio = result["median"] / base["median"]
+        if ratio > 1 + max_regression:
+            regressions.append(f"{name}: {base['median']:.3f}ms → {result['median']:.3f}ms ({ratio:.2f}배)")
+    return regressions
+
+
+def worker_main(args):
+    sample = run_pipeline_sample(args.fetch_latency / 1000, args.llm_latency / 1000)
+    with open(args.worker_output, "w", encoding="utf-8") as f:
+        json.dump(sample, f, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화된 응답을 재생하는 오프라인 파이프라인 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5, help="파이프라인 표본 수 (표본마다 빈 캐시의 새 프로세스)")
+    parser.add_argument("--number", type=int, default=200, help="단계별 측정에서 한 번에 반복 호출할 횟수")
+    parser.add_argument("--fetch-latency", type=float, default=0.0, help="검색 API 응답마다 더할 지연 (ms)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="OpenAI 응답마다 더할 지연 (ms)")
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="기준보다 중앙값이 이 비율 넘게 느려지면 실패 (기본 0.25 = 25%%)")
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_output:
+        worker_main(args)
+        return 0
+
+    # 파이프라인 - 표본마다 빈 캐시 디렉터리를 쓰는 새 프로세스
+    pipeline = {}
+    checks = {"fetch_requests": 0, "llm_requests": 0, "unmatched_requests": [], "problems": []}
+    for _ in range(args.repeat):
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            output = f.name
+        try:
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--worker-output", output,
+                            "--fetch-latency", str(args.fetch_latency), "--llm-latency", str(args.llm_latency)],
+                           check=True, stdout=subprocess.DEVNULL)
+            with open(output, encoding="utf-8") as f:
+                sample = json.load(f)
+        finally:
+            os.remove(output)
+        for name, elapsed in sample["timings"].items():
+            pipeline.setdefault(name, []).append(elapsed)
+        checks["fetch_requests"] = sample["fetch_requests"]
+        checks["llm_requests"] = sample["llm_requests"]
+        checks["unmatched_requests"] = sorted(set(checks["unmatched_requests"]) | set(sample["unmatched"]))
+        checks["problems"] = sorted(set(checks["problems"]) | set(sample["problems"]))
+
+    # 단계별 - 한 번 재생한 결과를 입력으로 같은 프로세스에서 반복
+    start_replay(args.fetch_latency / 1000, args.llm_latency / 1000)
+    try:
+        stages = run_stage_benchmarks(prepare_inputs(), args.number, max(args.repeat, 3))
+    finally:
+        http_client.close()
+
+    results = {name: summarize(samples) for name, samples in {**pipeline, **stages}.items()}
+    print(f"== 오프라인 파이프라인 벤치마크 (파이프라인 표본 {args.repeat}개, 검색 지연 {args.fetch_latency:g}ms, "
+          f"LLM 지연 {args.llm_latency:g}ms) ==")
+    for name, result in results.items():
+        print(f"{name:<40} 중앙값 {result['median']:10.3f}ms  (최소 {result['min']:.3f}ms, 최대 {result['max']:.3f}ms)")
+    print(f"표본당 재생한 요청: 검색 API {checks['fetch_requests']}개, OpenAI {checks['llm_requests']}개")
+
+    failures = [f"녹화되지 않은 요청: {request}" for request in checks["unmatched_requests"]]
+    failures += [f"생성 결과의 오류 문구: {problem}" for problem in checks["problems"]]
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.max_regression)
+        failures += [f"성능 저하: {regression}" for regression in regressions]
+        if not regressions:
+            print(f"기준 결과({args.baseline}) 대비 {args.max_regression:.0%} 넘게 느려진 항목이 없습니다.")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+
+    if args.json:
+        report = {
+            "benchmark": "bench_pipeline",
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {"repeat": args.repeat, "number": args.number,
+                         "fetch_latency_ms": args.fetch_latency, "llm_latency_ms": args.llm_latency},
+            "results": results,
+            "checks": checks,
+            "regressions": regressions,
+            "passed": not failures,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
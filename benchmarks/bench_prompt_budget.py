@@ -0,0 +1,204 @@
+# 프롬프트 토큰 예산 벤치마크
+# 무작위 NewsAPI 기사와 네이버 블로그 검색 결과로 '주요 소식'과 'AI 활용사례' 섹션 프롬프트를 만들어
+#   - 요약과 URL을 그대로 넣고 들여쓰기도 그대로 보내던 기존 프롬프트(legacy)
+#   - 항목별/섹션별 토큰 예산을 적용한 프롬프트 (streamlit_app.build_*_prompt)
+# 의 입력 토큰 수와 프롬프트를 만드는 시간을 비교합니다.
+# tiktoken 인코딩을 읽을 수 없으면 prompt_budget.count_tokens의 추정값으로 셉니다.
+#
+#   python benchmarks/bench_prompt_budget.py [--news 5] [--openai-news 3] [--use-cases 3] [--seed 0]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.logger import set_log_level
+
+set_log_level("error")
+
+from prompt_budget import PROMPT_ITEM_TOKENS, SECTION_PROMPT_TOKENS, _encoding, compact_prompt, count_tokens, format_prompt_item
+from streamlit_app import build_ai_use_case_prompt, build_main_news_prompt, format_news_items
+
+DATE = "2025년 03월 10일"
+
+ENGLISH_WORDS = (
+    "AI model agents enterprise launch cloud data training inference open source startup funding chip "
+    "regulation privacy developers productivity search assistant benchmark partnership revenue users "
+    "customers platform security research release multimodal reasoning workflow automation"
+).split()
+
+
+def english_sentence(rng, low, high):
+    words = rng.choices(ENGLISH_WORDS, k=rng.randint(low, high))
+    return " ".join(words).capitalize() + "."
+
+
+def korean_sentence(rng, low, high):
+    words = ["".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 4)))
+             for _ in range(rng.randint(low, high))]
+    return " ".join(words) + "다."
+
+
+def make_news(rng, count):
+    """NewsAPI 응답 형식의 기사 목록을 만듭니다. (요약 1~6문장, 추적용 파라미터가 붙은 URL)"""
+    return [{
+        "title": english_sentence(rng, 6, 14)[:-1],
+        "description": " ".join(english_sentence(rng, 10, 25) for _ in range(rng.randint(1, 6))),
+        "publishedAt": "2025-03-0%dT0%d:00:00Z" % (rng.randint(1, 9), rng.randint(0, 9)),
+        "source": {"name": rng.choice(["TechCrunch", "The Verge", "Reuters", "VentureBeat"])},
+        "url": f"https://news.example.com/2025/03/{rng.randrange(10**6)}/ai-story"
+               f"?utm_source=newsapi&utm_medium=feed&utm_campaign=weekly{rng.randrange(100)}",
+    } for _ in range(count)]
+
+
+def make_use_cases(rng, count):
+    """네이버 블로그 검색 응답 형식의 결과 목록을 만듭니다. (<b> 강조, 긴 설명)"""
+    return [{
+        "title": "<b>AI 활용사례</b> " + korean_sentence(rng, 3, 6),
+        "description": " ".join(korean_sentence(rng, 6, 12) for _ in range(rng.randint(2, 5))).replace(
+            "다.", "다. <b>AI</b>", 1),
+        "link": f"https://blog.naver.com/user{rng.randrange(1000)}/{rng.randrange(10**12)}",
+        "bloggername": korean_sentence(rng, 1, 2)[:-2],
+    } for _ in range(count)]
+
+
+def legacy_news_info(header, articles):
+    """기존 format_news_info (요약과 URL을 그대로 넣음)"""
+    news_info = header
+    for i, article in enumerate(articles):
+        news_info += f"{i+1}. 제목: {article['title']}\n"
+        news_info += f"   날짜: {DATE}\n"
+        news_info += f"   요약: {article['description']}\n"
+        news_info += f"   출처: {article['source']['name']}\n"
+        news_info += f"   URL: {article['url']}\n\n"
+    return news_info
+
+
+def legacy_main_news_prompt(news, openai_news):
+    """기존 '주요 소식' 프롬프트 (함수 안 f-문자열의 들여쓰기 포함)"""
+    news_info = legacy_news_info("최근 7일 내 수집된 실제 뉴스 기사:\n\n", news)
+    openai_news_info = legacy_news_info("최근 7일 내 수집된 OpenAI 관련 뉴스 기사:\n\n", openai_news)
+    return f"""
+                AIDT Weekly 뉴스레터의 '주요 소식' 섹션을 생성해주세요.
+                오늘 날짜는 {DATE}입니다. 아래는 두 종류의 뉴스 기사입니다:
+
+                === OpenAI 관련 뉴스 ===
+                {openai_news_info}
+
+                === 일반 뉴스 ===
+                {news_info}
+
+                총 2개의 주요 소식을 다음 형식으로 작성해주세요:
+
+                1. 먼저 OpenAI 관련 뉴스에서 가장 중요하고 관련성 높은 1개의 소식을 선택하여 작성하세요.
+                2. 그 다음 일반 뉴스에서 가장 중요하고 관련성 높은 1개의 소식을 선택하여 작성하세요.
+
+                각 소식은 다음 형식으로 작성해주세요:
+                ## [주제]의 [핵심 강점/특징]은 [주목할만합니다/확인됐습니다/중요합니다].
+
+                간략한 내용을 1-2문장으로 작성하세요. 내용은 특정 기술이나 서비스, 기업의 최신 소식을 다루고,
+                핵심 내용만 포함해주세요. 그리고 왜 중요한지를 강조해주세요.
+
+                구체적인 수치나 인용구가 있다면 추가해주세요.
+
+                각 소식의 마지막에는 뉴스 기사의 발행일과 출처를 반드시 "[출처 제목](출처 URL)" 형식으로 포함하세요.
+
+                모든 주제는 반드시 제공된 실제 뉴스 기사에서만 추출해야 합니다. 가상의 정보나 사실이 아닌 내용은 절대 포함하지 마세요.
+                각 소식 사이에 충분한 공백을 두어 가독성을 높여주세요.
+                """
+
+
+def legacy_ai_use_case_prompt(use_cases):
+    """기존 'AI 활용사례' 프롬프트 (모든 검색 결과의 설명을 그대로 넣음)"""
+    use_case_info = "AI 활용사례 검색 결과:\n\n"
+    for i, item in enumerate(use_cases):
+        title = item['title'].replace("<b>", "").replace("</b>", "")
+        description = item['description'].replace("<b>", "").replace("</b>", "")
+        use_case_info += f"{i+1}. 제목: {title}\n"
+        use_case_info += f"   설명: {description}\n"
+        use_case_info += f"   링크: {item['link']}\n"
+        use_case_info += f"   블로그명: {item.get('bloggername', '알 수 없음')}\n\n"
+    return f"""
+        AIDT Weekly 뉴스레터의 'AI 활용사례' 섹션을 생성해주세요.
+        아래는 검색된 실제 AI 활용사례 정보입니다:
+
+        {use_case_info}
+
+        위 검색 결과 중에서 가장 유용하고 구체적인 활용사례를 선택하여 다음 형식으로 내용을 작성해주세요:
+
+        ## [활용사례 제목] - 제목은 1줄로 명확하게
+
+        **요약:** 배경과 중요성을 2-3문장으로 간결하게 설명해주세요.
+
+        **단계별 방법:** AI 솔루션을 상세히 설명합니다. 어떤 기술을 사용했는지, 어떻게 구현했는지, 특별한 접근 방식은 무엇이었는지 등을 포함하여 3~4줄로 작성해주세요.
+
+        **추천 프롬프트:** 이 활용사례를 더 효과적으로 활용하기 위한 구체적이고 명확한 프롬프트 예시를 작성해주세요.
+
+        모든 내용은 반드시 제공된 검색 결과에서만 추출해야 합니다. 가상의 정보나 사실이 아닌 내용은 절대 포함하지 마세요.
+        내용은 마크다운 형식으로 작성해주세요.
+        """
+
+
+def budgeted_ai_use_case_prompt(use_cases):
+    """generate_ai_use_case_content와 같은 방식으로 예산을 적용한 'AI 활용사례' 프롬프트"""
+    return build_ai_use_case_prompt([
+        format_prompt_item(i + 1, [
+            ("제목", item['title']),
+            ("설명", item['description']),
+            ("링크", item['link']),
+            ("블로그명", item.get('bloggername', '알 수 없음')),
+        ], "설명")
+        for i, item in enumerate(use_cases)
+    ])
+
+
+def best_time(func, repeat=7):
+    """func를 repeat번 실행한 가장 빠른 시간을 밀리초로 반환합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 토큰 예산 벤치마크")
+    parser.add_argument("--news", type=int, default=5, help="일반 뉴스 기사 수")
+    parser.add_argument("--openai-news", type=int, default=3, help="OpenAI 관련 뉴스 기사 수")
+    parser.add_argument("--use-cases", type=int, default=3, help="AI 활용사례 검색 결과 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--show", action="store_true", help="예산을 적용한 프롬프트 출력")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    news = make_news(rng, args.news)
+    openai_news = make_news(rng, args.openai_news)
+    use_cases = make_use_cases(rng, args.use_cases)
+
+    counter = "tiktoken" if _encoding("") is not None else "문자 수 추정"
+    print(f"== 섹션 입력 토큰 ({counter}, 항목 예산 {PROMPT_ITEM_TOKENS}, 섹션 예산 {SECTION_PROMPT_TOKENS}) ==")
+    sections = (
+        ("main_news",
+         lambda: legacy_main_news_prompt(news, openai_news),
+         lambda: build_main_news_prompt(DATE, format_news_items(news), format_news_items(openai_news))),
+        ("ai_use_case",
+         lambda: legacy_ai_use_case_prompt(use_cases),
+         lambda: budgeted_ai_use_case_prompt(use_cases)),
+    )
+    for section, legacy, budgeted in sections:
+        before = count_tokens(legacy())
+        compacted = count_tokens(compact_prompt(legacy()))
+        prompt = budgeted()
+        after = count_tokens(prompt)
+        elapsed = best_time(budgeted)
+        print(f"{section:<12} 기존 {before:5d}  들여쓰기 정리만 {compacted:5d}  예산 적용 {after:5d} "
+              f"({after / before - 1:+.0%})  프롬프트 생성 {elapsed:6.2f}ms")
+        if args.show:
+            print(prompt + "\n")
+
+
+if __name__ == "__main__":
+    main()
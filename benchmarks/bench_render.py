@@ -0,0 +1,143 @@
+# 뉴스레터 HTML 렌더링 벤치마크
+# 무작위 섹션 콘텐츠로 AIDT 뉴스레터 여러 호를 배치로 렌더링해
+#   - 미리 컴파일한 템플릿 (html_template.render_aidt_newsletter)
+#   - 템플릿을 옮기기 전의 f-문자열 함수 (git 기록의 streamlit_app.generate_combined_html_template)
+# 의 초당 렌더링 수, 한 호의 크기, 템플릿을 컴파일하는 시간을 비교하고, 두 결과의 내용이 같은지(공백과 주석 제외) 확인합니다.
+# git 기록을 읽을 수 없으면 미리 컴파일한 템플릿만 측정합니다.
+# --email을 주면 이메일용 변환(email_html.prepare_email_html)의 호당 시간과 크기, 예산 초과 호 수도 측정합니다.
+#
+#   python benchmarks/bench_render.py [--issues 5000] [--section-size 3000] [--legacy-ref <커밋>] [--email]
+import argparse
+import ast
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from email_html import EMAIL_SIZE_BUDGET, prepare_email_html
+from html_template import AIDT_DEFAULTS, compile_template, render_aidt_newsletter, TEMPLATE_DIR
+
+HIGHLIGHT = {
+    "title": "중부Infra AT/DT 뉴스레터 개시",
+    "subtitle": "AI 활용법을 매주 전해드립니다",
+    "link_url": "https://example.com/highlight",
+    "link_text": "자세히 보기 →",
+}
+
+
+def make_issue(rng, section_size):
+    """섹션별 HTML 콘텐츠를 만듭니다. 글로벌/국내 뉴스 섹션은 없을 수도 있습니다."""
+    content = {}
+    for key in AIDT_DEFAULTS:
+        if key in ("main_news", "naver_news") and rng.random() < 0.2:
+            continue
+        paragraphs = []
+        size = 0
+        while size < section_size:
+            text = "".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(40, 120)))
+            paragraphs.append(f"<p>{text}</p>")
+            size += len(text) + 7
+        content[key] = f"<h2>{key}</h2>\n" + "\n".join(paragraphs)
+    return content
+
+
+def legacy_ref():
+    """템플릿을 옮기기 바로 전 커밋을 찾습니다."""
+    added = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--", "html_template.py"],
+                           cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+    return f"{added[-1]}^" if added else "HEAD"
+
+
+def load_legacy(ref):
+    """ref 시점의 streamlit_app.generate_combined_html_template을 불러옵니다. 읽을 수 없으면 None입니다."""
+    try:
+        ref = ref or legacy_ref()
+        source = subprocess.run(["git", "show", f"{ref}:streamlit_app.py"],
+                                cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.FunctionDef) and node.name == "generate_combined_html_template":
+            namespace = {"datetime": datetime}
+            exec(ast.get_source_segment(source, node), namespace)
+            return namespace[node.name]
+    return None
+
+
+def normalize(html):
+    """주석과 들여쓰기, 빈 줄을 뺀 줄 목록"""
+    html = re.sub(r"<!--.*?-->", "", html, flags=re.S)
+    return [line.strip() for line in html.split("\n") if line.strip()]
+
+
+def batch_rate(render, issues, repeat):
+    """issues를 모두 렌더링하는 가장 빠른 시간으로 초당 렌더링 수를 구합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for issue_number, content in enumerate(issues, 1):
+            render(content, issue_number)
+        best = min(best, time.perf_counter() - started)
+    return len(issues) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="뉴스레터 HTML 렌더링 벤치마크")
+    parser.add_argument("--issues", type=int, default=5000, help="배치로 렌더링할 호 수")
+    parser.add_argument("--section-size", type=int, default=3000, help="섹션 콘텐츠 길이 (문자 수)")
+    parser.add_argument("--repeat", type=int, default=3, help="배치 반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--legacy-ref", default="", help="비교할 f-문자열 함수가 있는 git 커밋 (기본: 템플릿을 옮기기 전)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--email", action="store_true", help="이메일용 변환 시간과 크기도 측정")
+    parser.add_argument("--email-budget", type=int, default=EMAIL_SIZE_BUDGET, help="이메일 크기 예산 (바이트)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    issues = [make_issue(rng, args.section_size) for _ in range(args.issues)]
+    date = "2025년 03월 10일"
+    year = datetime.now().year
+
+    with open(os.path.join(TEMPLATE_DIR, "aidt_newsletter.html"), encoding="utf-8") as f:
+        source = f.read()
+    started = time.perf_counter()
+    compile_template(source, "aidt_newsletter.html")
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    renderers = {"컴파일 템플릿": lambda content, number: render_aidt_newsletter(content, number, date, HIGHLIGHT, year=year)}
+    legacy = load_legacy(args.legacy_ref)
+    if legacy is None:
+        print("git 기록에서 f-문자열 함수를 찾지 못해 컴파일 템플릿만 측정합니다.")
+    else:
+        renderers["f-문자열 (기존)"] = lambda content, number: legacy(content, number, date, HIGHLIGHT)
+        same = all(normalize(legacy(content, number, date, HIGHLIGHT)) ==
+                   normalize(render_aidt_newsletter(content, number, date, HIGHLIGHT))
+                   for number, content in enumerate(issues[:50], 1))
+        print(f"f-문자열 함수와 내용 일치 (공백/주석 제외, 50개 호): {'예' if same else '아니오'}")
+
+    print(f"== AIDT 뉴스레터 {args.issues}개 호 배치 렌더링 (섹션 약 {args.section_size}자, 템플릿 컴파일 {compile_ms:.2f}ms) ==")
+    for label, render in renderers.items():
+        rate = batch_rate(render, issues, args.repeat)
+        size = sum(len(render(content, number).encode("utf-8")) for number, content in enumerate(issues[:100], 1)) / min(100, len(issues))
+        print(f"{label:<14} 초당 {rate:>10,.0f}개 호  (호당 {1e6 / rate:6.1f}µs, 평균 {size / 1024:5.1f}KB)")
+
+    if args.email:
+        sample = issues[:min(len(issues), 500)]
+        rendered = [render_aidt_newsletter(content, number, date, HIGHLIGHT, year=year)
+                    for number, content in enumerate(sample, 1)]
+        reports = [prepare_email_html(html, args.email_budget) for html in rendered]
+        times = sorted(report["elapsed_ms"] for report in reports)
+        over = sum(not report["within_budget"] for report in reports)
+        print(f"\n== 이메일용 변환 ({len(sample)}개 호, 예산 {args.email_budget / 1024:.0f}KB) ==")
+        print(f"호당 중앙값 {times[len(times) // 2]:.2f}ms, 최대 {times[-1]:.2f}ms, "
+              f"평균 {sum(r['original_bytes'] for r in reports) / len(reports) / 1024:.1f}KB → "
+              f"{sum(r['bytes'] for r in reports) / len(reports) / 1024:.1f}KB, 예산 초과 {over}개 호")
+
+
+if __name__ == "__main__":
+    main()
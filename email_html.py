@@ -0,0 +1,350 @@
+# 이메일용 HTML 변환
+# 렌더링한 뉴스레터 HTML을 메일로 보내기 좋게 바꾸는 후처리 단계입니다.
+#   - <style>의 CSS 규칙을 요소의 style 속성으로 옮김 (많은 메일 클라이언트가 <style>을 무시함)
+#   - 옮길 수 없는 규칙(:hover, :last-child, @media 등)은 문서에 쓰인 선택자만 <style>에 남기고, 쓰이지 않은 규칙은 버림
+#   - 주석과 들여쓰기 공백을 없애고 style 속성의 선언을 줄임 (<pre> 안은 그대로)
+#   - 결과 크기를 예산(NEWSLETTER_EMAIL_MAX_BYTES, 기본 102KB - Gmail이 이보다 큰 메일을 자름)과 비교
+# 외부 패키지 없이 정규식으로 태그를 나누며, 스타일시트는 CSS 문자열마다 한 번만 해석하고
+# 요소 경로(조상 태그와 클래스)별 계산 결과를 캐시하므로 이슈 하나에 몇 ms면 끝납니다.
+# 지원하는 선택자: 태그, .클래스, #아이디, *와 그 조합, 자손/자식(>) 결합자, 쉼표 목록
+import functools
+import os
+import re
+import threading
+import time
+from html import unescape
+
+from tracing import span
+
+# 이메일 크기 예산 (바이트, 환경 변수로 변경 가능)
+EMAIL_SIZE_BUDGET = int(os.environ.get("NEWSLETTER_EMAIL_MAX_BYTES", 102 * 1024))
+
+# 닫는 태그가 없는 요소
+VOID_ELEMENTS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"})
+# 앞뒤 공백을 없애도 표시가 바뀌지 않는 블록 요소
+BLOCK_ELEMENTS = frozenset({
+    "html", "head", "body", "title", "meta", "link", "style", "div", "p", "h1", "h2", "h3", "h4", "h5", "h6",
+    "ul", "ol", "li", "table", "thead", "tbody", "tr", "td", "th", "br", "hr", "blockquote", "pre", "section",
+})
+# 공백을 그대로 두는 요소
+PRESERVE_ELEMENTS = frozenset({"pre", "textarea"})
+
+_STYLE_BLOCK = re.compile(r"<style\b[^>]*>(.*?)</style\s*>", re.S | re.I)
+_TOKEN = re.compile(r"<!--.*?-->|<[!/]?[a-zA-Z][^>]*>", re.S)
+_TAG_NAME = re.compile(r"<(/?)([a-zA-Z][\w:-]*)")
+_ATTRIBUTE = r"""\s{name}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))"""
+_CLASS_ATTRIBUTE = re.compile(_ATTRIBUTE.format(name="class"), re.I)
+_ID_ATTRIBUTE = re.compile(_ATTRIBUTE.format(name="id"), re.I)
+_STYLE_ATTRIBUTE = re.compile(_ATTRIBUTE.format(name="style"), re.I)
+_SPACES = re.compile(r"\s+")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_DECLARATION = re.compile(r"""([-\w]+)\s*:\s*((?:[^;"'(]|"[^"]*"|'[^']*'|\([^)]*\))+)""")
+_COMPOUND = re.compile(r"([>+~])|([^\s>+~]+)")
+_SIMPLE = re.compile(r"(\*|[a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)((?::{1,2}[\w-]+(?:\([^)]*\))?)*)$")
+
+
+def _parse_declarations(text):
+    """'속성: 값; ...'을 (속성, 값) 목록으로 나눕니다."""
+    return [(name.lower(), _SPACES.sub(" ", value.strip())) for name, value in _DECLARATION.findall(text)]
+
+
+def _format_declarations(declarations):
+    return ";".join(f"{name}:{value}" for name, value in declarations)
+
+
+def _parse_selector(selector):
+    """선택자를 ([(결합자, 태그, 아이디, 클래스 집합)], 특이도, 가상 클래스 유무)로 나눕니다. 지원하지 않으면 None입니다."""
+    parts = []
+    combinator = " "
+    pseudo = False
+    specificity = [0, 0, 0]
+    for match in _COMPOUND.finditer(selector):
+        if match.group(1):
+            if match.group(1) != ">":
+                return None
+            combinator = ">"
+            continue
+        simple = _SIMPLE.match(match.group(2))
+        if simple is None:
+            return None
+        tag = simple.group(1)
+        tag = None if tag in (None, "*") else tag.lower()
+        element_id = None
+        classes = set()
+        for token in re.findall(r"[.#][\w-]+", simple.group(2)):
+            if token[0] == "#":
+                element_id = token[1:]
+                specificity[0] += 1
+            else:
+                classes.add(token[1:])
+                specificity[1] += 1
+        if simple.group(3):
+            pseudo = True
+            specificity[1] += simple.group(3).count(":") - simple.group(3).count("::")
+        specificity[2] += tag is not None
+        parts.append((combinator, tag, element_id, frozenset(classes)))
+        combinator = " "
+    if not parts:
+        return None
+    return parts, tuple(specificity), pseudo
+
+
+def _matches(parts, index, path, position):
+    """parts[:index + 1]이 path[position] 요소와 그 조상에 맞는지 확인합니다."""
+    _, tag, element_id, classes = parts[index]
+    element_tag, element_id_value, element_classes = path[position]
+    if (tag is not None and tag != element_tag) or (element_id is not None and element_id != element_id_value) \
+            or not classes <= element_classes:
+        return False
+    if index == 0:
+        return True
+    if parts[index][0] == ">":
+        return position > 0 and _matches(parts, index - 1, path, position - 1)
+    return any(_matches(parts, index - 1, path, ancestor) for ancestor in range(position - 1, -1, -1))
+
+
+class _Stylesheet:
+    """해석한 스타일시트 - 요소에 옮길 규칙 색인과 <style>에 남길 규칙 목록"""
+
+    def __init__(self, css):
+        css = _CSS_COMMENT.sub("", css)
+        # 그대로 <style>에 남길 규칙 (@media 등, 지원하지 않는 선택자)과 문서에 쓰일 때만 남길 가상 클래스 규칙
+        self.kept_rules = []
+        self.residual = []
+        # 맨 오른쪽 선택자의 아이디/클래스/태그/전체(*)별 (선택자, 특이도, 순서, 선언 목록)
+        self._index = {}
+        order = 0
+        for match in re.finditer(r"(@[^{;]+\{(?:[^{}]*\{[^{}]*\})*[^{}]*\}|@[^{;]+;)|([^{}@]+)\{([^{}]*)\}", css):
+            if match.group(1):
+                self.kept_rules.append(_minify_css(match.group(1)))
+                continue
+            declarations = _parse_declarations(match.group(3))
+            for selector in match.group(2).split(","):
+                selector = _SPACES.sub(" ", selector.strip())
+                parsed = _parse_selector(selector) if selector else None
+                if parsed is None:
+                    if selector:
+                        self.kept_rules.append(f"{selector}{{{_format_declarations(declarations)}}}")
+                    continue
+                parts, specificity, pseudo = parsed
+                order += 1
+                if pseudo:
+                    # 요소에 옮길 수 없는 규칙은 가상 클래스를 뺀 선택자가 문서에 쓰일 때만 남김
+                    self.residual.append((parts, f"{selector}{{{_format_declarations(declarations)}}}"))
+                    continue
+                rule = (parts, specificity, order, declarations)
+                _, tag, element_id, classes = parts[-1]
+                if element_id is not None:
+                    key = ("#", element_id)
+                elif classes:
+                    key = (".", min(classes))
+                else:
+                    key = ("", tag)
+                self._index.setdefault(key, []).append(rule)
+        # <style>에 남는 규칙이 쓰는 클래스 (요소의 class 속성에서 이 클래스만 남김)
+        self.kept_classes = frozenset(
+            name for parts, _ in self.residual for _, _, _, classes in parts for name in classes
+        ).union(*[frozenset(re.findall(r"\.([a-zA-Z_][\w-]*)", rule)) for rule in self.kept_rules])
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _candidates(self, tag, element_id, classes):
+        index = self._index
+        candidates = index.get(("", None), []) + index.get(("", tag), [])
+        if element_id is not None:
+            candidates = candidates + index.get(("#", element_id), [])
+        for name in classes:
+            candidates = candidates + index.get((".", name), [])
+        return candidates
+
+    def style_for(self, path):
+        """path(루트부터 (태그, 아이디, 클래스 집합) 목록)의 마지막 요소에 옮길 선언 목록을 반환합니다."""
+        cached = self._cache.get(path)
+        if cached is not None:
+            return cached
+        tag, element_id, classes = path[-1]
+        position = len(path) - 1
+        matched = [rule for rule in self._candidates(tag, element_id, classes)
+                   if _matches(rule[0], len(rule[0]) - 1, path, position)]
+        matched.sort(key=lambda rule: (rule[1], rule[2]))
+        declarations = {}
+        important = {}
+        for _, _, _, rule_declarations in matched:
+            for name, value in rule_declarations:
+                if value.endswith("!important"):
+                    important[name] = value
+                else:
+                    declarations.pop(name, None)
+                    declarations[name] = value
+        declarations.update(important)
+        result = tuple(declarations.items())
+        with self._lock:
+            self._cache[path] = result
+        return result
+
+    def used_residual(self, paths):
+        """문서에 쓰인 요소 경로에 맞는 <style>에 남길 규칙 목록"""
+        kept = []
+        for parts, text in self.residual:
+            if any(_matches(parts, len(parts) - 1, path, len(path) - 1) for path in paths):
+                kept.append(text)
+        return kept
+
+
+def _minify_css(css):
+    css = _SPACES.sub(" ", _CSS_COMMENT.sub("", css)).strip()
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", css).replace(";}", "}")
+
+
+@functools.lru_cache(maxsize=16)
+def compile_stylesheet(css):
+    """CSS를 해석합니다. 같은 CSS는 다시 해석하지 않습니다."""
+    return _Stylesheet(css)
+
+
+def _attribute_value(pattern, tag_text):
+    match = pattern.search(tag_text)
+    if match is None:
+        return None
+    return next(group for group in match.groups() if group is not None)
+
+
+def _with_style(tag_text, declarations, match):
+    """태그의 style 속성을 declarations로 바꿉니다."""
+    if match is not None:
+        tag_text = tag_text[:match.start()] + tag_text[match.end():]
+    if not declarations:
+        return tag_text
+    style = _format_declarations(declarations).replace("&", "&amp;").replace('"', "&quot;")
+    end = len(tag_text) - (2 if tag_text.endswith("/>") else 1)
+    return f'{tag_text[:end].rstrip()} style="{style}"{tag_text[end:]}'
+
+
+def inline_css(html):
+    """<style>의 CSS를 요소의 style 속성으로 옮기고 공백을 줄인 HTML을 반환합니다."""
+    css = "\n".join(_STYLE_BLOCK.findall(html))
+    stylesheet = compile_stylesheet(css) if css.strip() else None
+    html = _STYLE_BLOCK.sub("", html)
+
+    out = []
+    stack = []          # 열린 요소의 태그 이름
+    path = ()           # 열린 요소의 (태그, 아이디, 클래스 집합)
+    paths = set()
+    preserve = 0
+    head_end = None
+    previous_block = True
+    position = 0
+    tokens = list(_TOKEN.finditer(html))
+    for index, token in enumerate(tokens + [None]):
+        text = html[position:token.start() if token is not None else len(html)]
+        if text:
+            if preserve:
+                out.append(text)
+            else:
+                text = _SPACES.sub(" ", text)
+                next_tag = _TAG_NAME.match(token.group()) if token is not None else None
+                if previous_block:
+                    text = text.lstrip()
+                if token is None or (next_tag is not None and next_tag.group(2).lower() in BLOCK_ELEMENTS):
+                    text = text.rstrip()
+                if text and out and out[-1].endswith(" ") and text.startswith(" "):
+                    text = text[1:]
+                if text:
+                    out.append(text)
+                    previous_block = False
+        if token is None:
+            break
+        position = token.end()
+        tag_text = token.group()
+        if tag_text.startswith("<!--"):
+            if tag_text.startswith("<!--[if"):
+                out.append(tag_text)
+            continue
+        name_match = _TAG_NAME.match(tag_text)
+        if name_match is None:
+            out.append(tag_text)
+            continue
+        closing, name = name_match.group(1), name_match.group(2).lower()
+        if closing:
+            if name in stack:
+                while stack:
+                    popped = stack.pop()
+                    path = path[:-1]
+                    if popped in PRESERVE_ELEMENTS:
+                        preserve -= 1
+                    if popped == name:
+                        break
+            if name == "head":
+                head_end = len(out)
+            out.append(tag_text)
+            previous_block = name in BLOCK_ELEMENTS
+            continue
+
+        class_match = _CLASS_ATTRIBUTE.search(tag_text)
+        classes = frozenset(next(g for g in class_match.groups() if g is not None).split()) if class_match else frozenset()
+        signature = (name, _attribute_value(_ID_ATTRIBUTE, tag_text), classes)
+        if class_match is not None and stylesheet is not None:
+            # 스타일을 옮겼으므로 <style>에 남는 규칙이 쓰지 않는 클래스는 뺌
+            kept = " ".join(sorted(classes & stylesheet.kept_classes))
+            tag_text = tag_text[:class_match.start()] + (f' class="{kept}"' if kept else "") + tag_text[class_match.end():]
+        element_path = path + (signature,)
+        paths.add(element_path)
+        style_match = _STYLE_ATTRIBUTE.search(tag_text)
+        declarations = stylesheet.style_for(element_path) if stylesheet is not None else ()
+        if style_match is not None:
+            inline = _parse_declarations(unescape(next(g for g in style_match.groups() if g is not None)))
+            merged = dict(declarations)
+            for key, value in inline:
+                if not merged.get(key, "").endswith("!important"):
+                    merged.pop(key, None)
+                    merged[key] = value
+            declarations = tuple(merged.items())
+        if declarations or style_match is not None:
+            tag_text = _with_style(tag_text, declarations, style_match)
+        out.append(tag_text)
+        previous_block = name in BLOCK_ELEMENTS
+        if name not in VOID_ELEMENTS and not tag_text.endswith("/>"):
+            stack.append(name)
+            path = element_path
+            if name in PRESERVE_ELEMENTS:
+                preserve += 1
+
+    if stylesheet is not None:
+        residual = stylesheet.kept_rules + stylesheet.used_residual(paths)
+        if residual:
+            style = "<style>" + "".join(residual) + "</style>"
+            if head_end is None:
+                out.insert(0, style)
+            else:
+                out.insert(head_end, style)
+    return "".join(out)
+
+
+def prepare_email_html(html, budget=None):
+    """뉴스레터 HTML을 이메일용으로 변환하고 크기 보고와 함께 반환합니다.
+
+    반환값: {"html", "bytes", "original_bytes", "budget", "within_budget", "elapsed_ms"}
+    """
+    if budget is None:
+        budget = EMAIL_SIZE_BUDGET
+    started = time.perf_counter()
+    with span("email html", kind="render") as email_span:
+        email_html = inline_css(html)
+        size = len(email_html.encode("utf-8"))
+        if email_span is not None:
+            email_span.set(bytes=size, budget=budget)
+    return {
+        "html": email_html,
+        "bytes": size,
+        "original_bytes": len(html.encode("utf-8")),
+        "budget": budget,
+        "within_budget": size <= budget,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def format_size_report(report):
+    """크기 보고를 한 줄로 만듭니다."""
+    status = "예산 이내" if report["within_budget"] else "예산 초과 - 메일 클라이언트에서 잘릴 수 있음"
+    return (f"이메일 HTML {report['bytes'] / 1024:.1f}KB / 예산 {report['budget'] / 1024:.0f}KB ({status}, "
+            f"원본 {report['original_bytes'] / 1024:.1f}KB, 변환 {report['elapsed_ms']:.1f}ms)")
@@ -0,0 +1,239 @@
+# 미리 컴파일하는 HTML 템플릿
+# templates/의 HTML 템플릿과 static/의 CSS를 앱을 불러올 때 한 번만 읽어 렌더링 함수로 컴파일해 두고,
+# 렌더링할 때는 자리(섹션 콘텐츠, 호수, 날짜 등)만 채웁니다.
+# 고정된 부분(마크업과 CSS)은 함수의 상수가 되므로 렌더링 비용은 결과 문자열을 이어 붙이는 것뿐이며,
+# 배치 생성에서 초당 십만 개가 넘는 호를 렌더링합니다. (benchmarks/bench_render.py 참고)
+#
+# 템플릿 문법 (Mustache 일부)
+#   {{이름}}                     값을 그대로 넣음 (HTML 이스케이프하지 않음 - 섹션 콘텐츠는 이미 HTML)
+#   {{#이름}} ... {{/이름}}       이름의 값이 None이 아닐 때만 넣는 블록 (태그만 있는 줄은 줄째 없앰)
+import functools
+import os
+import re
+from datetime import datetime
+
+from tracing import span
+
+# 템플릿과 정적 파일 위치
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+
+# 블록 태그만 있는 줄(앞뒤 공백과 줄바꿈 포함) 또는 일반 태그
+_TAG = re.compile(
+    r"^[ \t]*\{\{\s*(?P<line_kind>[#/])\s*(?P<line_name>\w+)\s*\}\}[ \t]*(?:\n|\Z)"
+    r"|\{\{\s*(?P<kind>[#/]?)\s*(?P<name>\w+)\s*\}\}",
+    re.MULTILINE,
+)
+
+
+class TemplateError(ValueError):
+    """템플릿 문법 오류나 채우지 않은 자리가 있을 때 발생하는 오류"""
+
+
+def _parse(source, name):
+    """템플릿을 (문자열 | ("slot", 이름) | ("block", 이름, 자식 노드 목록)) 노드 목록으로 나눕니다."""
+    root = []
+    stack = [(None, root)]
+    position = 0
+    for match in _TAG.finditer(source):
+        nodes = stack[-1][1]
+        if match.start() > position:
+            nodes.append(source[position:match.start()])
+        position = match.end()
+        kind = match.group("line_kind") or match.group("kind")
+        tag = match.group("line_name") or match.group("name")
+        if kind == "#":
+            children = []
+            nodes.append(("block", tag, children))
+            stack.append((tag, children))
+        elif kind == "/":
+            if stack[-1][0] != tag:
+                raise TemplateError(f"{name}: {{{{/{tag}}}}}와 짝이 맞는 블록 시작이 없습니다.")
+            stack.pop()
+        else:
+            nodes.append(("slot", tag))
+    if len(stack) > 1:
+        raise TemplateError(f"{name}: {{{{#{stack[-1][0]}}}}} 블록이 닫히지 않았습니다.")
+    if position < len(source):
+        stack[-1][1].append(source[position:])
+    return root
+
+
+def _bind(nodes, values):
+    """values에 있는 자리와 블록을 고정된 문자열로 바꾼 노드 목록을 반환합니다."""
+    bound = []
+    for node in nodes:
+        if isinstance(node, str):
+            bound.append(node)
+        elif node[1] not in values:
+            bound.append(node if node[0] == "slot" else ("block", node[1], _bind(node[2], values)))
+        elif node[0] == "slot":
+            bound.append(str(values[node[1]]))
+        elif values[node[1]] is not None:
+            bound.extend(_bind(node[2], values))
+    return bound
+
+
+def _merge_literals(nodes):
+    """이웃한 문자열 노드를 하나로 합칩니다."""
+    merged = []
+    for node in nodes:
+        if isinstance(node, str):
+            if merged and isinstance(merged[-1], str):
+                merged[-1] += node
+            elif node:
+                merged.append(node)
+        elif node[0] == "block":
+            merged.append(("block", node[1], _merge_literals(node[2])))
+        else:
+            merged.append(node)
+    return merged
+
+
+def _generate(nodes, constants, lines, indent, target):
+    """nodes를 f-문자열로 이어 붙여 target 변수에 넣는 파이썬 코드 줄을 lines에 추가합니다.
+    고정된 문자열은 constants에 넣고 이름으로 참조하며, 블록은 값이 None이 아닐 때만 만듭니다."""
+    pieces = []
+    for node in nodes:
+        if isinstance(node, str):
+            name = f"_c{len(constants)}"
+            constants[name] = node
+            pieces.append("{" + name + "}")
+        elif node[0] == "slot":
+            pieces.append("{_v[%r]}" % node[1])
+        else:
+            block = f"_b{len(lines)}"
+            lines.append(f"{indent}{block} = ''")
+            lines.append(f"{indent}if _v[{node[1]!r}] is not None:")
+            _generate(node[2], constants, lines, indent + "    ", block)
+            pieces.append("{" + block + "}")
+    lines.append(f"{indent}{target} = f{''.join(pieces)!r}" if pieces else f"{indent}{target} = ''")
+
+
+class CompiledTemplate:
+    """템플릿을 파이썬 함수로 컴파일해 두고 자리만 채우는 템플릿
+    고정된 부분은 함수의 상수가 되고, 렌더링은 f-문자열 하나를 평가하는 것과 같습니다."""
+
+    def __init__(self, nodes, name="<template>"):
+        self.name = name
+        self._nodes = _merge_literals(nodes)
+        constants = {}
+        lines = ["def _render(_v):"]
+        _generate(self._nodes, constants, lines, "    ", "_out")
+        lines.append("    return _out")
+        exec(compile("\n".join(lines), f"<template {name}>", "exec"), constants)
+        self._function = constants["_render"]
+
+    @property
+    def slots(self):
+        """채워야 하는 자리와 블록 이름 집합"""
+        names = set()
+        stack = [self._nodes]
+        while stack:
+            for node in stack.pop():
+                if isinstance(node, str):
+                    continue
+                names.add(node[1])
+                if node[0] == "block":
+                    stack.append(node[2])
+        return names
+
+    def bind(self, **values):
+        """values의 자리와 블록을 고정한 새 템플릿을 반환합니다. (CSS처럼 렌더링마다 같은 값을 미리 채울 때 사용)"""
+        return CompiledTemplate(_bind(self._nodes, values), self.name)
+
+    def render(self, **values):
+        """자리를 values로 채운 문자열을 반환합니다. 값이 None인 블록은 넣지 않습니다."""
+        return self._render(values)
+
+    def _render(self, values):
+        try:
+            return self._function(values)
+        except KeyError as e:
+            raise TemplateError(f"{self.name}: {e.args[0]} 자리에 넣을 값이 없습니다.") from None
+
+
+def compile_template(source, name="<template>"):
+    """템플릿 문자열을 컴파일합니다."""
+    return CompiledTemplate(_parse(source, name), name)
+
+
+@functools.lru_cache(maxsize=None)
+def read_static(filename):
+    """static/의 파일(CSS 등)을 읽습니다. 한 번 읽은 파일은 다시 읽지 않습니다."""
+    with open(os.path.join(STATIC_DIR, filename), encoding="utf-8") as f:
+        return f.read()
+
+
+def load_template(filename, **static_values):
+    """templates/의 템플릿을 읽어 컴파일하고 static_values의 자리를 미리 채운 템플릿을 반환합니다."""
+    with open(os.path.join(TEMPLATE_DIR, filename), encoding="utf-8") as f:
+        template = compile_template(f.read(), filename)
+    return template.bind(**static_values) if static_values else template
+
+
+# 뉴스레터 템플릿 - 앱을 불러올 때 한 번 컴파일하고 CSS를 미리 채워 둠
+_AIDT_TEMPLATE = load_template("aidt_newsletter.html")
+AIDT_NEWSLETTER = _AIDT_TEMPLATE.bind(css=read_static("aidt_newsletter.css"), extra_sections="")
+# 스트림릿 챌린지 섹션을 덧붙이는 AIDT 뉴스레터 (streamlit_app_v3)
+AIDT_CHALLENGE_NEWSLETTER = _AIDT_TEMPLATE.bind(
+    css=read_static("aidt_newsletter.css") + read_static("streamlit_challenge.css")
+)
+LEARNING_NEWSLETTER = load_template("learning_newsletter.html", css=read_static("learning_newsletter.css"))
+
+# 섹션 콘텐츠가 없을 때 넣을 값 (None인 main_news, naver_news, streamlit_news는 섹션째 뺌)
+AIDT_DEFAULTS = {
+    "main_news": None,
+    "naver_news": None,
+    "aidt_tips": "<p>AT/DT 팁을 불러올 수 없습니다.</p>",
+    "ai_use_case": "<p>AI 활용사례를 불러올 수 없습니다.</p>",
+    "success_story": "<p>성공 사례를 불러올 수 없습니다.</p>",
+}
+LEARNING_DEFAULTS = {
+    "study_materials": "<p>학습 자료를 찾을 수 없습니다.</p>",
+    "learning_tip": "<p>학습 팁을 불러올 수 없습니다.</p>",
+    "project_ideas": "<p>프로젝트 아이디어를 불러올 수 없습니다.</p>",
+    "streamlit_news": None,
+}
+
+
+def render_aidt_newsletter(newsletter_content, issue_number, date, highlight_settings, extra_sections=None, year=None):
+    """AIDT 뉴스레터 HTML을 렌더링합니다. extra_sections가 있으면 스트림릿 챌린지 템플릿에 덧붙입니다.
+    배치로 여러 호를 만들 때는 year를 넘겨 호마다 현재 시각을 읽지 않게 할 수 있습니다."""
+    with span("render aidt_newsletter", kind="render"):
+        return _render_aidt_newsletter(newsletter_content, issue_number, date, highlight_settings, extra_sections, year)
+
+
+def _render_aidt_newsletter(newsletter_content, issue_number, date, highlight_settings, extra_sections, year):
+    values = AIDT_DEFAULTS.copy()
+    values.update(newsletter_content)
+    values["issue_number"] = issue_number
+    values["date"] = date
+    values["highlight_title"] = highlight_settings['title']
+    values["highlight_subtitle"] = highlight_settings['subtitle']
+    values["highlight_link_url"] = highlight_settings['link_url']
+    values["highlight_link_text"] = highlight_settings['link_text']
+    values["year"] = year or datetime.now().year
+    if extra_sections is None:
+        return AIDT_NEWSLETTER._render(values)
+    values["extra_sections"] = extra_sections
+    return AIDT_CHALLENGE_NEWSLETTER._render(values)
+
+
+def render_learning_newsletter(newsletter_content, week_number, date, title, level, topics, year=None):
+    """스트림릿 학습 뉴스레터 HTML을 렌더링합니다."""
+    with span("render learning_newsletter", kind="render"):
+        return _render_learning_newsletter(newsletter_content, week_number, date, title, level, topics, year)
+
+
+def _render_learning_newsletter(newsletter_content, week_number, date, title, level, topics, year):
+    values = LEARNING_DEFAULTS.copy()
+    values.update(newsletter_content)
+    values["week_number"] = week_number
+    values["date"] = date
+    values["title"] = title
+    values["level"] = level
+    values["topic_list"] = "".join(f"<li>{topic.get('korean_name', topic['name'])} ({topic['name']})</li>" for topic in topics)
+    values["year"] = year or datetime.now().year
+    return LEARNING_NEWSLETTER._render(values)
@@ -0,0 +1,205 @@
+# 비동기 HTTP 전송 계층
+# 호스트별로 keep-alive 연결 풀(가능하면 HTTP/2)을 하나씩 유지하고,
+# 모든 요청을 하나의 백그라운드 이벤트 루프에서 처리하여 연결을 재사용합니다.
+import asyncio
+import importlib.util
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+
+from rate_limiter import get_rate_limiter, provider_for_url
+from resilience import (
+    CIRCUIT_FAILURE_STATUSES, RETRY_STATUSES, check_deadline, current_deadline, get_circuit_breaker,
+    remaining_time, retry_delay, should_retry, use_deadline
+)
+from tracing import current_span, span, use_span
+
+logger = logging.getLogger(__name__)
+
+# h2 패키지가 설치되어 있으면 HTTP/2 사용 (서버가 지원하지 않으면 HTTP/1.1로 자동 협상)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 호스트별 연결 풀 크기
+POOL_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60)
+
+# 기본 타임아웃 (초)
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+# 호스트 -> AsyncClient (이벤트 루프 스레드에서만 접근)
+_clients = {}
+
+# 이름 -> asyncio.Semaphore (이벤트 루프 스레드에서만 접근)
+_semaphores = {}
+
+# 요청 키 -> 진행 중인 asyncio.Task (이벤트 루프 스레드에서만 접근)
+_in_flight = {}
+
+# 새로 만드는 연결 풀에 사용할 httpx 전송 계층 (None이면 실제 네트워크, set_transport 참고)
+_transport = None
+
+
+def get_event_loop():
+    """연결 풀을 유지하는 백그라운드 이벤트 루프를 반환합니다."""
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="http-client-loop", daemon=True)
+            _loop_thread.start()
+    return _loop
+
+
+async def _run_in_context(coro, deadline, parent_span):
+    with use_deadline(deadline), use_span(parent_span):
+        return await coro
+
+
+def submit(coro):
+    """코루틴을 백그라운드 이벤트 루프에 예약하고 concurrent.futures.Future를 바로 반환합니다.
+
+    여러 요청을 한꺼번에 보낸 뒤 끝나는 순서대로 결과를 받을 때 사용합니다.
+    호출한 쪽의 실행 마감 시간(resilience.deadline_scope)과 현재 추적 구간(tracing)은 코루틴에도 그대로 적용됩니다.
+    """
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("이벤트 루프 스레드 안에서는 run_sync/submit을 호출할 수 없습니다. await를 사용하세요.")
+    deadline = current_deadline()
+    parent_span = current_span()
+    if deadline is not None or parent_span is not None:
+        coro = _run_in_context(coro, deadline, parent_span)
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_sync(coro):
+    """코루틴을 백그라운드 이벤트 루프에서 실행하고 결과를 기다립니다.
+
+    Streamlit 스크립트나 스레드 풀 워커 같은 동기 코드에서 비동기 fetcher를 호출할 때 사용합니다.
+    """
+    return submit(coro).result()
+
+
+def get_semaphore(name, limit):
+    """이름별로 프로세스 전체에서 공유되는 동시 요청 제한 세마포어를 반환합니다.
+
+    이벤트 루프의 코루틴 안에서만 호출해야 하며, 같은 이름은 처음 호출할 때의 limit으로 만들어집니다.
+    """
+    semaphore = _semaphores.get(name)
+    if semaphore is None:
+        semaphore = _semaphores[name] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+async def single_flight(key, factory):
+    """같은 key의 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 함께 기다립니다.
+
+    진행 중인 요청이 없으면 factory()로 코루틴을 만들어 실행합니다. 한 호출자가 취소되어도
+    같은 요청을 기다리는 다른 호출자에게는 영향을 주지 않습니다.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+def get_client(url):
+    """URL의 호스트에 해당하는 공유 AsyncClient를 반환합니다."""
+    host = urlsplit(url).netloc
+    client = _clients.get(host)
+    if client is None:
+        client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=POOL_LIMITS, timeout=DEFAULT_TIMEOUT,
+                                   transport=_transport)
+        _clients[host] = client
+    return client
+
+
+def request_timeout():
+    """기본 타임아웃을 실행 마감까지 남은 시간에 맞춰 줄인 타임아웃을 반환합니다."""
+    read = remaining_time(DEFAULT_TIMEOUT.read)
+    return httpx.Timeout(read, connect=min(DEFAULT_TIMEOUT.connect, read))
+
+
+async def async_get(url, params=None, headers=None):
+    """호스트별 공유 연결 풀을 사용해 GET 요청을 보냅니다.
+
+    속도 제한 대상 API(rate_limiter.PROVIDER_HOSTS)는 보내기 전에 공급자의 회로가 닫혀 있는지 확인하고
+    (열려 있으면 CircuitOpenError), 일일 할당량과 토큰 버킷 승인을 받습니다.
+    재시도할 상태 코드(resilience.RETRY_STATUSES)나 연결 오류는 백오프 후 다시 시도하며,
+    더 시도할 수 없으면 마지막 응답을 반환하거나(상태 확인은 호출한 쪽에서) 마지막 오류를 발생시킵니다.
+    추적 중이면 재시도와 속도 제한 대기를 포함한 요청 전체를 fetch 구간으로 기록합니다.
+    """
+    host = urlsplit(url).netloc
+    with span(f"GET {host}", kind="fetch", url=url.split("?", 1)[0]) as fetch_span:
+        response = await _get_with_retries(url, params, headers)
+        if fetch_span is not None:
+            fetch_span.set(status=response.status_code)
+        return response
+
+
+async def _get_with_retries(url, params, headers):
+    provider, units = provider_for_url(url)
+    breaker = get_circuit_breaker(provider) if provider is not None else None
+    attempt = 0
+    while True:
+        attempt += 1
+        if provider is not None:
+            # 마감 시간이 지났거나 회로가 열려 있으면 할당량을 쓰기 전에 중단
+            check_deadline()
+            breaker.before_call()
+            await get_rate_limiter().acquire_async(provider, units)
+        try:
+            response = await get_client(url).get(url, params=params, headers=headers, timeout=request_timeout())
+        except httpx.TransportError as e:
+            if breaker is not None:
+                breaker.record_failure()
+            delay = retry_delay(attempt)
+            if not should_retry(attempt, delay):
+                raise
+            logger.warning(f"{urlsplit(url).netloc} 연결 오류로 {delay:.1f}초 후 다시 시도합니다 ({attempt}회 실패): {e}")
+        else:
+            if breaker is not None:
+                if response.status_code in CIRCUIT_FAILURE_STATUSES:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            delay = retry_delay(attempt, response.headers)
+            if not should_retry(attempt, delay):
+                return response
+            logger.warning(f"{urlsplit(url).netloc} 응답 {response.status_code}로 {delay:.1f}초 후 다시 시도합니다 ({attempt}회 실패)")
+        await asyncio.sleep(delay)
+
+
+def get(url, params=None, headers=None):
+    """async_get의 동기 버전입니다."""
+    return run_sync(async_get(url, params=params, headers=headers))
+
+
+async def _close_clients():
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def close():
+    """열려 있는 모든 연결 풀을 닫습니다. 배치 실행 종료 시 호출합니다."""
+    if _loop is not None:
+        run_sync(_close_clients())
+
+
+def set_transport(transport):
+    """이후의 모든 요청을 transport(httpx.AsyncBaseTransport, 예: httpx.MockTransport)로 보냅니다.
+    녹화한 응답을 재생하는 오프라인 벤치마크용이며, None이면 실제 네트워크로 되돌립니다.
+    열려 있는 연결 풀은 닫으므로 다음 요청부터 적용됩니다."""
+    global _transport
+    close()
+    _transport = transport
@@ -0,0 +1,98 @@
+# 뉴스레터 이슈 저장소
+# 생성된 섹션 콘텐츠(newsletter_content)를 버전이 붙은 JSON 파일로 저장하고 불러옵니다.
+# HTML 템플릿은 저장된 콘텐츠로 언제든 다시 렌더링할 수 있으므로,
+# 호수나 하이라이트 박스처럼 표시 설정만 바뀐 경우 수집/생성을 다시 하지 않아도 됩니다.
+import json
+import os
+import re
+from datetime import datetime
+
+# 이슈 파일 저장 위치 (환경 변수로 변경 가능)
+ISSUE_DIR = os.environ.get(
+    "NEWSLETTER_ISSUE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "issues")
+)
+
+# 이슈 파일 형식 버전 - 형식이 바뀌면 올리고 load_issue에서 호환성을 확인
+ARTIFACT_VERSION = 1
+
+# 이슈 파일 이름 - issue-{호수}-r{개정 번호}.json
+ISSUE_FILE_PATTERN = re.compile(r"^issue-(\d+)-r(\d+)\.json$")
+
+
+def build_issue_artifact(sections, issue_number, date, inputs=None, section_run=None):
+    """생성된 섹션 콘텐츠와 생성 입력값으로 이슈 아티팩트(딕셔너리)를 만듭니다.
+    section_run(SectionRunResult)이 있으면 섹션별 소요 시간과 오류도 함께 기록합니다."""
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "issue_number": issue_number,
+        "date": date,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "inputs": dict(inputs or {}),
+        "sections": dict(sections),
+        "timings": None,
+        "section_times": {},
+        "wall_time": None,
+        "errors": {},
+    }
+    if section_run is not None:
+        artifact["timings"] = section_run.format_report()
+        artifact["section_times"] = {name: section_run.duration(name) for name in section_run.timings}
+        artifact["wall_time"] = section_run.wall_time
+        artifact["errors"] = {name: str(error) for name, error in section_run.errors.items()}
+    return artifact
+
+
+def _revisions(issue_number, directory):
+    revisions = []
+    if os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            match = ISSUE_FILE_PATTERN.match(filename)
+            if match and int(match.group(1)) == issue_number:
+                revisions.append(int(match.group(2)))
+    return revisions
+
+
+def save_issue(artifact, directory=ISSUE_DIR):
+    """이슈 아티팩트를 새 개정 번호로 저장하고 파일 경로를 반환합니다."""
+    os.makedirs(directory, exist_ok=True)
+    issue_number = artifact["issue_number"]
+    revision = max(_revisions(issue_number, directory), default=0) + 1
+
+    # 여러 스레드/프로세스가 같은 호수를 동시에 저장해도 개정 번호가 겹치지 않도록 파일을 배타적으로 선점
+    while True:
+        path = os.path.join(directory, f"issue-{issue_number:03d}-r{revision:02d}.json")
+        try:
+            with open(path, "x", encoding="utf-8"):
+                pass
+            break
+        except FileExistsError:
+            revision += 1
+
+    # 쓰는 도중 중단되어도 빈 파일 외에 깨진 파일이 남지 않도록 임시 파일에 쓴 뒤 이름 변경
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+def load_issue(path):
+    """저장된 이슈 아티팩트를 불러옵니다. 지원하지 않는 형식 버전이면 ValueError를 발생시킵니다."""
+    with open(path, encoding="utf-8") as f:
+        artifact = json.load(f)
+    if artifact.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"지원하지 않는 이슈 파일 버전입니다: {artifact.get('version')} ({path})")
+    return artifact
+
+
+def list_issues(directory=ISSUE_DIR):
+    """저장된 이슈 파일 경로를 최신 호수, 최신 개정 순으로 반환합니다."""
+    if not os.path.isdir(directory):
+        return []
+    entries = []
+    for filename in os.listdir(directory):
+        match = ISSUE_FILE_PATTERN.match(filename)
+        if match:
+            entries.append((int(match.group(1)), int(match.group(2)), os.path.join(directory, filename)))
+    return [path for _, _, path in sorted(entries, reverse=True)]
@@ -0,0 +1,57 @@
+# 다중 키워드 매처
+# 카테고리별 키워드 목록을 모듈 로드 시 한 번만 소문자로 변환하고 중복 키워드를 합쳐
+# (키워드, 카테고리별 개수, 가중치 합) 표로 만들어 둡니다. 평가할 때는 표를 한 번 훑으며
+# 텍스트에 들어 있는 키워드의 카테고리별 개수나 가중치 합을 구합니다.
+#
+# Aho-Corasick 자동자도 검토했지만 순수 파이썬에서는 문자마다 상태를 옮기는 비용(문자당 약 100ns)이
+# 평가 대상(제목+설명 200자 안팎, 키워드 약 100개)에 대해 키워드별 C 수준 부분 문자열 검색보다 커서
+# 사용하지 않습니다. (benchmarks/bench_keywords.py 참고)
+
+
+class KeywordMatcher:
+    """카테고리별 키워드 목록을 미리 정리해 둔 매처 (키워드는 소문자로 비교)"""
+
+    def __init__(self, categories, weights=None):
+        """categories는 {카테고리: 키워드 목록}, weights는 {카테고리: 키워드 하나당 가중치}입니다.
+
+        같은 키워드가 여러 목록(또는 한 목록)에 여러 번 들어 있으면 그 횟수만큼 세고 가중치를 더합니다.
+        """
+        weights = weights or {}
+        counts = {}
+        for name, keywords in categories.items():
+            for keyword in keywords:
+                keyword_counts = counts.setdefault(keyword.lower(), {})
+                keyword_counts[name] = keyword_counts.get(name, 0) + 1
+
+        self.categories = tuple(categories)
+        self._entries = tuple(
+            (keyword, keyword_counts, sum(weights.get(name, 0) * n for name, n in keyword_counts.items()))
+            for keyword, keyword_counts in counts.items()
+        )
+        self._total_counts = tuple((keyword, sum(keyword_counts.values())) for keyword, keyword_counts, _ in self._entries)
+        self._weighted = tuple((keyword, weight) for keyword, _, weight in self._entries if weight)
+
+    def counts(self, text):
+        """텍스트(소문자)에 들어 있는 키워드 수를 카테고리별로 반환합니다."""
+        result = dict.fromkeys(self.categories, 0)
+        for keyword, keyword_counts, _ in self._entries:
+            if keyword in text:
+                for name, n in keyword_counts.items():
+                    result[name] += n
+        return result
+
+    def count(self, text):
+        """텍스트(소문자)에 들어 있는 키워드 수를 모든 카테고리에 걸쳐 반환합니다."""
+        total = 0
+        for keyword, n in self._total_counts:
+            if keyword in text:
+                total += n
+        return total
+
+    def score(self, text):
+        """텍스트(소문자)에 들어 있는 키워드의 가중치 합을 반환합니다."""
+        total = 0
+        for keyword, weight in self._weighted:
+            if keyword in text:
+                total += weight
+        return total
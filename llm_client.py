@@ -0,0 +1,243 @@
+# OpenAI 채팅 완성 호출 헬퍼
+# 모든 앱의 chat.completions.create 호출이 이 함수를 거치도록 하여
+# 스트리밍, 완성 캐시, 속도 제한, 프롬프트 들여쓰기 정리, 섹션별 모델 선택 등 공통 동작을 한 곳에서 처리합니다.
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import openai
+
+from model_routing import section_policy
+from prompt_budget import compact_prompt, count_tokens
+from rate_limiter import get_rate_limiter
+from resilience import (
+    CIRCUIT_FAILURE_STATUSES, RETRY_STATUSES, CircuitOpenError, check_deadline, get_circuit_breaker,
+    remaining_time, retry_delay, should_retry
+)
+from response_cache import get_response_cache
+from tracing import current_span, span
+
+logger = logging.getLogger(__name__)
+
+# 완성 결과를 저장하는 응답 캐시 소스 이름 (유효 시간은 response_cache.SOURCE_TTL 참고)
+LLM_CACHE_SOURCE = "llm"
+
+# 속도 제한 공급자 이름 (제한 값은 rate_limiter.PROVIDER_LIMITS 참고)
+LLM_PROVIDER = "openai"
+
+# 완성 요청 한 번의 최대 시간 (초) - 실행 마감 시간이 더 가까우면 그때까지로 줄임
+LLM_TIMEOUT = 120.0
+
+# 섹션 프롬프트를 JSON Lines로 기록할 파일 (설정하면 benchmarks/bench_models.py에서 모델 비교에 사용)
+PROMPT_LOG_PATH = os.environ.get("NEWSLETTER_PROMPT_LOG")
+
+# 다음 모델로 대체할 상태 코드 (없는 모델, 권한 없음, 재시도 후에도 계속된 429/5xx - 모델별 한도나 장애일 수 있음)
+FALLBACK_STATUSES = frozenset({403, 404}) | RETRY_STATUSES
+
+_prompt_log_lock = threading.Lock()
+
+
+def completion_cache_key(model, system_message, user_prompt, temperature, max_tokens=None):
+    """(모델, 시스템 메시지, 사용자 프롬프트, 온도, 최대 출력 토큰 수)의 해시로 완성 캐시 키를 만듭니다."""
+    parts = [model, system_message, user_prompt, temperature]
+    if max_tokens is not None:
+        parts.append(max_tokens)
+    payload = json.dumps(parts, ensure_ascii=False)
+    return "llm:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def create_chat_completion(client, system_message, user_prompt, model=None, temperature=None, on_delta=None,
+                           use_cache=True, force_refresh=False, section=None, max_tokens=None):
+    """채팅 완성을 요청하고 생성된 텍스트를 반환합니다.
+
+    on_delta가 주어지면 stream=True로 요청하고, 토큰 조각이 도착할 때마다 on_delta(조각)을 호출합니다.
+    use_cache가 참이면 같은 입력의 완성 결과를 디스크 캐시에서 재사용하며(이때 on_delta는 전체 텍스트로
+    한 번 호출됨), force_refresh가 참이면 캐시를 무시하고 새로 생성한 결과로 캐시를 갱신합니다.
+    호출은 OpenAI 속도 제한을 따르며, 일일 한도가 설정되어 있고 모두 사용했으면 QuotaExceededError가 발생합니다.
+    연결 오류와 429/5xx 응답은 백오프 후 다시 시도하고, 실행 마감 시간이 지나면 DeadlineExceededError가 발생합니다.
+    OpenAI 회로가 열려 있으면 호출하지 않고, 유효 시간이 지난 캐시라도 있으면 그것을 반환하며 없으면
+    CircuitOpenError가 발생합니다.
+    시스템 메시지와 사용자 프롬프트는 들여쓰기와 연속된 빈 줄을 없앤 뒤 요청합니다. (prompt_budget.compact_prompt)
+    모델, 온도, 최대 출력 토큰 수를 지정하지 않으면 section의 모델 정책(model_routing.section_policy)을 따르며,
+    정책의 모델 목록을 앞에서부터 시도해 앞 모델을 쓸 수 없으면(없는 모델, 권한 없음, 재시도 후에도 계속된
+    429/5xx, 연결 오류) 다음 모델로 대체합니다. model을 지정하면 그 모델만 사용합니다.
+    스트리밍 중 일부가 이미 전달되었거나 마감 시간이 지났거나 회로가 열려 있으면 대체하지 않습니다.
+    """
+    policy = section_policy(section)
+    models = (model,) if model else policy["models"]
+    if not models:
+        # 모델 없이 반복문을 지나쳐 None을 반환하지 않도록 설정 오류로 처리
+        raise ValueError(f"{section or '완성'}: 사용할 모델이 없습니다. NEWSLETTER_MODEL_* 설정을 확인하세요.")
+    if temperature is None:
+        temperature = policy["temperature"]
+    if max_tokens is None:
+        max_tokens = policy["max_tokens"]
+    system_message = compact_prompt(system_message)
+    user_prompt = compact_prompt(user_prompt)
+    if PROMPT_LOG_PATH and section is not None:
+        _record_prompt(section, models, system_message, user_prompt, temperature, max_tokens)
+
+    for index, candidate in enumerate(models):
+        delivered = []
+        on_model_delta = None
+        if on_delta is not None:
+            def on_model_delta(text):
+                delivered.append(text)
+                on_delta(text)
+        try:
+            with span(f"LLM {section or '완성'}", kind="llm", section=section, model=candidate):
+                return _create_with_model(client, system_message, user_prompt, candidate, temperature, max_tokens,
+                                          on_model_delta, use_cache, force_refresh)
+        except (openai.APIConnectionError, openai.APIStatusError) as e:
+            if delivered or index == len(models) - 1 or not _can_fall_back(e):
+                raise
+            logger.warning(f"{section or '완성'}: {candidate} 모델 호출 실패로 {models[index + 1]} 모델로 대체합니다: {e}")
+
+
+def _record_prompt(section, models, system_message, user_prompt, temperature, max_tokens):
+    """섹션 프롬프트를 PROMPT_LOG_PATH에 한 줄로 추가합니다."""
+    record = {
+        "section": section,
+        "models": list(models),
+        "system": system_message,
+        "prompt": user_prompt,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "recorded_at": time.time(),
+    }
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    try:
+        with _prompt_log_lock:
+            with open(PROMPT_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError as e:
+        logger.warning(f"프롬프트를 기록하지 못했습니다: {e}")
+
+
+def _create_with_model(client, system_message, user_prompt, model, temperature, max_tokens, on_delta,
+                       use_cache, force_refresh):
+    """model 하나로 채팅 완성을 요청하고 생성된 텍스트를 반환합니다. (캐시, 속도 제한, 재시도, 회로 처리)"""
+    cache = get_response_cache() if use_cache else None
+    cache_key = completion_cache_key(model, system_message, user_prompt, temperature, max_tokens)
+    if cache is not None and not force_refresh:
+        cached = cache.get(cache_key, LLM_CACHE_SOURCE)
+        if cached is not None:
+            _set_span_attributes(cache="hit")
+            if on_delta is not None:
+                on_delta(cached)
+            return cached
+
+    # 토큰 수 계산은 프롬프트 전체를 토큰화하므로 디버그 로그를 남길 때만 실행
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"{model} 입력 토큰 약 {count_tokens(system_message, model) + count_tokens(user_prompt, model)}개")
+    messages = [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    # 재시도는 SDK에 맡기지 않고 실행 마감 시간과 Retry-After를 함께 고려해 직접 처리
+    breaker = get_circuit_breaker(LLM_PROVIDER)
+    attempt = 0
+    while True:
+        attempt += 1
+        # 캐시에 없을 때만 속도 제한 승인을 받고 호출 (마감 시간이 지났거나 회로가 열려 있으면 할당량을 쓰기 전에 중단)
+        check_deadline()
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            stale = None
+            if cache is not None and not force_refresh:
+                stale = cache.get(cache_key, LLM_CACHE_SOURCE, allow_stale=True)
+            if stale is None:
+                raise
+            logger.warning("OpenAI 회로가 열려 있어 유효 시간이 지난 캐시 결과를 사용합니다.")
+            _set_span_attributes(cache="stale")
+            if on_delta is not None:
+                on_delta(stale)
+            return stale
+        get_rate_limiter().acquire(LLM_PROVIDER)
+        request_client = client.with_options(timeout=remaining_time(LLM_TIMEOUT), max_retries=0)
+        streamed = []
+        try:
+            content = _request_completion(request_client, model, messages, temperature, max_tokens, on_delta, streamed)
+            breaker.record_success()
+            break
+        except (openai.APIConnectionError, openai.APIStatusError) as e:
+            if _is_outage(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            # 스트리밍 중 일부가 이미 화면에 표시되었으면 중복되지 않도록 다시 시도하지 않음
+            if streamed or not _is_retryable(e):
+                raise
+            response = getattr(e, "response", None)
+            delay = retry_delay(attempt, response.headers if response is not None else None)
+            if not should_retry(attempt, delay):
+                raise
+            logger.warning(f"OpenAI 호출 실패로 {delay:.1f}초 후 다시 시도합니다 ({attempt}회 실패): {e}")
+            time.sleep(delay)
+
+    _set_span_attributes(cache="miss", attempts=attempt, output_chars=len(content or ""))
+    if cache is not None and content:
+        cache.set(cache_key, LLM_CACHE_SOURCE, content)
+    return content
+
+
+def _set_span_attributes(**attributes):
+    """추적 중이면 현재 LLM 구간에 속성을 추가합니다."""
+    llm_span = current_span()
+    if llm_span is not None:
+        llm_span.set(**attributes)
+
+
+def _is_outage(error):
+    """연결 오류, 타임아웃, 서버 오류(5xx 등)처럼 서킷 브레이커가 장애로 세는 오류이면 참입니다."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return error.status_code in CIRCUIT_FAILURE_STATUSES
+
+
+def _can_fall_back(error):
+    """이 오류로 실패했을 때 다음 모델로 대체해 볼 만하면 참입니다. (인증 오류나 잘못된 요청은 모델을 바꿔도 같음)"""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return error.status_code in FALLBACK_STATUSES
+
+
+def _is_retryable(error):
+    """연결 오류, 타임아웃, 재시도할 상태 코드(429, 5xx 등)이면 참입니다."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return error.status_code in RETRY_STATUSES
+
+
+def _request_completion(client, model, messages, temperature, max_tokens, on_delta, streamed):
+    """완성을 한 번 요청하고 텍스트를 반환합니다. 스트리밍으로 받은 조각은 streamed에도 쌓습니다."""
+    options = {} if max_tokens is None else {"max_tokens": max_tokens}
+    if on_delta is None:
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **options
+        )
+        return response.choices[0].message.content
+
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        stream=True,
+        **options
+    )
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            streamed.append(delta)
+            on_delta(delta)
+    return "".join(streamed)
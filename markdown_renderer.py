@@ -0,0 +1,310 @@
+# 마크다운 → HTML 변환기
+# 정규식 치환을 여러 번 반복하던 기존 convert_markdown_to_html을 대체합니다.
+# 모든 규칙은 str.find 기반의 선형 스캐너로 구현되어 있어 역추적이 없고,
+# 입력 크기에 비례하는 시간 안에 끝납니다. 기존 섹션 형식에 대해서는 기존 구현과
+# 바이트 단위로 같은 결과를 냅니다.
+#
+# 처리 순서
+#   1. 블록 렌더링 - AT/DT 팁 블록(팁 제목, 프롬프트 예시 제목, 프롬프트 템플릿,
+#      예시/프롬프트, 마지막 문장), 제목(#, ##, ###), 글머리 기호(- 항목)
+#   2. 인라인 렌더링 - **굵게**, *기울임*, [링크](URL), [강조]...[/강조]
+#   3. 문단 조립 - 빈 줄 기준으로 <p>, <ul> 감싸기와 <br> 변환
+
+import time
+
+from tracing import span
+
+# 스트리밍 중 HTML을 다시 그리는 최소 간격 (초)
+STREAM_RENDER_INTERVAL = 0.15
+
+# AT/DT 팁 섹션임을 나타내는 표시
+TIP_SECTION_MARKERS = ("이번 주 팁:", "핵심 프롬프트 예시")
+
+TIP_TITLE_PREFIX = "## 이번 주 팁: "
+PROMPT_EXAMPLES_MARKDOWN = "**핵심 프롬프트 예시:**"
+PROMPT_EXAMPLES_HTML = '<div class="prompt-examples-title">핵심 프롬프트 예시:</div>'
+
+# 프롬프트 템플릿 블록 - (제목, 블록이 끝나는 위치를 알려주는 다음 텍스트)
+# 블록은 "- 제목"에서 시작해 다음 텍스트 직전 또는 문서 끝에서 끝납니다.
+PROMPT_TEMPLATES = (
+    ("첫 번째 프롬프트 템플릿 (Chain of Thought 활용):", "- 두 번째 프롬프트"),
+    ("두 번째 프롬프트 템플릿 (Chain of Draft 활용):", "- 세 번째 프롬프트"),
+    ("세 번째 프롬프트 템플릿 (Chain of Thought와 Chain of Draft 결합):", "이 팁을"),
+)
+
+TEMPLATE_CONTENT_OPEN = '<div class="template-content">'
+EXAMPLE_LABEL = "예시:"
+PROMPT_LABEL = "프롬프트:"
+DIV_CLOSE = "</div>"
+
+TIP_FOOTER_MARKER = "다음 주에는"
+
+EMPHASIS_OPEN = '<span style="color:#e74c3c; font-weight:bold;">'
+
+
+def _line_end(text, pos):
+    """pos가 속한 줄의 끝 위치(줄바꿈 문자 위치 또는 문서 끝)를 반환합니다."""
+    end = text.find("\n", pos)
+    return len(text) if end < 0 else end
+
+
+def _render_prompt_templates(text, title, stop):
+    """프롬프트 템플릿 블록을 제목/내용 div로 감쌉니다."""
+    start_marker = "- " + title
+    # 문서 끝 - 마지막 문자가 줄바꿈이면 그 직전에서도 블록이 끝남
+    doc_end = len(text) - 1 if text.endswith("\n") else len(text)
+
+    out = []
+    pos = 0
+    while True:
+        start = text.find(start_marker, pos)
+        if start < 0:
+            break
+        content_start = start + len(start_marker)
+        end = text.find(stop, content_start)
+        if end < 0 or end > doc_end:
+            end = max(doc_end, content_start)
+        out.append(text[pos:start])
+        out.append('<div class="prompt-template"><div class="template-title">')
+        out.append(title)
+        out.append('</div>' + TEMPLATE_CONTENT_OPEN)
+        out.append(text[content_start:end])
+        out.append('</div></div>')
+        pos = end
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _render_template_examples(text):
+    """템플릿 내용의 '예시:'와 '프롬프트:' 부분을 각각 라벨/내용 div로 나눕니다."""
+    out = []
+    pos = 0
+    while True:
+        start = text.find(TEMPLATE_CONTENT_OPEN, pos)
+        if start < 0:
+            break
+        example = text.find(EXAMPLE_LABEL, start + len(TEMPLATE_CONTENT_OPEN))
+        if example < 0:
+            break
+        prompt = text.find(PROMPT_LABEL, example + len(EXAMPLE_LABEL))
+        if prompt < 0:
+            break
+        close = text.find(DIV_CLOSE, prompt + len(PROMPT_LABEL))
+        if close < 0:
+            break
+        # 템플릿 내용 시작부터 '예시:' 앞까지는 버림
+        out.append(text[pos:start])
+        out.append(TEMPLATE_CONTENT_OPEN)
+        out.append('<div class="example-label">예시:</div><div class="example-content">')
+        out.append(text[example + len(EXAMPLE_LABEL):prompt])
+        out.append('</div><div class="prompt-label">프롬프트:</div><div class="prompt-content">')
+        out.append(text[prompt + len(PROMPT_LABEL):close])
+        out.append('</div></div>')
+        pos = close + len(DIV_CLOSE)
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _render_tip_footer(text):
+    """'다음 주에는 ...' 문장(같은 줄의 첫 마침표까지)을 tip-footer div로 감쌉니다."""
+    out = []
+    pos = 0
+    search = 0
+    while True:
+        start = text.find(TIP_FOOTER_MARKER, search)
+        if start < 0:
+            break
+        line_end = _line_end(text, start)
+        period = text.find(".", start + len(TIP_FOOTER_MARKER), line_end)
+        if period < 0:
+            # 이 줄에는 더 이상 마침표가 없으므로 다음 줄부터 다시 찾음
+            search = line_end
+            continue
+        out.append(text[pos:start])
+        out.append('<div class="tip-footer">')
+        out.append(text[start:period + 1])
+        out.append(DIV_CLOSE)
+        pos = search = period + 1
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _render_tip_blocks(text):
+    """AT/DT 팁 섹션 전용 블록을 렌더링합니다."""
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        if line.startswith(TIP_TITLE_PREFIX):
+            lines[i] = f'<div class="tip-title">이번 주 팁: {line[len(TIP_TITLE_PREFIX):]}</div>'
+    text = "\n".join(lines)
+
+    text = text.replace(PROMPT_EXAMPLES_MARKDOWN, PROMPT_EXAMPLES_HTML)
+
+    for title, stop in PROMPT_TEMPLATES:
+        text = _render_prompt_templates(text, title, stop)
+
+    text = _render_template_examples(text)
+    return _render_tip_footer(text)
+
+
+def _render_line_blocks(text, list_items):
+    """줄 단위 블록(제목, 글머리 기호)을 렌더링합니다."""
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        if line.startswith("# "):
+            lines[i] = f"<h1>{line[2:]}</h1>"
+        elif line.startswith("## "):
+            lines[i] = f"<h2>{line[3:]}</h2>"
+        elif line.startswith("### "):
+            lines[i] = f"<h3>{line[4:]}</h3>"
+        elif list_items and line.startswith("- "):
+            lines[i] = f"<li>{line[2:]}</li>"
+    return "\n".join(lines)
+
+
+def _render_pairs(text, opener, closer, open_html, close_html):
+    """같은 줄 안에서 opener...closer 쌍을 찾아 HTML 태그로 바꿉니다."""
+    out = []
+    pos = 0
+    search = 0
+    while True:
+        start = text.find(opener, search)
+        if start < 0:
+            break
+        line_end = _line_end(text, start)
+        end = text.find(closer, start + len(opener), line_end)
+        if end < 0:
+            # 닫는 표시가 없으면 이 줄의 나머지에는 더 이상 쌍이 없음
+            search = line_end
+            continue
+        out.append(text[pos:start])
+        out.append(open_html)
+        out.append(text[start + len(opener):end])
+        out.append(close_html)
+        pos = search = end + len(closer)
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _render_links(text):
+    """같은 줄 안의 [텍스트](URL)를 링크로 바꿉니다."""
+    out = []
+    pos = 0
+    search = 0
+    while True:
+        start = text.find("[", search)
+        if start < 0:
+            break
+        line_end = _line_end(text, start)
+        middle = text.find("](", start + 1, line_end)
+        end = text.find(")", middle + 2, line_end) if middle >= 0 else -1
+        if end < 0:
+            search = line_end
+            continue
+        out.append(text[pos:start])
+        out.append(f'<a href="{text[middle + 2:end]}">{text[start + 1:middle]}</a>')
+        pos = search = end + 1
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _render_inline(text):
+    """인라인 요소를 렌더링합니다."""
+    text = _render_pairs(text, "**", "**", "<strong>", "</strong>")
+    text = _render_pairs(text, "*", "*", "<em>", "</em>")
+    text = _render_links(text)
+    return _render_pairs(text, "[강조]", "[/강조]", EMPHASIS_OPEN, "</span>")
+
+
+def _assemble_paragraphs(text):
+    """빈 줄로 문단을 나누고 HTML 태그가 아닌 문단을 <p> 또는 <ul>로 감쌉니다."""
+    paragraphs = text.split("\n\n")
+    for i, paragraph in enumerate(paragraphs):
+        if not paragraph.startswith(("<h", "<li", "<div")):
+            if "<li>" in paragraph:
+                paragraph = f"<ul>{paragraph}</ul>"
+            else:
+                paragraph = f"<p>{paragraph}</p>"
+        paragraphs[i] = paragraph.replace("\n", "<br>")
+    return "".join(paragraphs)
+
+
+def convert_markdown_to_html(text):
+    """마크다운 텍스트를 HTML로 변환합니다."""
+    with span("markdown", kind="render", chars=len(text)):
+        return _convert(text)
+
+
+def _convert(text):
+    # AT/DT 팁 섹션 특별 처리
+    if any(marker in text for marker in TIP_SECTION_MARKERS):
+        text = _render_tip_blocks(text)
+
+    # 이미 처리된 AT/DT 팁 템플릿이 있으면 글머리 기호는 변환하지 않음
+    text = _render_line_blocks(text, list_items="prompt-template" not in text)
+    text = _render_inline(text)
+    return _assemble_paragraphs(text)
+
+
+class IncrementalMarkdownRenderer:
+    """스트리밍으로 도착하는 마크다운을 누적하며 HTML로 변환합니다.
+
+    빈 줄로 끝난 문단은 다시 바뀌지 않으므로 한 번만 변환해 두고, 매 호출마다
+    마지막 미완성 문단만 새로 변환합니다. AT/DT 팁 블록처럼 여러 문단에 걸친 규칙이
+    필요한 텍스트는 전체를 다시 변환합니다. 스트림이 끝난 뒤 render()의 결과는
+    convert_markdown_to_html(전체 텍스트)와 같습니다.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._text = ""
+        self._stable_html = []
+        self._stable_end = 0
+
+    @property
+    def text(self):
+        """지금까지 받은 마크다운 원문"""
+        if self._parts:
+            self._text += "".join(self._parts)
+            self._parts.clear()
+        return self._text
+
+    def feed(self, delta):
+        """새로 도착한 텍스트 조각을 추가합니다."""
+        self._parts.append(delta)
+
+    def _needs_full_render(self, text):
+        return "prompt-template" in text or any(marker in text for marker in TIP_SECTION_MARKERS)
+
+    def render(self):
+        """지금까지 받은 텍스트 전체의 HTML을 반환합니다."""
+        text = self.text
+        # 스트리밍 중 미리보기는 자주 호출되므로 추적 구간을 남기지 않음
+        if self._needs_full_render(text):
+            return _convert(text)
+
+        # str.split("\n\n")과 같은 방식으로 왼쪽부터 겹치지 않게 완성된 문단을 찾음
+        while True:
+            separator = text.find("\n\n", self._stable_end)
+            if separator < 0:
+                break
+            self._stable_html.append(_convert(text[self._stable_end:separator]))
+            self._stable_end = separator + 2
+        return "".join(self._stable_html) + _convert(text[self._stable_end:])
+
+
+def make_streaming_callback(on_html, interval=STREAM_RENDER_INTERVAL):
+    """LLM 토큰 조각을 받는 on_delta 콜백을 만듭니다.
+
+    조각을 IncrementalMarkdownRenderer에 누적하고, interval초마다 지금까지의 HTML로 on_html(HTML)을 호출합니다.
+    """
+    renderer = IncrementalMarkdownRenderer()
+    last_update = [0.0]
+
+    def on_delta(delta):
+        renderer.feed(delta)
+        now = time.monotonic()
+        if now - last_update[0] >= interval:
+            last_update[0] = now
+            on_html(renderer.render())
+
+    return on_delta
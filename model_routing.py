@@ -0,0 +1,87 @@
+# 섹션별 모델 정책
+# 섹션마다 사용할 모델 목록(앞에서부터 시도하는 대체 순서), 최대 출력 토큰 수, 온도를 정합니다.
+# 정해진 형식을 채우는 섹션(팁, 성공 사례, 프로젝트 아이디어 등)은 빠르고 저렴한 모델을 먼저 쓰고,
+# 실제 기사에서 골라 출처와 함께 요약해야 하는 뉴스 섹션만 강한 모델을 먼저 씁니다.
+# 앞 모델을 쓸 수 없으면(없는 모델, 권한 없음, 재시도 후에도 429/5xx 등) 다음 모델로 대체합니다. (llm_client 참고)
+# 모델별 지연 시간과 비용은 benchmarks/bench_models.py로 비교합니다.
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# 강한 모델과 빠른 모델 (환경 변수로 변경 가능)
+STRONG_MODEL = os.environ.get("NEWSLETTER_STRONG_MODEL", "gpt-4-turbo-preview")
+FAST_MODEL = os.environ.get("NEWSLETTER_FAST_MODEL", "gpt-4o-mini")
+
+# 기본 온도
+DEFAULT_TEMPERATURE = 0.7
+
+
+def _env_optional_int(name, default):
+    """환경 변수 값을 정수로 읽습니다. 비어 있거나 'none'이면 제한 없음(None)입니다."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if value.strip().lower() in ("", "none"):
+        return None
+    return int(value)
+
+
+def _section_policy(section, models, max_tokens, temperature=DEFAULT_TEMPERATURE):
+    prefix = f"NEWSLETTER_MODEL_{section.upper()}"
+    override = os.environ.get(prefix)
+    if override:
+        override_models = [model.strip() for model in override.split(",") if model.strip()]
+        # 모델 이름이 하나도 없는 값(예: ",")이면 무시하고 기본 대체 순서를 사용
+        if override_models:
+            models = override_models
+        else:
+            logger.warning(f"{prefix}={override!r}에 모델 이름이 없어 기본 모델 목록 {', '.join(models)}을 사용합니다.")
+    return {
+        "models": tuple(models),
+        "max_tokens": _env_optional_int(prefix + "_MAX_TOKENS", max_tokens),
+        "temperature": float(os.environ.get(prefix + "_TEMPERATURE", temperature)),
+    }
+
+
+# 섹션별 정책 (환경 변수 NEWSLETTER_MODEL_<섹션>으로 쉼표로 구분한 모델 목록,
+# NEWSLETTER_MODEL_<섹션>_MAX_TOKENS/_TEMPERATURE로 최대 출력 토큰 수와 온도 변경 가능)
+#   models: 앞에서부터 시도할 모델 목록, max_tokens: 최대 출력 토큰 수 (None이면 제한 없음)
+# 최대 출력 토큰 수는 지금 형식의 출력이 잘리지 않을 만큼 넉넉하게 잡아 폭주만 막습니다.
+SECTION_POLICIES = {
+    # AIDT 뉴스레터 (streamlit_app, streamlit_app_v3)
+    "main_news": _section_policy("main_news", (STRONG_MODEL, FAST_MODEL), max_tokens=800),
+    "aidt_tips": _section_policy("aidt_tips", (FAST_MODEL, STRONG_MODEL), max_tokens=1200),
+    "success_story": _section_policy("success_story", (FAST_MODEL, STRONG_MODEL), max_tokens=2000),
+    "ai_use_case": _section_policy("ai_use_case", (FAST_MODEL, STRONG_MODEL), max_tokens=1000),
+    # 스트림릿 학습 뉴스레터 (streamlit_app_v2)
+    "learning_tip": _section_policy("learning_tip", (FAST_MODEL, STRONG_MODEL), max_tokens=1200),
+    "project_ideas": _section_policy("project_ideas", (FAST_MODEL, STRONG_MODEL), max_tokens=800),
+    "streamlit_news": _section_policy("streamlit_news", (STRONG_MODEL, FAST_MODEL), max_tokens=800),
+}
+
+# 정책이 없는 섹션 (NEWSLETTER_MODEL_DEFAULT 등으로 변경 가능)
+DEFAULT_POLICY = _section_policy("default", (STRONG_MODEL, FAST_MODEL), max_tokens=None)
+
+# 모델별 100만 토큰당 가격 (USD, 입력/출력) - 벤치마크의 비용 추정에 사용 (공개 가격 기준, 바뀔 수 있음)
+MODEL_PRICES = {
+    "gpt-4-turbo-preview": (10.0, 30.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-3.5-turbo": (0.5, 1.5),
+}
+
+
+def section_policy(section):
+    """섹션의 모델 정책(models, max_tokens, temperature)을 반환합니다. 정책이 없으면 DEFAULT_POLICY입니다."""
+    return SECTION_POLICIES.get(section, DEFAULT_POLICY)
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """입력/출력 토큰 수로 호출 비용(USD)을 추정합니다. 가격을 모르는 모델이면 None입니다."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    input_price, output_price = prices
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1e6
@@ -0,0 +1,310 @@
+# 근접 중복 기사 탐지
+# 제목+요약(태그, 엔티티, 문장 부호를 없애고 소문자로 바꾼 텍스트)을 문자 3-gram 집합으로 보고
+# MinHash 서명으로 두 집합의 자카드 유사도를 추정해, 기준 이상이면 같은 기사로 봅니다.
+# 같은 기사를 여러 언론사가 조금씩 고쳐 실은 경우나 두 검색어 결과에 같은 기사가 들어 있는 경우를 찾습니다.
+#
+# SimHash(64비트 지문의 해밍 거리)도 검토했지만, 제목과 요약 정도의 짧은 텍스트에서는 표현만 조금 바꾼 같은 기사와
+# 다른 기사의 거리 분포가 겹쳐 기준을 정하기 어려워 MinHash를 사용합니다. 같은 기사는 3-gram 자카드 유사도가
+# 대체로 0.45 이상, 다른 AI 기사끼리는 0.1 안팎입니다.
+#
+# 서명은 3-gram마다 해시를 한 번만 계산하는 단일 순열 MinHash(해시 상위 비트로 칸을 나누고 칸별 최솟값,
+# 빈 칸은 이웃 칸 값으로 채움)로, 여러 텍스트를 한꺼번에 numpy로 계산합니다. 색인은 서명을 여러 구간(band)으로 나눈 LSH이며,
+# 구간 해시가 같은 쌍만 후보로 골라 서명으로 유사도를 확인합니다. 후보 찾기도 정렬 한 번으로 처리하므로
+# 수백 개 항목을 몇 밀리초 안에 거릅니다. (benchmarks/bench_near_duplicates.py 참고)
+import functools
+import html
+import os
+import re
+import time
+
+import numpy as np
+
+from article_store import get_article_store, normalize_article
+
+# 같은 기사로 볼 최소 자카드 유사도 (환경 변수로 변경 가능)
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEWSLETTER_NEAR_DUPLICATE_THRESHOLD", 0.4))
+
+# 이 기간(일) 안에 생성한 앞선 이슈에 실은 기사는 새 기사가 모자랄 때만 선택 (0이면 이슈 사이에서는 거르지 않음)
+ISSUE_DEDUP_DAYS = float(os.environ.get("NEWSLETTER_DEDUP_DAYS", 14))
+
+# MinHash 서명 길이 (칸 수, 2의 거듭제곱)
+MINHASH_BINS = 128
+
+# 유사도 계산에 사용하는 문자 n-gram 크기
+SHINGLE_SIZE = 3
+
+# 유사도 계산에 사용하는 텍스트 최대 길이 (긴 요약은 앞부분만 사용)
+MAX_TEXT_LENGTH = 400
+
+# 구간 해시를 이보다 많은 항목이 공유하면(대부분 흔한 표현이 겹친 경우) 모든 쌍 대신 가장 앞선 항목과의 쌍만 후보로 봄
+# (후보 쌍 수가 항목 수의 제곱으로 늘지 않고, 같은 기사 여러 개가 한 묶음에 있어도 첫 기사와 비교해 걸러짐)
+MAX_BUCKET_SIZE = 8
+
+# 3-gram이 하나도 없는 텍스트의 서명 값
+EMPTY = np.uint32(np.iinfo(np.uint32).max)
+
+# 여러 텍스트를 한 문자열로 이어 붙일 때의 구분 문자
+_SEPARATOR = "\x00"
+# 구분 문자를 넘지 않는 HTML 태그 (article_store.HTML_TAG_PATTERN과 같은 역할)
+_TAG_PATTERN = re.compile(r"<[^<>\x00]*>")
+_SPACE = np.uint32(ord(" "))
+_BIN_BITS = MINHASH_BINS.bit_length() - 1
+# 칸 안의 값은 칸 번호 다음의 해시 24비트 (채운 빈 칸은 그 위에 거리를 더해 서명 값이 32비트에 들어감)
+_VALUE_BITS = 24
+_GRAM_MULTIPLIERS = tuple(np.uint64(pow(0x100000001B3, i, 1 << 64)) for i in range(SHINGLE_SIZE - 1, -1, -1))
+
+
+def article_text(item):
+    """기사(API 응답 항목)의 제목과 요약을 이어 붙입니다. (태그와 문장 부호는 minhash_many에서 정리)"""
+    return f"{item.get('title') or ''} {item.get('description') or ''}"
+
+
+@functools.lru_cache(maxsize=None)
+def _word_chars():
+    """기본 다국어 평면 문자별로 글자나 숫자인지 나타내는 표 (그 밖의 문자는 U+FFFF로 보고 공백 처리)"""
+    return np.array([chr(code).isalnum() for code in range(0x10000)], dtype=bool)
+
+
+def _mix(values):
+    """splitmix64 마무리 함수로 64비트 값을 고르게 섞습니다."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _normalized_codes(texts):
+    """텍스트별로 앞 MAX_TEXT_LENGTH 글자의 HTML 태그와 엔티티를 없애고 소문자로 바꾼 뒤,
+    글자와 숫자가 아닌 문자를 공백 하나로 줄인 (코드 포인트 배열, 텍스트 번호 배열)을 반환합니다.
+    300개 안팎의 텍스트를 한 번에 처리하도록 한 문자열로 이어 붙여 numpy로 계산합니다."""
+    joined = _SEPARATOR.join(text[:MAX_TEXT_LENGTH].replace(_SEPARATOR, " ") for text in texts)
+    if "<" in joined:
+        joined = _TAG_PATTERN.sub("", joined)
+    if "&" in joined:
+        joined = html.unescape(joined)
+    codes = np.frombuffer(joined.lower().encode("utf-32-le"), dtype=np.uint32)
+    separators = codes == 0
+    doc_ids = np.cumsum(separators, dtype=np.int32)
+    codes, doc_ids = codes[~separators], doc_ids[~separators]
+
+    word = _word_chars()[np.minimum(codes, 0xFFFF)]
+    # 글자가 아닌 문자는 앞 문자가 같은 텍스트의 글자일 때만 공백 하나로 남김 (연속된 기호와 맨 앞 공백은 버림)
+    previous = np.zeros(len(codes), dtype=bool)
+    previous[1:] = word[:-1] & (doc_ids[1:] == doc_ids[:-1])
+    keep = word | previous
+    return np.where(word, codes, _SPACE)[keep], doc_ids[keep]
+
+
+def minhash_many(texts):
+    """텍스트 목록의 MinHash 서명 행렬((텍스트 수, MINHASH_BINS), np.uint32)을 반환합니다.
+    3-gram이 하나도 없는 텍스트는 모든 칸이 EMPTY입니다."""
+    signatures = np.full((len(texts), MINHASH_BINS), EMPTY, dtype=np.uint32)
+    if not len(texts):
+        return signatures
+    codes, doc_ids = _normalized_codes(texts)
+    count = len(codes) - SHINGLE_SIZE + 1
+    if count <= 0:
+        return signatures
+
+    chars = codes.astype(np.uint64)
+    # 한 텍스트 안에서만 n-gram을 만듦 (첫 글자와 마지막 글자가 같은 텍스트에 있는 위치)
+    valid = doc_ids[:count] == doc_ids[SHINGLE_SIZE - 1:]
+    grams = np.zeros(count, dtype=np.uint64)
+    for offset, multiplier in enumerate(_GRAM_MULTIPLIERS):
+        grams += chars[offset:offset + count] * multiplier
+    grams = _mix(grams[valid])
+
+    # 해시 상위 비트로 칸을 고르고 그다음 비트를 값으로 해서 (텍스트, 칸)별 최솟값
+    cells = doc_ids[:count][valid].astype(np.int64) * MINHASH_BINS + (grams >> np.uint64(64 - _BIN_BITS)).astype(np.int64)
+    values = ((grams >> np.uint64(64 - _BIN_BITS - _VALUE_BITS)) & np.uint64((1 << _VALUE_BITS) - 1)).astype(np.uint32)
+    np.minimum.at(signatures.ravel(), cells, values)
+    return _densify(signatures)
+
+
+def _densify(signatures):
+    """3-gram이 들어가지 않은 빈 칸을 오른쪽(끝에서는 처음으로 돌아가)의 가장 가까운 칸 값과 거리로 채웁니다.
+    짧은 텍스트도 모든 칸을 비교와 LSH 구간에 쓸 수 있습니다. (densified one permutation hashing)"""
+    flat = signatures.ravel()
+    filled = np.flatnonzero(flat != EMPTY)
+    empty = np.flatnonzero(flat == EMPTY)
+    if not len(filled) or not len(empty):
+        return signatures
+    rows = empty // MINHASH_BINS
+    # 같은 행에서 오른쪽으로 가장 가까운 칸, 없으면 그 행의 첫 칸
+    targets = filled[np.minimum(np.searchsorted(filled, empty), len(filled) - 1)]
+    wrap = targets // MINHASH_BINS != rows
+    targets[wrap] = filled[np.minimum(np.searchsorted(filled, rows[wrap] * MINHASH_BINS), len(filled) - 1)]
+    # 3-gram이 하나도 없는 텍스트는 그대로 EMPTY
+    found = targets // MINHASH_BINS == rows
+    distances = ((targets - empty) % MINHASH_BINS).astype(np.uint32)
+    result = flat.copy()
+    result[empty[found]] = flat[targets[found]] + (distances[found] << np.uint32(_VALUE_BITS))
+    return result.reshape(signatures.shape)
+
+
+def estimate_similarity(a, b):
+    """두 MinHash 서명으로 자카드 유사도를 추정합니다. (값이 같은 칸의 비율)"""
+    return float(np.count_nonzero((a == b) & (a != EMPTY))) / MINHASH_BINS
+
+
+def _rows_per_band(threshold):
+    """유사도가 threshold인 두 서명이 90% 이상 후보로 잡히는 가장 긴 구간 길이를 고릅니다.
+    (구간이 길수록 다른 기사가 후보로 덜 잡힘)"""
+    rows = 1
+    for candidate in range(2, 17):
+        if 1 - (1 - threshold ** candidate) ** (MINHASH_BINS // candidate) >= 0.9:
+            rows = candidate
+    return rows
+
+
+class NearDuplicateIndex:
+    """MinHash 서명을 LSH 구간 해시와 함께 보관하고, 추정 자카드 유사도가 threshold 이상인 항목을 찾는 색인"""
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.rows = _rows_per_band(threshold)
+        self.bands = MINHASH_BINS // self.rows
+        self._salts = _mix(np.arange(1, self.bands + 1, dtype=np.uint64))
+        self.signatures = np.empty((0, MINHASH_BINS), dtype=np.uint32)
+        self._band_hashes = np.empty((0, self.bands), dtype=np.uint64)
+        self.keys = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def band_hashes(self, signatures):
+        """서명의 구간별 해시((서명 수, 구간 수))를 반환합니다. 빈 서명의 구간은 EMPTY입니다.
+        구간에 들어가지 않는 나머지 칸(MINHASH_BINS % rows)은 유사도 계산에만 씁니다."""
+        banded = signatures[:, :self.bands * self.rows].reshape(len(signatures), self.bands, self.rows)
+        hashes = np.broadcast_to(self._salts, (len(signatures), self.bands)).copy()
+        for row in range(self.rows):
+            hashes = _mix(hashes ^ banded[:, :, row].astype(np.uint64))
+        hashes[(banded == EMPTY).any(axis=2)] = EMPTY
+        return hashes
+
+    def add(self, signatures, keys=None):
+        """서명 행렬을 색인에 추가합니다. keys는 서명별로 기록할 값입니다."""
+        signatures = np.asarray(signatures, dtype=np.uint32).reshape(-1, MINHASH_BINS)
+        self.signatures = np.vstack([self.signatures, signatures])
+        self._band_hashes = np.vstack([self._band_hashes, self.band_hashes(signatures)])
+        self.keys.extend(keys if keys is not None else [None] * len(signatures))
+
+    def neighbors(self, signatures):
+        """새 서명마다 유사도가 threshold 이상인 앞선 항목의 위치 목록을 반환합니다.
+        위치가 len(self)보다 작으면 색인의 항목, 크거나 같으면 (위치 - len(self))번째 새 서명입니다."""
+        stored = len(self.keys)
+        signatures = np.asarray(signatures, dtype=np.uint32).reshape(-1, MINHASH_BINS)
+        result = [[] for _ in range(len(signatures))]
+        if not len(signatures):
+            return result
+        all_signatures = np.vstack([self.signatures, signatures])
+        hashes = np.vstack([self._band_hashes, self.band_hashes(signatures)])
+
+        # 같은 구간 해시를 가진 항목끼리 모이도록 정렬
+        owners = np.repeat(np.arange(len(hashes)), self.bands)
+        flat = hashes.ravel()
+        filled = flat != EMPTY
+        flat, owners = flat[filled], owners[filled]
+        order = flat.argsort()
+        flat, owners = flat[order], owners[order]
+        if not len(flat):
+            return result
+
+        boundaries = np.ones(len(flat), dtype=bool)
+        boundaries[1:] = flat[1:] != flat[:-1]
+        starts = np.flatnonzero(boundaries)
+        sizes = np.diff(np.append(starts, len(flat)))
+        large = np.repeat(sizes > MAX_BUCKET_SIZE, sizes)
+        pairs = []
+
+        # 큰 묶음은 묶음에서 가장 앞선 항목과 나머지 항목의 쌍
+        first = np.repeat(np.minimum.reduceat(owners, starts), sizes)
+        earlier, later = first[large], owners[large]
+        new = (later >= stored) & (earlier != later)
+        pairs.append(earlier[new] * len(hashes) + later[new])
+
+        # 작은 묶음은 정렬된 배열에서 distance만큼 떨어진 두 위치가 같은 묶음이면 후보 쌍
+        group_ends = np.repeat(np.where(sizes <= MAX_BUCKET_SIZE, starts + sizes, 0), sizes)
+        positions = np.arange(len(flat))
+        distance = 1
+        active = positions[group_ends - positions > distance]
+        while len(active):
+            left, right = owners[active], owners[active + distance]
+            earlier, later = np.minimum(left, right), np.maximum(left, right)
+            new = (later >= stored) & (earlier != later)
+            pairs.append(earlier[new] * len(hashes) + later[new])
+            distance += 1
+            active = active[group_ends[active] - active > distance]
+        pairs = np.unique(np.concatenate(pairs))
+        earlier, later = pairs // len(hashes), pairs % len(hashes)
+
+        # 후보 쌍의 유사도를 한꺼번에 계산 (estimate_similarity와 같은 식, 빈 서명은 후보가 되지 않음)
+        matches = np.count_nonzero(all_signatures[earlier] == all_signatures[later], axis=1)
+        similar = matches >= self.threshold * MINHASH_BINS
+        for e, l in zip(earlier[similar].tolist(), later[similar].tolist()):
+            result[l - stored].append(e)
+        return result
+
+
+def drop_near_duplicates(items, index, limit=None, key=None, signatures=None):
+    """items에서 색인이나 앞서 남긴 항목과 근접 중복인 항목을 빼고 limit개까지 반환합니다.
+    남긴 항목의 서명은 색인에 추가하므로, 같은 색인으로 여러 목록을 차례로 거르면 목록 사이의 중복도 빠집니다.
+    key가 있으면 색인에 key(항목)을 함께 기록합니다. 유사도를 계산할 수 없는 짧은 항목은 그대로 남깁니다.
+    signatures로 이미 계산한 서명(minhash_many)을 넘길 수 있습니다."""
+    if not items:
+        return []
+    if signatures is None:
+        signatures = minhash_many([article_text(item) for item in items])
+    stored = len(index)
+    kept = []
+    kept_positions = set()
+    for position, neighbors in enumerate(index.neighbors(signatures)):
+        if limit is not None and len(kept) >= limit:
+            break
+        if any(neighbor < stored or neighbor in kept_positions for neighbor in neighbors):
+            continue
+        kept.append(position)
+        kept_positions.add(stored + position)
+    index.add(signatures[kept], [key(items[i]) for i in kept] if key is not None else None)
+    return [items[i] for i in kept]
+
+
+class IssueDeduplicator:
+    """한 이슈의 여러 섹션 기사를 하나의 색인으로 차례로 걸러, 앞 섹션에 실은 기사와 근접 중복인 기사를 뺍니다.
+    같은 뉴스레터(series)에서 최근 ISSUE_DEDUP_DAYS일 안에 생성한 앞선 호수의 이슈에 실은 기사는
+    새 기사가 모자랄 때만 뒤에 채워 넣습니다. 선택한 기사는 record()로 저장소에 기록합니다.
+    호수는 뉴스레터마다 따로 매기므로 기록은 (series, 호수)로 구분합니다."""
+
+    def __init__(self, series, issue_number, days=ISSUE_DEDUP_DAYS, threshold=NEAR_DUPLICATE_THRESHOLD, store=None):
+        self.series = series
+        self.issue_number = issue_number
+        self.store = store or get_article_store()
+        self.index = NearDuplicateIndex(threshold)
+        self.previous = NearDuplicateIndex(threshold)
+        if days > 0:
+            rows = self.store.issue_articles(series, time.time() - days * 24 * 60 * 60, before_issue=issue_number)
+            if rows:
+                signatures = np.frombuffer(b"".join(signature for _, signature in rows), dtype=np.uint32)
+                self.previous.add(signatures, [hash_ for hash_, _ in rows])
+
+    def select(self, source, items, limit=None):
+        """items에서 이번 이슈의 앞 섹션 기사와 근접 중복인 기사를 뺀 기사를 limit개까지 반환합니다.
+        최근 이슈에 실었던 기사는 다른 기사 뒤로 보냅니다."""
+        if not items:
+            return []
+        signatures = minhash_many([article_text(item) for item in items])
+        repeated = [bool(neighbors) for neighbors in self.previous.neighbors(signatures)]
+        order = [i for i in range(len(items)) if not repeated[i]] + [i for i in range(len(items)) if repeated[i]]
+        return drop_near_duplicates(
+            [items[i] for i in order], self.index, limit,
+            key=lambda item: normalize_article(source, item)["url_hash"], signatures=signatures[order]
+        )
+
+    def record(self):
+        """이번 이슈에서 선택한 기사의 서명을 저장소에 기록합니다."""
+        self.store.record_issue_articles(
+            self.series,
+            self.issue_number,
+            [(key, signature.tobytes()) for key, signature in zip(self.index.keys, self.index.signatures)]
+        )
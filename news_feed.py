@@ -0,0 +1,184 @@
+# 뉴스 증분 가져오기
+# 검색어마다 이미 가져온 가장 최근 기사 시각과 기사(대표 URL)를 기사 저장소(article_store)에 기록해 두고,
+# 다음에는 그 이후의 새 기사만 요청한 뒤 저장소에 합쳐서 최근 기간의 기사를 저장소에서 읽습니다.
+#   - 네이버 뉴스: 최신순으로 작은 페이지부터 요청하고, 이미 본 기사에 닿으면 더 요청하지 않음
+#   - NewsAPI: 'from'을 마지막으로 본 기사 시각으로 좁혀 새 기사만 요청
+# 서버가 ETag나 Last-Modified를 주면 다음 요청에 If-None-Match/If-Modified-Since로 보내고 304면 새 기사가 없는 것으로 봅니다.
+# 최근에 확인한 피드는 API를 다시 부르지 않고 저장소의 기사를 그대로 사용하므로, 여러 이슈가 한 번의 수집을 함께 씁니다.
+# 저장소가 이미 결과를 재사용하므로 이 함수들의 결과는 응답 캐시(response_cache)에 따로 저장하지 않습니다.
+# 응답 캐시에 저장하면 유효 시간 동안 새 기사를 합치지 못한 결과가 반환됩니다.
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from article_store import get_article_store, normalize_article
+from http_client import async_get, run_sync
+from resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+NAVER_NEWS_URL = "https://openapi.naver.com/v1/search/news.json"
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+
+# 네이버 검색 API 페이지 크기 (display 최대 100, start 최대 1000)
+NAVER_MAX_DISPLAY = 100
+NAVER_MAX_START = 1000
+
+# 이전에 가져온 적이 있는 검색어의 첫 페이지 크기 (다음 페이지부터 두 배씩 늘림)
+NAVER_INCREMENTAL_DISPLAY = 10
+
+# 피드를 확인한 뒤 이 시간(초) 안에는 API를 다시 부르지 않고 저장소의 기사를 사용 (0이면 매번 확인)
+FEED_REFRESH_INTERVAL = float(os.environ.get("NEWSLETTER_FEED_REFRESH", 15 * 60))
+
+# NewsAPI 무료 플랜에서 조회할 수 있는 최대 기간 (일)
+NEWS_API_MAX_DAYS = 7
+
+# 저장소에서 한 번에 읽는 NewsAPI 기사 수 (한 번의 요청이 돌려주는 최대 개수와 같음)
+NEWS_API_RESULT_LIMIT = 100
+
+
+def conditional_headers(feed):
+    """이전 응답의 ETag/Last-Modified로 조건부 요청 헤더를 만듭니다."""
+    headers = {}
+    if feed is not None and feed.get("etag"):
+        headers["If-None-Match"] = feed["etag"]
+    if feed is not None and feed.get("last_modified"):
+        headers["If-Modified-Since"] = feed["last_modified"]
+    return headers
+
+
+def is_incremental(feed, cutoff):
+    """저장소가 cutoff 이후 기간을 빠짐없이 가지고 있어 새 기사만 가져와도 되는지 반환합니다."""
+    return feed is not None and feed.get("covered_since") is not None and feed["covered_since"] <= cutoff
+
+
+def is_fresh(feed, cutoff):
+    """피드를 최근(FEED_REFRESH_INTERVAL 안)에 확인해서 API를 부르지 않아도 되는지 반환합니다."""
+    return is_incremental(feed, cutoff) and time.time() - feed["checked_at"] < FEED_REFRESH_INTERVAL
+
+
+def check_stale_fallback(source, query, feed, error):
+    """공급자 회로가 열려(error) 새 기사를 가져오지 못했을 때 저장소의 이전 기사로 대신할 수 있는지 확인합니다.
+    이 검색어를 가져온 적이 없으면 error를 다시 발생시킵니다."""
+    if feed is None:
+        raise error
+    logger.warning(f"{source} 회로가 열려 있어 저장소의 기사('{query}')를 새 기사 없이 사용합니다.")
+
+
+async def fetch_naver_news_updates_async(client_id, client_secret, query, feed, known_hashes, cutoff):
+    """네이버 뉴스에서 저장소에 없는 새 기사만 가져옵니다.
+
+    처음 가져오는 검색어는 기존과 같이 최신 100개를 한 번에 요청합니다. 이전에 가져온 적이 있으면 작은 페이지부터
+    최신순으로 요청하면서 이미 본 기사(known_hashes), 마지막으로 본 기사보다 오래된 기사, cutoff보다 오래된 기사에
+    닿거나 새 기사가 100개 모이면 멈춥니다. (저장소의 최신 100개는 항상 빠짐없이 이어짐)
+    새 응답 항목 목록과 첫 페이지 응답의 (ETag, Last-Modified)를 반환합니다.
+    """
+    headers = {
+        "X-Naver-Client-Id": client_id,
+        "X-Naver-Client-Secret": client_secret
+    }
+    incremental = is_incremental(feed, cutoff)
+    newest = feed["newest_published"] if incremental else None
+    display = NAVER_INCREMENTAL_DISPLAY if incremental else NAVER_MAX_DISPLAY
+    validators = (feed.get("etag"), feed.get("last_modified")) if incremental else (None, None)
+    articles = []
+    start = 1
+    while True:
+        request_headers = headers
+        if start == 1 and incremental:
+            # 첫 페이지가 그대로면 뒤 페이지도 바뀌지 않았으므로 첫 페이지에만 조건부 요청
+            request_headers = {**headers, **conditional_headers(feed)}
+        params = {
+            "query": query,
+            "display": display,
+            "start": start,
+            "sort": "date"  # 최신순으로 정렬
+        }
+        response = await async_get(NAVER_NEWS_URL, headers=request_headers, params=params)
+        if response.status_code == 304:
+            break
+        if response.status_code != 200:
+            raise Exception(f"네이버 뉴스 가져오기 실패: {response.status_code} - {response.text}")
+        if start == 1:
+            validators = (response.headers.get("etag"), response.headers.get("last-modified"))
+
+        items = response.json()["items"]
+        reached_known = False
+        for item in items:
+            article = normalize_article("naver_news", item)
+            published = article["published_at"]
+            if published is not None and (published < cutoff or (newest is not None and published < newest)):
+                reached_known = True
+                break
+            if article["url_hash"] in known_hashes:
+                reached_known = True
+                continue
+            articles.append(item)
+
+        start += display
+        if (not incremental or reached_known or len(items) < display
+                or len(articles) >= NAVER_MAX_DISPLAY or start > NAVER_MAX_START):
+            break
+        display = min(NAVER_MAX_DISPLAY, display * 2, NAVER_MAX_START - start + 1)
+    return articles, validators
+
+
+def fetch_naver_news_incremental(client_id, client_secret, query, display=5, days=7):
+    """네이버 검색 API로 새 뉴스를 저장소에 합친 뒤, 최근 days일 이내의 뉴스를 최신순으로 display개까지 반환합니다.
+    발행 시각을 읽을 수 없는 뉴스도 포함합니다."""
+    store = get_article_store()
+    cutoff = time.time() - days * 24 * 60 * 60
+    feed = store.get_feed("naver_news", query)
+    if not is_fresh(feed, cutoff):
+        known_hashes = store.known_hashes("naver_news", query, since=cutoff)
+        try:
+            articles, (etag, last_modified) = run_sync(
+                fetch_naver_news_updates_async(client_id, client_secret, query, feed, known_hashes, cutoff)
+            )
+        except CircuitOpenError as e:
+            check_stale_fallback("naver_news", query, feed, e)
+        else:
+            store.save_fetch("naver_news", query, "", articles, cutoff, etag, last_modified)
+    return store.recent("naver_news", query, since=cutoff, limit=display)
+
+
+async def fetch_news_api_updates_async(api_key, query, language, feed, cutoff):
+    """NewsAPI에서 마지막으로 본 기사 이후의 기사만 가져옵니다.
+    응답 항목 목록과 응답의 (ETag, Last-Modified)를 반환합니다."""
+    incremental = is_incremental(feed, cutoff)
+    since = cutoff
+    if incremental and feed["newest_published"] is not None:
+        # 같은 초에 발행된 기사를 놓치지 않도록 마지막 기사 시각부터 요청 (중복은 기사 ID로 합쳐짐)
+        since = max(cutoff, feed["newest_published"])
+    params = {
+        'q': query,
+        'from': datetime.fromtimestamp(since, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'),
+        'sortBy': 'publishedAt',
+        'language': language,
+        'apiKey': api_key
+    }
+    response = await async_get(NEWS_API_URL, params=params, headers=conditional_headers(feed) if incremental else None)
+    if response.status_code == 304:
+        return [], (feed.get("etag"), feed.get("last_modified"))
+    if response.status_code != 200:
+        raise Exception(f"뉴스 가져오기 실패: {response.status_code} - {response.text}")
+    return response.json()["articles"], (response.headers.get("etag"), response.headers.get("last-modified"))
+
+
+def fetch_news_api_incremental(api_key, query="AI digital transformation", days=7, language="en"):
+    """NewsAPI로 새 기사를 저장소에 합친 뒤, 최근 기간의 기사를 최신순으로 반환합니다.
+    무료 플랜은 최근 1개월(실제로는 더 짧을 수 있음) 데이터만 접근 가능하므로 기간은 최대 7일로 제한합니다."""
+    store = get_article_store()
+    start_date = datetime.now() - timedelta(days=min(days, NEWS_API_MAX_DAYS))
+    # 기존과 같이 시작일 자정부터 포함
+    cutoff = start_date.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    feed = store.get_feed("news_api", query, language)
+    if not is_fresh(feed, cutoff):
+        try:
+            articles, (etag, last_modified) = run_sync(fetch_news_api_updates_async(api_key, query, language, feed, cutoff))
+        except CircuitOpenError as e:
+            check_stale_fallback("news_api", query, feed, e)
+        else:
+            store.save_fetch("news_api", query, language, articles, cutoff, etag, last_modified)
+    return store.recent("news_api", query, language, since=cutoff, limit=NEWS_API_RESULT_LIMIT)
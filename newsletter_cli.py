@@ -0,0 +1,298 @@
+# 뉴스레터 일괄 생성 CLI
+# 브라우저 없이 여러 팀의 이슈를 한 프로세스에서 동시에 생성합니다.
+# 같은 프로세스의 이슈들은 HTTP 연결 풀, API 응답 캐시, LLM 완성 캐시를 공유하므로
+# 검색어가 겹치는 이슈는 한 번만 수집/생성합니다.
+#
+# 사용 예:
+#   python newsletter_cli.py issues.yaml --output-dir out --jobs 3
+#
+# 이슈 명세 파일 (YAML은 PyYAML이 설치된 경우에만 지원, 그 외에는 JSON):
+#   defaults:                  # 모든 이슈에 공통으로 적용할 값 (선택)
+#     language: en
+#   issues:                    # 또는 최상위에 이슈 목록만 작성
+#     - name: infra-team       # 출력 파일 이름 (생략 시 issue-{호수})
+#       issue_number: 12
+#       series: infra          # 호수를 매기는 뉴스레터 이름 - 최근 이슈 기사 중복 확인 범위 (생략 시 검색어 조합)
+#       week: 3                # AT/DT 팁 주제를 고를 주차 (생략 시 호수)
+#       news_query_en: "Telecommunication AND AI"
+#       news_query_ko: "AI 인공지능 통신"
+#       highlight: {title: ..., subtitle: ..., link_text: ..., link_url: ...}
+#       custom_success_story: "## ..."   # 선택
+#       force_sections: [aidt_tips]      # 캐시를 무시하고 다시 생성할 섹션 (선택)
+#
+# API 키는 환경 변수 또는 .env 파일에서 읽습니다:
+#   OPENAI_API_KEY, NEWS_API_KEY, NAVER_CLIENT_ID, NAVER_CLIENT_SECRET
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+
+from dotenv import load_dotenv
+from streamlit import config as streamlit_config
+from streamlit.logger import set_log_level
+
+from email_html import EMAIL_SIZE_BUDGET, format_size_report, prepare_email_html
+from http_client import close as close_http_clients
+from issue_store import save_issue
+from rate_limiter import get_rate_limiter
+from resilience import CIRCUIT_CLOSED, DEFAULT_RUN_DEADLINE, circuit_states
+from tracing import TRACE_FILE, start_trace
+from streamlit_app import (
+    DEFAULT_HIGHLIGHT_SETTINGS,
+    NEWSLETTER_SECTIONS,
+    generate_newsletter_content,
+    render_issue_html,
+)
+
+try:
+    import yaml
+except ImportError:  # PyYAML은 선택 사항
+    yaml = None
+
+# 동시에 생성할 이슈 수 기본값 (이슈마다 섹션 그래프가 별도의 스레드 풀을 사용함)
+DEFAULT_JOBS = 2
+
+# 이슈 명세 기본값 - 스트림릿 앱의 입력 기본값과 같음
+SPEC_DEFAULTS = {
+    "issue_number": 1,
+    "news_query_en": "Telecommunication AND AI digital transformation AND artificial intelligence",
+    "news_query_ko": "AI 인공지능 디지털 트랜스포메이션",
+    "language": "en",
+    "custom_success_story": None,
+    "week": None,
+    "series": None,
+    "highlight": None,
+    "force_sections": [],
+}
+
+
+def parse_spec_int(value, field):
+    """명세의 정수 항목(문자열 "7"도 허용)을 1 이상의 정수로 바꿉니다. 바꿀 수 없으면 ValueError를 발생시킵니다."""
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise ValueError(f"{field}는 1 이상의 정수여야 합니다: {value!r}")
+    return number
+
+
+def load_specs(path):
+    """이슈 명세 파일을 읽어 기본값이 채워진 명세 목록을 반환합니다.
+    issue_number/week가 올바른 정수가 아닌 명세는 그 이유를 "invalid"에 담아 반환합니다. (배치의 다른 이슈는 계속 생성)"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise SystemExit("YAML 명세 파일을 읽으려면 PyYAML을 설치하세요: pip install pyyaml")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    if isinstance(data, dict):
+        defaults = data.get("defaults", {})
+        issues = data.get("issues", [])
+    else:
+        defaults, issues = {}, data
+
+    specs = []
+    for i, issue in enumerate(issues):
+        spec = {**SPEC_DEFAULTS, **defaults, **issue}
+        unknown = set(spec) - set(SPEC_DEFAULTS) - {"name"}
+        if unknown:
+            raise SystemExit(f"{i + 1}번째 이슈에 알 수 없는 항목이 있습니다: {', '.join(sorted(unknown))}")
+        try:
+            spec["issue_number"] = parse_spec_int(spec["issue_number"], "issue_number")
+            if spec["week"] is not None:
+                spec["week"] = parse_spec_int(spec["week"], "week")
+        except ValueError as e:
+            spec["invalid"] = str(e)
+        if "name" not in spec:
+            spec["name"] = f"issue-{spec['issue_number']}" if "invalid" in spec else f"issue-{spec['issue_number']:03d}"
+        specs.append(spec)
+
+    names = [spec["name"] for spec in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise SystemExit(f"이슈 이름이 중복되었습니다: {', '.join(duplicates)}")
+    return specs
+
+
+def load_api_keys():
+    """환경 변수(.env 포함)에서 API 키를 읽습니다."""
+    load_dotenv()
+    return {
+        "openai_api_key": os.environ.get("OPENAI_API_KEY"),
+        "news_api_key": os.environ.get("NEWS_API_KEY"),
+        "naver_client_id": os.environ.get("NAVER_CLIENT_ID"),
+        "naver_client_secret": os.environ.get("NAVER_CLIENT_SECRET"),
+    }
+
+
+def generate_issue(spec, api_keys, output_dir, save_artifacts=True, run_deadline=DEFAULT_RUN_DEADLINE,
+                   email_budget=None, trace_path=None):
+    """이슈 하나를 생성해 HTML 파일로 저장하고 결과 요약을 반환합니다.
+    email_budget을 지정하면 이메일용 HTML({이름}.email.html)도 저장하고 크기를 예산과 비교합니다.
+    trace_path를 지정하면 수집, LLM 호출, 변환 단계를 추적해 OTLP/JSON 한 줄로 덧붙이고
+    결과에 구간 종류별 합계 시간(trace_totals)을 넣습니다."""
+    started = time.perf_counter()
+    tracer = start_trace(spec["name"], export_path=trace_path, issue_number=spec["issue_number"]) if trace_path else nullcontext()
+    with tracer as trace:
+        artifact = generate_newsletter_content(
+            api_keys["openai_api_key"],
+            api_keys["news_api_key"],
+            api_keys["naver_client_id"],
+            api_keys["naver_client_secret"],
+            spec["news_query_en"],
+            spec["news_query_ko"],
+            spec["language"],
+            spec["custom_success_story"],
+            spec["issue_number"],
+            force_sections=tuple(spec["force_sections"]),
+            tip_week=spec["week"],
+            run_deadline=run_deadline,
+            series=spec["series"],
+        )
+        html_content = render_issue_html(artifact, spec["issue_number"], spec["highlight"] or DEFAULT_HIGHLIGHT_SETTINGS)
+
+        html_path = os.path.join(output_dir, f"{spec['name']}.html")
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(html_content)
+
+        email_report = None
+        if email_budget is not None:
+            email_report = prepare_email_html(html_content, email_budget)
+            with open(os.path.join(output_dir, f"{spec['name']}.email.html"), "w", encoding="utf-8") as f:
+                f.write(email_report.pop("html"))
+
+    return {
+        "name": spec["name"],
+        "issue_number": spec["issue_number"],
+        "html_path": html_path,
+        "artifact_path": save_issue(artifact) if save_artifacts else None,
+        "elapsed": time.perf_counter() - started,
+        "section_times": artifact["section_times"],
+        "errors": artifact["errors"],
+        "email": email_report,
+        "trace_totals": {kind: round(total, 3) for kind, (_, total, _, _) in trace.kind_totals().items()}
+                        if trace is not None else None,
+    }
+
+
+def format_summary(results, wall_time):
+    """이슈별/섹션별 소요 시간 요약 표를 만듭니다."""
+    sections = [s for s in NEWSLETTER_SECTIONS if any(s in r.get("section_times", {}) for r in results)]
+    header = f"{'이슈':<24}{'전체':>8}" + "".join(f"{s:>14}" for s in sections) + "  상태"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        if "failure" in result:
+            lines.append(f"{result['name']:<24}{result['elapsed']:>7.2f}s  실패: {result['failure']}")
+            continue
+        times = result["section_times"]
+        row = f"{result['name']:<24}{result['elapsed']:>7.2f}s"
+        row += "".join(f"{times[s]:>13.2f}s" if s in times else f"{'-':>14}" for s in sections)
+        row += "  " + (f"오류 {len(result['errors'])}건" if result["errors"] else "완료")
+        lines.append(row)
+    lines.append(f"전체 소요 시간: {wall_time:.2f}s")
+    return "\n".join(lines)
+
+
+def format_quota_usage(usage):
+    """공급자별 오늘 API 사용량을 한 줄로 만듭니다."""
+    parts = []
+    for provider, entry in usage.items():
+        quota = entry["daily_quota"]
+        parts.append(f"{provider} {entry['used']}" + (f"/{int(quota)}" if quota is not None else ""))
+    return "오늘 API 사용량: " + ", ".join(parts)
+
+
+def format_circuit_states(states):
+    """닫혀 있지 않은 공급자 회로를 한 줄로 만듭니다. 모두 닫혀 있으면 None을 반환합니다."""
+    parts = [f"{provider} {entry['state']} (연속 실패 {entry['failures']}회)"
+             for provider, entry in states.items() if entry["state"] != CIRCUIT_CLOSED]
+    return "열린 회로: " + ", ".join(parts) if parts else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="뉴스레터 이슈 일괄 생성")
+    parser.add_argument("spec", help="이슈 명세 파일 (.json, .yaml, .yml)")
+    parser.add_argument("--output-dir", default="output", help="HTML 파일을 저장할 디렉터리")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="동시에 생성할 이슈 수")
+    parser.add_argument("--no-save-issues", action="store_true", help="이슈 아티팩트(JSON)를 저장하지 않음")
+    parser.add_argument("--summary-json", help="요약을 JSON 파일로도 저장할 경로")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_RUN_DEADLINE,
+                        help="이슈 하나의 외부 호출 마감 시간 (초, 재시도 포함)")
+    parser.add_argument("--email", action="store_true",
+                        help="CSS를 요소에 옮기고 공백을 줄인 이메일용 HTML({이름}.email.html)도 저장")
+    parser.add_argument("--email-budget", type=int, default=EMAIL_SIZE_BUDGET,
+                        help="이메일용 HTML 크기 예산 (바이트, 넘으면 경고)")
+    parser.add_argument("--trace", default=TRACE_FILE,
+                        help="이슈마다 실행 추적을 OTLP/JSON 한 줄로 덧붙일 파일 (기본: NEWSLETTER_TRACE_FILE)")
+    args = parser.parse_args(argv)
+
+    # 스트림릿 앱 함수를 스크립트 실행 없이 호출할 때 나오는 경고는 숨김 (오류는 요약에 기록됨)
+    set_log_level("error")
+    streamlit_config.set_option("global.showWarningOnDirectExecution", False)
+
+    specs = load_specs(args.spec)
+    api_keys = load_api_keys()
+    if not api_keys["openai_api_key"] and not (api_keys["naver_client_id"] and api_keys["naver_client_secret"]):
+        raise SystemExit("OPENAI_API_KEY 또는 NAVER_CLIENT_ID/NAVER_CLIENT_SECRET 중 하나는 설정해야 합니다.")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    results = []
+    for spec in specs:
+        if "invalid" in spec:
+            results.append({"name": spec["name"], "issue_number": spec["issue_number"],
+                            "elapsed": 0.0, "failure": f"명세 오류: {spec['invalid']}"})
+            print(f"[실패] {spec['name']}: 명세 오류: {spec['invalid']}", file=sys.stderr)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            futures = {
+                executor.submit(generate_issue, spec, api_keys, args.output_dir, not args.no_save_issues,
+                                args.deadline, args.email_budget if args.email else None, args.trace): spec
+                for spec in specs if "invalid" not in spec
+            }
+            for future in as_completed(futures):
+                spec = futures[future]
+                try:
+                    result = future.result()
+                    print(f"[완료] {spec['name']} → {result['html_path']} ({result['elapsed']:.2f}s)")
+                    if result["email"] is not None:
+                        stream = sys.stdout if result["email"]["within_budget"] else sys.stderr
+                        print(f"       {format_size_report(result['email'])}", file=stream)
+                except Exception as e:
+                    result = {"name": spec["name"], "issue_number": spec["issue_number"],
+                              "elapsed": time.perf_counter() - started, "failure": str(e)}
+                    print(f"[실패] {spec['name']}: {e}", file=sys.stderr)
+                results.append(result)
+    finally:
+        close_http_clients()
+    wall_time = time.perf_counter() - started
+
+    # 명세 파일 순서대로 정렬하여 출력
+    order = {spec["name"]: i for i, spec in enumerate(specs)}
+    results.sort(key=lambda r: order[r["name"]])
+    quota_usage = get_rate_limiter().usage()
+    print()
+    print(format_summary(results, wall_time))
+    print(format_quota_usage(quota_usage))
+    circuits = circuit_states()
+    circuit_line = format_circuit_states(circuits)
+    if circuit_line:
+        print(circuit_line)
+
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as f:
+            json.dump({"wall_time": wall_time, "issues": results, "quota": quota_usage,
+                       "circuits": circuits}, f, ensure_ascii=False, indent=2)
+
+    return 1 if any("failure" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
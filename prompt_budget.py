@@ -0,0 +1,217 @@
+# 프롬프트 토큰 예산
+# 섹션 프롬프트의 입력 토큰 수를 로컬 토크나이저로 세고 줄입니다.
+#   - 삼중 따옴표 f-문자열의 들여쓰기, 줄 끝 공백, 연속된 빈 줄을 없앰 (지시문 내용과 출력 형식은 그대로)
+#   - 기사/블로그 항목은 항목별 예산(PROMPT_ITEM_TOKENS) 안으로 요약을 앞 문장 위주로 줄이고 URL의 추적용 파라미터를 없앰
+#   - 섹션 프롬프트 전체가 섹션 예산(SECTION_PROMPT_TOKENS)을 넘으면 우선순위가 낮은(뒤쪽) 항목부터 뺌
+# tiktoken 패키지가 설치되어 있고 인코딩을 읽을 수 있으면 모델의 토크나이저로 정확히 세고, 아니면 문자 수로 추정합니다.
+# (benchmarks/bench_prompt_budget.py 참고)
+import importlib.util
+import logging
+import os
+import re
+import threading
+import time
+
+from article_store import canonical_url, clean_text
+
+logger = logging.getLogger(__name__)
+
+# tiktoken 패키지가 설치되어 있으면 모델의 토크나이저로 토큰 수 계산
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+# 모델 이름으로 인코딩을 찾지 못했을 때 사용하는 인코딩 (GPT-4 계열)
+DEFAULT_ENCODING = "cl100k_base"
+
+# 프롬프트에 넣는 기사 한 건(제목, 날짜, 요약, 출처, URL 등)의 최대 토큰 수 (환경 변수로 변경 가능)
+PROMPT_ITEM_TOKENS = int(os.environ.get("NEWSLETTER_PROMPT_ITEM_TOKENS", 120))
+
+# 섹션 프롬프트 한 개의 최대 입력 토큰 수 (환경 변수로 변경 가능)
+SECTION_PROMPT_TOKENS = int(os.environ.get("NEWSLETTER_PROMPT_SECTION_TOKENS", 1500))
+
+# 요약을 줄일 때 붙이는 표시
+ELLIPSIS = "…"
+
+# 문장 끝 (마침표, 물음표, 느낌표 뒤의 공백)
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+_INDENT = re.compile(r"^[ \t]*")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+# 인코딩을 처음 읽을 때(내려받기 포함) 기다리는 최대 시간(초, 환경 변수로 변경 가능)
+# tiktoken은 시간 제한 없이 내려받으므로, 이 시간이 지나면 읽기는 백그라운드에서 계속하고 그동안은 문자 수로 추정
+ENCODING_LOAD_TIMEOUT = float(os.environ.get("NEWSLETTER_TIKTOKEN_TIMEOUT", 10))
+
+# 인코딩을 읽지 못했을 때 다시 시도하기까지의 시간(초)
+ENCODING_RETRY_INTERVAL = 60
+
+# 인코딩 이름 -> 읽기 작업 (잠금은 작업을 찾거나 만들 때만 잡고, 읽기는 잠금 밖의 스레드에서 실행)
+_encoding_lock = threading.Lock()
+_encoding_loads = {}
+
+
+def _encoding(model):
+    """모델의 tiktoken 인코딩을 반환합니다. tiktoken이 없거나 인코딩을 읽지 못하면(오프라인 등) None입니다."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    import tiktoken
+    try:
+        name = tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        name = DEFAULT_ENCODING
+    return _load_encoding(name)
+
+
+class _EncodingLoad:
+    """tiktoken 인코딩 하나를 데몬 스레드에서 읽는 작업 (처음에는 내려받아 TIKTOKEN_CACHE_DIR에 저장)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.encoding = None
+        self.failed_at = None
+        self.wait_until = time.monotonic() + ENCODING_LOAD_TIMEOUT
+        self.done = threading.Event()
+        threading.Thread(target=self._run, name=f"tiktoken-{name}", daemon=True).start()
+
+    def _run(self):
+        import tiktoken
+        try:
+            self.encoding = tiktoken.get_encoding(self.name)
+        except Exception as e:
+            logger.warning(f"tiktoken 인코딩({self.name})을 읽지 못해 토큰 수를 추정합니다: {e}")
+            self.failed_at = time.monotonic()
+        finally:
+            self.done.set()
+
+
+def _load_encoding(name):
+    """인코딩을 반환합니다. 읽는 중이면 처음 읽기 시작한 뒤 ENCODING_LOAD_TIMEOUT초까지만 기다리고,
+    그 안에 읽지 못했거나 실패했으면 None입니다. 실패는 기억하지 않고 ENCODING_RETRY_INTERVAL초 뒤에 다시 읽습니다."""
+    with _encoding_lock:
+        load = _encoding_loads.get(name)
+        if load is None or (load.failed_at is not None and time.monotonic() - load.failed_at >= ENCODING_RETRY_INTERVAL):
+            load = _encoding_loads[name] = _EncodingLoad(name)
+    if load.encoding is None:
+        load.done.wait(max(0.0, load.wait_until - time.monotonic()))
+    return load.encoding
+
+
+def count_tokens(text, model=None):
+    """text의 토큰 수를 반환합니다.
+    tiktoken을 쓸 수 없으면 ASCII 4자당 1토큰, 그 밖의 문자(한글 등) 1자당 1토큰으로 추정합니다."""
+    if not text:
+        return 0
+    encoding = _encoding(model or "")
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + len(text) - ascii_chars
+
+
+def compact_prompt(text):
+    """삼중 따옴표 문자열의 들여쓰기와 줄 끝 공백, 연속된 빈 줄을 없앤 프롬프트를 반환합니다.
+    첫 줄의 들여쓰기를 기준으로 그보다 깊게 들여쓴 줄(목록의 하위 항목 등)은 차이만큼 들여쓰기를 남기고,
+    기준보다 얕게 들여쓴 줄(f-문자열로 끼워 넣은 내용)은 그대로 둡니다."""
+    lines = [line.rstrip() for line in text.strip("\n").splitlines()]
+    base = next((len(_INDENT.match(line).group()) for line in lines if line), 0)
+    compacted = []
+    for line in lines:
+        indent = len(_INDENT.match(line).group())
+        compacted.append(line[base:] if indent >= base else line)
+    return _BLANK_LINES.sub("\n\n", "\n".join(compacted)).strip()
+
+
+def truncate_tokens(text, max_tokens, model=None):
+    """text를 max_tokens 토큰 이하로 줄입니다.
+    앞에서부터 들어가는 만큼의 단어를 남기되, 절반 이상 남는다면 문장 끝에서 자르고(앞 문장 요약),
+    문장 중간에서 잘랐으면 말줄임표를 붙입니다."""
+    text = text.strip()
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    words = text.split()
+    # 들어가는 가장 긴 단어 수를 이분 탐색 (단어가 늘면 토큰 수도 늘어남)
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle]) + ELLIPSIS, model) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    kept = " ".join(words[:low])
+    if not kept:
+        # 첫 단어(긴 URL 등)부터 예산을 넘으면 문자 단위로 자름
+        kept = words[0]
+        while kept and count_tokens(kept + ELLIPSIS, model) > max_tokens:
+            kept = kept[:len(kept) * 3 // 4]
+        return kept + ELLIPSIS if kept else ""
+    sentences = _SENTENCE_END.split(kept)
+    if len(sentences) > 1:
+        # 마지막 조각이 완결된 문장이 아니면 버림
+        complete = " ".join(sentences[:-1])
+        if len(complete) * 2 >= len(kept):
+            return complete
+    return kept + ELLIPSIS
+
+
+def format_prompt_item(number, fields, summary_label, max_tokens=PROMPT_ITEM_TOKENS, model=None):
+    """기사/검색 결과 한 건을 번호 목록 항목 텍스트로 만듭니다.
+
+    fields는 (이름, 값) 목록이며 값의 태그와 HTML 엔티티는 없애고, 이름이 'URL'이나 '링크'인 값은 추적용
+    파라미터를 없앤 대표 URL로 바꿉니다. summary_label 항목(요약, 설명)은 항목 전체가 max_tokens 안에
+    들도록 줄이고, 남는 예산이 없으면 뺍니다.
+    """
+    lines = []
+    summary_index = None
+    summary = ""
+    for label, value in fields:
+        value = "" if value is None else str(value)
+        if label in ("URL", "링크"):
+            value = canonical_url(value) or value
+        else:
+            value = clean_text(value)
+        if label == summary_label:
+            summary_index = len(lines)
+            summary = value
+            lines.append(None)
+        else:
+            lines.append(f"{label}: {value}")
+
+    def render(summary_line):
+        rendered = [summary_line if line is None else line for line in lines]
+        rendered = [line for line in rendered if line is not None]
+        return f"{number}. " + "\n   ".join(rendered) + "\n"
+
+    if summary_index is not None:
+        budget = max_tokens - count_tokens(render(f"{summary_label}: "), model)
+        summary = truncate_tokens(summary, budget, model)
+        return render(f"{summary_label}: {summary}" if summary else None)
+    return render(None)
+
+
+def fit_prompt(build, max_tokens=SECTION_PROMPT_TOKENS, model=None, **blocks):
+    """build(**블록 텍스트)로 만든 프롬프트를 줄인 뒤, max_tokens를 넘으면 항목을 빼서 맞춥니다.
+
+    blocks의 값은 문자열(그대로 사용) 또는 항목 문자열 목록입니다. 예산을 넘는 동안 항목이 가장 많은
+    블록(같으면 뒤쪽 블록)의 마지막 항목부터 빼며, 블록마다 최소 1개 항목은 남깁니다.
+    그래도 넘으면 경고를 남기고 그대로 반환합니다.
+    """
+    items = {name: list(value) for name, value in blocks.items() if not isinstance(value, str)}
+
+    def render():
+        texts = {name: value if isinstance(value, str) else "\n".join(items[name])
+                 for name, value in blocks.items()}
+        return compact_prompt(build(**texts))
+
+    prompt = render()
+    tokens = count_tokens(prompt, model)
+    while tokens > max_tokens:
+        droppable = [name for name in items if len(items[name]) > 1]
+        if not droppable:
+            logger.warning(f"프롬프트가 입력 토큰 예산을 넘습니다: {tokens} > {max_tokens}")
+            break
+        longest = max(len(items[name]) for name in droppable)
+        name = [name for name in droppable if len(items[name]) == longest][-1]
+        items[name].pop()
+        prompt = render()
+        tokens = count_tokens(prompt, model)
+    return prompt
@@ -0,0 +1,248 @@
+# 외부 API 호출 속도 제한과 일일 할당량 관리
+# 공급자(네이버, 유튜브, NewsAPI, OpenAI)마다 토큰 버킷을 하나씩 두어 초당 호출 수를 고르게 맞추고,
+# 하루 사용량을 SQLite 장부에 기록해 재시작 후에도 이어서 셉니다.
+# 호출 전에 남은 할당량을 먼저 확인(사전 승인)하므로, 할당량이 부족하면 네트워크 요청 없이 바로 실패하고
+# 속도 제한에 걸릴 호출은 429 응답을 받는 대신 차례가 올 때까지 기다립니다.
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from resilience import DeadlineExceededError, check_deadline, remaining_time
+from response_cache import CACHE_DIR
+
+# 할당량 장부 파일 위치
+QUOTA_DB_PATH = os.path.join(CACHE_DIR, "quota.sqlite3")
+
+
+def _env_number(name, default):
+    """환경 변수 값을 숫자로 읽습니다. 비어 있거나 'none'이면 제한 없음(None)입니다."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if value.strip().lower() in ("", "none"):
+        return None
+    return float(value)
+
+
+def _provider_limits(provider, rate, burst, daily_quota, reset_utc_offset):
+    prefix = f"NEWSLETTER_LIMIT_{provider.upper()}_"
+    return {
+        "rate": _env_number(prefix + "RATE", rate),
+        "burst": _env_number(prefix + "BURST", burst),
+        "daily_quota": _env_number(prefix + "QUOTA", daily_quota),
+        "reset_utc_offset": reset_utc_offset,
+    }
+
+
+# 공급자별 제한 (환경 변수 NEWSLETTER_LIMIT_<공급자>_RATE/_BURST/_QUOTA로 변경 가능)
+#   rate: 초당 호출 수, burst: 한꺼번에 보낼 수 있는 호출 수, daily_quota: 하루 사용 가능 단위 수
+#   reset_utc_offset: 할당량이 초기화되는 자정의 UTC 기준 시차 (일광 절약 시간은 반영하지 않음)
+PROVIDER_LIMITS = {
+    # 네이버 검색 API - 하루 25,000회
+    "naver": _provider_limits("naver", rate=10, burst=10, daily_quota=25000, reset_utc_offset=9),
+    # YouTube Data API - 하루 10,000단위 (search.list 호출당 100단위), 태평양 시간 자정에 초기화
+    "youtube": _provider_limits("youtube", rate=2, burst=4, daily_quota=10000, reset_utc_offset=-8),
+    # NewsAPI 무료(Developer) 플랜 - 하루 100회
+    "news_api": _provider_limits("news_api", rate=1, burst=2, daily_quota=100, reset_utc_offset=0),
+    # OpenAI - 분당 요청 수는 계정 등급마다 다르므로 보수적으로 설정, 일일 한도 없음
+    "openai": _provider_limits("openai", rate=1, burst=5, daily_quota=None, reset_utc_offset=0),
+}
+
+# 호스트 -> 공급자
+PROVIDER_HOSTS = {
+    "openapi.naver.com": "naver",
+    "www.googleapis.com": "youtube",
+    "newsapi.org": "news_api",
+}
+
+# 호출당 할당량 단위 (기본 1단위)
+YOUTUBE_SEARCH_COST = 100
+
+
+class QuotaExceededError(Exception):
+    """오늘 남은 할당량이 부족해 호출을 보내지 않았을 때 발생하는 오류"""
+
+
+def provider_for_url(url):
+    """URL로 (공급자, 호출당 할당량 단위)를 반환합니다. 제한 대상이 아니면 (None, 0)입니다."""
+    parts = urlsplit(url)
+    provider = PROVIDER_HOSTS.get(parts.netloc)
+    if provider is None:
+        return None, 0
+    if provider == "youtube" and parts.path.rstrip("/").endswith("/search"):
+        return provider, YOUTUBE_SEARCH_COST
+    return provider, 1
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 모이는 토큰 버킷
+
+    토큰이 부족해도 미리 예약해 두고 기다릴 시간을 돌려주므로, 기다리는 호출은 요청한 순서대로 처리됩니다.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """토큰을 예약하고 사용할 수 있을 때까지 기다려야 하는 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def release(self, tokens=1):
+        """예약했지만 쓰지 않은 토큰을 돌려줍니다."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+
+class QuotaLedger:
+    """공급자별 하루 사용량을 SQLite 파일에 기록하는 장부"""
+
+    def __init__(self, path=QUOTA_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        if path != ":memory:":
+            # 여러 프로세스가 같은 장부를 함께 쓰도록 WAL 모드 사용
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS usage (
+                provider TEXT NOT NULL,
+                day TEXT NOT NULL,
+                units INTEGER NOT NULL,
+                PRIMARY KEY (provider, day)
+            )
+        """)
+
+    def used(self, provider, day):
+        """공급자가 그날 사용한 단위 수를 반환합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT units FROM usage WHERE provider = ? AND day = ?", (provider, day)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def reserve(self, provider, day, units, quota):
+        """할당량 안에서 units만큼 사용을 기록하고 그날 사용량을 반환합니다.
+        할당량을 넘으면 기록하지 않고 QuotaExceededError를 발생시킵니다."""
+        with self._lock:
+            # 다른 프로세스와 동시에 예약해도 할당량을 넘지 않도록 쓰기 잠금을 먼저 잡음
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT units FROM usage WHERE provider = ? AND day = ?", (provider, day)
+                ).fetchone()
+                used = row[0] if row else 0
+                if quota is not None and used + units > quota:
+                    raise QuotaExceededError(
+                        f"{provider} 일일 할당량을 모두 사용했습니다 ({used}/{int(quota)}단위, 기준일 {day})"
+                    )
+                self._conn.execute(
+                    "INSERT INTO usage (provider, day, units) VALUES (?, ?, ?) "
+                    "ON CONFLICT (provider, day) DO UPDATE SET units = units + excluded.units",
+                    (provider, day, units)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return used + units
+
+
+class RateLimiter:
+    """공급자별 토큰 버킷과 할당량 장부로 외부 API 호출을 승인하는 제한기"""
+
+    def __init__(self, limits=None, ledger=None):
+        self.limits = dict(PROVIDER_LIMITS if limits is None else limits)
+        self.ledger = ledger if ledger is not None else QuotaLedger()
+        self._buckets = {
+            provider: TokenBucket(limit["rate"], limit["burst"] or 1)
+            for provider, limit in self.limits.items() if limit.get("rate")
+        }
+
+    def quota_day(self, provider):
+        """공급자의 할당량 기준일(초기화 시각 기준 날짜)을 반환합니다."""
+        offset = self.limits[provider].get("reset_utc_offset") or 0
+        return datetime.now(timezone(timedelta(hours=offset))).strftime("%Y-%m-%d")
+
+    def _admit(self, provider, units):
+        """토큰 버킷에서 차례를 예약하고 할당량을 예약한 뒤 기다려야 할 시간(초)을 반환합니다.
+        차례가 실행 마감 시간 뒤이면 할당량을 쓰지 않고 DeadlineExceededError를 발생시킵니다.
+        할당량이 부족하거나 마감 시간 뒤라 호출하지 않으면 예약한 토큰을 돌려줍니다."""
+        limit = self.limits.get(provider)
+        if limit is None:
+            return 0.0
+        bucket = self._buckets.get(provider)
+        wait = bucket.reserve() if bucket is not None else 0.0
+        try:
+            if wait > 0 and remaining_time(wait) < wait:
+                raise DeadlineExceededError(
+                    f"{provider} 호출 차례({wait:.1f}초 뒤)가 생성 마감 시간 뒤라 외부 호출을 중단했습니다."
+                )
+            self.ledger.reserve(provider, self.quota_day(provider), units, limit.get("daily_quota"))
+        except BaseException:
+            if bucket is not None:
+                bucket.release()
+            raise
+        return wait
+
+    def acquire(self, provider, units=1):
+        """호출 한 번을 승인받을 때까지 기다립니다. (동기 코드용)
+        할당량이 부족하면 QuotaExceededError를, 마감 시간 안에 차례가 오지 않으면 DeadlineExceededError를 발생시킵니다."""
+        check_deadline()
+        wait = self._admit(provider, units)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, provider, units=1):
+        """acquire의 비동기 버전입니다. 기다리는 동안 이벤트 루프를 막지 않습니다.
+        SQLite 장부 예약(쓰기 잠금을 최대 30초까지 기다릴 수 있음)은 작업 스레드에서 실행합니다."""
+        check_deadline()
+        wait = await asyncio.to_thread(self._admit, provider, units)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def remaining(self, provider):
+        """공급자의 오늘 남은 할당량(단위)을 반환합니다. 일일 한도가 없으면 None입니다."""
+        quota = self.limits.get(provider, {}).get("daily_quota")
+        if quota is None:
+            return None
+        return max(0, int(quota) - self.ledger.used(provider, self.quota_day(provider)))
+
+    def usage(self):
+        """공급자별 오늘 사용량과 일일 한도를 반환합니다."""
+        return {
+            provider: {
+                "day": self.quota_day(provider),
+                "used": self.ledger.used(provider, self.quota_day(provider)),
+                "daily_quota": limit.get("daily_quota"),
+            }
+            for provider, limit in self.limits.items()
+        }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """프로세스 전역에서 공유하는 RateLimiter 인스턴스를 반환합니다."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+    return _limiter
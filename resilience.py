@@ -0,0 +1,236 @@
+# 외부 호출 복원력 - 재시도 정책과 실행 마감 시간
+# 일시적인 오류(5xx, 429, 연결 오류)는 지터가 있는 지수 백오프로 몇 번 다시 시도하고,
+# 서버가 Retry-After를 보내면 그 시간을 따릅니다.
+# 뉴스레터 한 번을 생성하는 동안의 모든 외부 호출은 하나의 마감 시간(Deadline)을 공유하므로
+# 재시도와 대기를 합쳐도 생성 시간이 마감 시간을 넘지 않습니다.
+# 공급자마다 서킷 브레이커를 두어, 장애가 이어지는 공급자는 잠시 호출하지 않고 바로 실패시킵니다.
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+# 다시 시도할 HTTP 상태 코드
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# 서킷 브레이커가 공급자 장애로 세는 HTTP 상태 코드 (429는 속도 제한이므로 장애로 보지 않음)
+CIRCUIT_FAILURE_STATUSES = frozenset({408, 500, 502, 503, 504})
+
+# 최대 시도 횟수 (첫 시도 포함)
+MAX_ATTEMPTS = int(os.environ.get("NEWSLETTER_MAX_ATTEMPTS", 4))
+
+# 지수 백오프 기본 대기 시간과 최대 대기 시간 (초)
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# 뉴스레터 한 번 생성의 기본 마감 시간 (초)
+DEFAULT_RUN_DEADLINE = float(os.environ.get("NEWSLETTER_RUN_DEADLINE", 180))
+
+# 회로를 여는 연속 실패 횟수
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("NEWSLETTER_CIRCUIT_FAILURES", 5))
+
+# 회로를 연 뒤 시험 호출을 한 번 허용하기까지 기다리는 시간 (초)
+CIRCUIT_RESET_TIMEOUT = float(os.environ.get("NEWSLETTER_CIRCUIT_RESET", 30))
+
+# 서킷 브레이커 상태
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class DeadlineExceededError(TimeoutError):
+    """실행 마감 시간이 지나 외부 호출을 보내지 않았을 때 발생하는 오류"""
+
+
+class CircuitOpenError(Exception):
+    """공급자의 회로가 열려 있어 외부 호출을 보내지 않았을 때 발생하는 오류"""
+
+
+class Deadline:
+    """단조 시계 기준의 마감 시각"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        """마감까지 남은 시간(초)을 반환합니다. 지났으면 0 이하입니다."""
+        return self.expires_at - time.monotonic()
+
+
+_current_deadline = contextvars.ContextVar("newsletter_deadline", default=None)
+
+
+def current_deadline():
+    """현재 실행에 적용되는 Deadline을 반환합니다. 없으면 None입니다."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def use_deadline(deadline):
+    """블록 안에서 주어진 Deadline(또는 None)을 현재 마감 시간으로 사용합니다."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """블록 안의 외부 호출이 seconds초 안에 끝나도록 마감 시간을 정합니다.
+    이미 더 이른 마감 시간이 있으면 그것을 그대로 사용합니다. seconds가 None이면 마감 시간을 두지 않습니다."""
+    outer = current_deadline()
+    if seconds is None or (outer is not None and outer.remaining() <= seconds):
+        yield outer
+        return
+    with use_deadline(Deadline(seconds)) as deadline:
+        yield deadline
+
+
+def check_deadline():
+    """마감 시간이 이미 지났으면 DeadlineExceededError를 발생시킵니다."""
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() <= 0:
+        raise DeadlineExceededError(f"생성 마감 시간({deadline.seconds:.0f}초)이 지나 외부 호출을 중단했습니다.")
+
+
+def remaining_time(limit):
+    """limit초와 마감까지 남은 시간 중 짧은 쪽을 반환합니다.
+    마감 시간이 이미 지났으면 DeadlineExceededError를 발생시킵니다."""
+    check_deadline()
+    deadline = current_deadline()
+    return limit if deadline is None else min(limit, deadline.remaining())
+
+
+def retry_after_seconds(headers):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 반환합니다. 없거나 읽을 수 없으면 None입니다."""
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_delay(attempt, headers=None):
+    """attempt번째 시도가 실패한 뒤 다음 시도까지 기다릴 시간(초)을 반환합니다.
+    Retry-After가 있으면 그 값을, 없으면 전체 지터(full jitter) 지수 백오프 값을 사용합니다."""
+    retry_after = retry_after_seconds(headers)
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def should_retry(attempt, delay):
+    """attempt번째 시도가 실패했을 때 delay초 기다린 뒤 다시 시도할 수 있는지 반환합니다.
+    최대 시도 횟수에 도달했거나 기다리는 동안 마감 시간이 지나면 다시 시도하지 않습니다."""
+    if attempt >= MAX_ATTEMPTS:
+        return False
+    deadline = current_deadline()
+    return deadline is None or deadline.remaining() > delay
+
+
+class CircuitBreaker:
+    """공급자 하나의 서킷 브레이커 (closed -> open -> half_open -> closed)
+
+    연속으로 failure_threshold번 실패하면 회로를 열어(open) reset_timeout초 동안 호출을 바로 거절합니다.
+    그 뒤 시험 호출 하나만 허용하고(half_open), 성공하면 회로를 닫고 실패하면 다시 엽니다.
+    """
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """현재 상태를 반환합니다. 열린 지 reset_timeout초가 지났으면 half_open입니다."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == CIRCUIT_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return CIRCUIT_HALF_OPEN
+        return self._state
+
+    def before_call(self):
+        """호출을 보내도 되는지 확인합니다. 회로가 열려 있으면 CircuitOpenError를 발생시킵니다.
+        half_open 상태에서는 시험 호출 하나만 통과시킵니다. (결과를 기록하지 못한 시험 호출은
+        reset_timeout초가 지나면 다른 호출이 대신합니다)"""
+        with self._lock:
+            state = self._current_state()
+            if state == CIRCUIT_CLOSED:
+                return
+            now = time.monotonic()
+            if state == CIRCUIT_HALF_OPEN and (
+                    self._probe_started is None or now - self._probe_started >= self.reset_timeout):
+                self._state = CIRCUIT_HALF_OPEN
+                self._probe_started = now
+                return
+            retry_in = max(0.0, self.reset_timeout - (now - self._opened_at))
+        raise CircuitOpenError(f"{self.name} 호출이 계속 실패해 잠시 중단했습니다 (약 {retry_in:.0f}초 후 다시 시도)")
+
+    def record_success(self):
+        """호출이 성공(공급자가 정상 응답)했음을 기록하고 회로를 닫습니다."""
+        with self._lock:
+            if self._state != CIRCUIT_CLOSED:
+                logger.info(f"{self.name} 회로를 닫습니다 (시험 호출 성공)")
+            self._state = CIRCUIT_CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self):
+        """호출이 실패했음을 기록합니다. 연속 실패가 기준에 도달하거나 시험 호출이 실패하면 회로를 엽니다."""
+        with self._lock:
+            self._failures += 1
+            if self._state == CIRCUIT_HALF_OPEN or (
+                    self._state == CIRCUIT_CLOSED and self._failures >= self.failure_threshold):
+                logger.warning(f"{self.name} 회로를 엽니다 (연속 {self._failures}회 실패, {self.reset_timeout:.0f}초 동안 호출 중단)")
+                self._state = CIRCUIT_OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+    def snapshot(self):
+        """현재 상태와 연속 실패 횟수를 반환합니다."""
+        with self._lock:
+            return {"state": self._current_state(), "failures": self._failures}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name):
+    """프로세스 전역에서 공유하는 공급자별 CircuitBreaker를 반환합니다."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def circuit_states():
+    """지금까지 사용한 공급자별 서킷 브레이커 상태를 반환합니다."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
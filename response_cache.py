@@ -0,0 +1,154 @@
+# 프로세스 전역 + 디스크 응답 캐시
+# 모든 세션과 재시작 사이에서 공유되는 SQLite 기반 캐시입니다.
+# 소스별 TTL, 크기 제한 LRU 제거, 적중/미스 카운터를 제공합니다.
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# 캐시 파일 위치 (환경 변수로 변경 가능)
+CACHE_DIR = os.environ.get(
+    "NEWSLETTER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+CACHE_DB_PATH = os.path.join(CACHE_DIR, "responses.sqlite3")
+
+# 기본 캐시 유효 시간 (24시간)
+DEFAULT_TTL = 60 * 60 * 24
+
+# 소스별 캐시 유효 시간 (초) - 뉴스는 빨리 바뀌므로 짧게 유지
+# LLM 완성 결과는 같은 프롬프트에 대해 다시 쓸 수 있으므로 길게 유지 (환경 변수로 변경 가능)
+SOURCE_TTL = {
+    "naver_blog": 60 * 60 * 24,
+    "naver_web": 60 * 60 * 24,
+    "naver_news": 60 * 60 * 3,
+    "youtube": 60 * 60 * 24,
+    "llm": int(os.environ.get("NEWSLETTER_LLM_CACHE_TTL", 60 * 60 * 24 * 7)),
+}
+
+# 캐시 크기 제한
+MAX_ENTRIES = 5000
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class ResponseCache:
+    """SQLite 파일에 API 응답(JSON)을 저장하는 LRU 캐시"""
+
+    def __init__(self, path=CACHE_DB_PATH, source_ttl=None, default_ttl=DEFAULT_TTL,
+                 max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.path = path
+        self.source_ttl = dict(SOURCE_TTL if source_ttl is None else source_ttl)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != ":memory:":
+            # 여러 프로세스가 같은 파일을 읽고 쓸 수 있도록 WAL 모드 사용
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        self._conn.commit()
+
+    def ttl_for(self, source):
+        """소스의 캐시 유효 시간(초)을 반환합니다."""
+        return self.source_ttl.get(source, self.default_ttl)
+
+    def get(self, key, source, allow_stale=False):
+        """캐시된 값을 반환합니다. 없거나 만료되었으면 None을 반환합니다.
+        allow_stale이 참이면 만료된 값도 반환합니다. (공급자 장애 시 대체 콘텐츠용)
+        만료된 값은 바로 지우지 않고 새 값으로 덮어쓰이거나 LRU 제거될 때까지 남겨 둡니다."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (not allow_stale and now - row[1] >= self.ttl_for(source)):
+                self.misses[source] = self.misses.get(source, 0) + 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits[source] = self.hits.get(source, 0) + 1
+        return json.loads(row[0])
+
+    def set(self, key, source, value):
+        """값을 캐시에 저장하고 크기 제한을 넘으면 오래 사용하지 않은 항목부터 제거합니다."""
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, source, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source, data, len(data.encode("utf-8")), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def clear(self):
+        """캐시를 비우고 카운터를 초기화합니다."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self.hits.clear()
+            self.misses.clear()
+
+    def stats(self):
+        """적중/미스 카운터와 현재 저장 크기를 반환합니다."""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            hits = sum(self.hits.values())
+            misses = sum(self.misses.values())
+            return {
+                "entries": count,
+                "bytes": total,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "by_source": {
+                    source: {"hits": self.hits.get(source, 0), "misses": self.misses.get(source, 0)}
+                    for source in sorted(set(self.hits) | set(self.misses))
+                },
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """프로세스 전역에서 공유하는 ResponseCache 인스턴스를 반환합니다."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+    return _cache
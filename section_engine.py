@@ -0,0 +1,132 @@
+# 뉴스레터 섹션 실행 엔진
+# 각 섹션(및 데이터 수집 단계)을 의존성 그래프의 노드로 보고,
+# 서로 독립적인 노드는 제한된 크기의 스레드 풀에서 동시에 실행합니다.
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from tracing import span
+
+# 기본 동시 실행 워커 수
+DEFAULT_MAX_WORKERS = 6
+
+
+class SectionNode:
+    """의존성 그래프의 노드 (섹션 또는 데이터 수집 단계)"""
+
+    def __init__(self, name, func, deps=(), fallback=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.fallback = fallback
+
+
+class SectionRunResult:
+    """섹션 그래프 실행 결과 - 결과값, 오류, 노드별 시작/종료 시각(초)"""
+
+    def __init__(self):
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+        self.wall_time = 0.0
+
+    def duration(self, name):
+        """노드의 실행 시간(초)을 반환합니다. 실행되지 않은 노드는 0입니다."""
+        start, end = self.timings.get(name, (0.0, 0.0))
+        return end - start
+
+    def format_report(self):
+        """노드별 소요 시간을 사람이 읽기 쉬운 문자열로 반환합니다."""
+        lines = []
+        for name, (start, end) in sorted(self.timings.items(), key=lambda x: x[1][0]):
+            status = "오류" if name in self.errors else "완료"
+            lines.append(f"{name:<20} {start:6.2f}s → {end:6.2f}s  ({end - start:5.2f}s, {status})")
+        lines.append(f"{'전체':<20} {self.wall_time:6.2f}s")
+        return "\n".join(lines)
+
+
+class SectionGraph:
+    """섹션 노드를 등록하고 의존성 순서에 맞춰 병렬 실행하는 그래프"""
+
+    def __init__(self):
+        self.nodes = {}
+
+    def add(self, name, func, deps=(), fallback=None):
+        """노드를 등록합니다.
+
+        func는 의존 노드 이름을 키워드 인자로 받아 결과를 반환해야 합니다.
+        fallback이 있으면 노드(또는 의존 노드)가 실패했을 때 fallback(오류)의 값을 결과로 사용합니다.
+        의존 노드는 반드시 먼저 등록되어 있어야 합니다.
+        """
+        if name in self.nodes:
+            raise ValueError(f"이미 등록된 노드입니다: {name}")
+        for dep in deps:
+            if dep not in self.nodes:
+                raise ValueError(f"등록되지 않은 의존 노드입니다: {name} -> {dep}")
+        self.nodes[name] = SectionNode(name, func, deps, fallback)
+        return self
+
+    def run(self, max_workers=DEFAULT_MAX_WORKERS, initializer=None, on_finish=None):
+        """그래프 전체를 실행하고 SectionRunResult를 반환합니다.
+
+        on_finish가 있으면 노드가 끝날 때마다 run()을 호출한 스레드에서 on_finish(이름, 결과)를 호출합니다.
+        결과가 없는(대체값 없이 실패한) 노드는 None이 전달됩니다.
+        노드는 run()을 호출한 스레드의 컨텍스트 변수를 복사한 컨텍스트에서 실행됩니다.
+        """
+        run = SectionRunResult()
+        started = time.perf_counter()
+
+        def call_node(node, kwargs):
+            begin = time.perf_counter() - started
+            try:
+                with span(node.name, kind="section"):
+                    value = node.func(**kwargs)
+                error = None
+            except Exception as e:
+                value, error = None, e
+            return value, error, begin, time.perf_counter() - started
+
+        def finish(node, value, error):
+            if error is None:
+                run.results[node.name] = value
+                return
+            run.errors[node.name] = error
+            if node.fallback is not None:
+                run.results[node.name] = node.fallback(error)
+
+        def report(node):
+            if on_finish is not None:
+                on_finish(node.name, run.results.get(node.name))
+
+        pending = dict(self.nodes)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers, initializer=initializer) as executor:
+            while pending or running:
+                for name, node in list(pending.items()):
+                    failed = [dep for dep in node.deps if dep in run.errors and dep not in run.results]
+                    if failed:
+                        # 의존 노드가 대체값 없이 실패하면 실행하지 않고 같은 오류로 처리
+                        del pending[name]
+                        finish(node, None, run.errors[failed[0]])
+                        report(node)
+                    elif all(dep in run.results for dep in node.deps):
+                        del pending[name]
+                        kwargs = {dep: run.results[dep] for dep in node.deps}
+                        # 호출한 스레드의 컨텍스트 변수(실행 마감 시간 등)를 노드에서도 사용하도록 복사해서 실행
+                        context = contextvars.copy_context()
+                        running[executor.submit(context.run, call_node, node, kwargs)] = node
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    value, error, begin, end = future.result()
+                    run.timings[node.name] = (begin, end)
+                    finish(node, value, error)
+                    report(node)
+
+        run.wall_time = time.perf_counter() - started
+        return run
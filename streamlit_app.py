@@ -1,184 +1,92 @@
 import streamlit as st
 from openai import OpenAI
-from datetime import datetime, timedelta
-import base64
+from datetime import datetime
+import io
 import os
-import re
-import requests
+import json
+import hashlib
+import asyncio
+import tarfile
+import threading
+import time
+import zipfile
+from contextlib import ExitStack
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from http_client import async_get, run_sync
+from issue_store import build_issue_artifact, save_issue, load_issue, list_issues
+from llm_client import create_chat_completion
+from resilience import DEFAULT_RUN_DEADLINE, CircuitOpenError, deadline_scope
+from response_cache import get_response_cache
+from email_html import format_size_report, prepare_email_html
+from html_template import render_aidt_newsletter
+from markdown_renderer import convert_markdown_to_html, make_streaming_callback
+from near_duplicates import IssueDeduplicator, NearDuplicateIndex, drop_near_duplicates
+from news_feed import fetch_naver_news_incremental, fetch_news_api_incremental
+from prompt_budget import fit_prompt, format_prompt_item
+from section_engine import SectionGraph
+from tracing import format_waterfall_html, start_trace
 
-def convert_markdown_to_html(text):
-    """마크다운 텍스트를 HTML로 변환합니다."""
-    # AT/DT 팁 섹션 특별 처리
-    if "이번 주 팁:" in text or "핵심 프롬프트 예시" in text:
-        # "이번 주 팁:" 제목을 특별 클래스로 처리
-        text = re.sub(r'^## 이번 주 팁: (.*?)$', r'<div class="tip-title">이번 주 팁: \1</div>', text, flags=re.MULTILINE)
-        
-        # "핵심 프롬프트 예시:" 부분을 특별 클래스로 처리
-        text = re.sub(r'\*\*핵심 프롬프트 예시:\*\*', r'<div class="prompt-examples-title">핵심 프롬프트 예시:</div>', text)
-        
-        # 프롬프트 템플릿 처리 (Chain of Thought/Chain of Draft 등)
-        # 각 템플릿은 제목(색상 강조), 예시, 내용으로 구성됨
-        
-        # 첫 번째 템플릿 (Chain of Thought)
-        text = re.sub(
-            r'- (첫 번째 프롬프트 템플릿 \(Chain of Thought 활용\):)(.*?)(?=- 두 번째 프롬프트|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 두 번째 템플릿 (Chain of Draft)
-        text = re.sub(
-            r'- (두 번째 프롬프트 템플릿 \(Chain of Draft 활용\):)(.*?)(?=- 세 번째 프롬프트|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 세 번째 템플릿 (Chain of Thought와 Chain of Draft 결합)
-        text = re.sub(
-            r'- (세 번째 프롬프트 템플릿 \(Chain of Thought와 Chain of Draft 결합\):)(.*?)(?=이 팁을|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 각 템플릿 내에서 예시와 프롬프트 순서 바꾸기
-        # 예시: 로 시작하는 부분을 <div class="example-label">예시:</div><div class="example-content">내용</div> 로 변환
-        text = re.sub(
-            r'<div class="template-content">(.*?)예시:(.*?)프롬프트:(.*?)</div>',
-            r'<div class="template-content"><div class="example-label">예시:</div><div class="example-content">\2</div><div class="prompt-label">프롬프트:</div><div class="prompt-content">\3</div></div>',
-            text,
-            flags=re.DOTALL
-        )
-        
-        # 마지막 문장 스타일 적용 (약간의 여백과 이탤릭체)
-        if "다음 주에는" in text:
-            text = re.sub(r'(다음 주에는.*?\.)', r'<div class="tip-footer">\1</div>', text)
-    
-    # 제목 변환 (# 제목)
-    text = re.sub(r'^# (.*)$', r'<h1>\1</h1>', text, flags=re.MULTILINE)
-    text = re.sub(r'^## (.*)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
-    text = re.sub(r'^### (.*)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
-    
-    # 굵은 텍스트 (**텍스트**)
-    text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
-    
-    # 기울임 텍스트 (*텍스트*)
-    text = re.sub(r'\*(.*?)\*', r'<em>\1</em>', text)
-    
-    # 링크 변환 ([텍스트](URL))
-    text = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', text)
-    
-    # 일반적인 글머리 기호 (- 항목) 처리 (이미 처리된 AT/DT 팁 예시는 제외)
-    if "prompt-template" not in text:
-        text = re.sub(r'^\- (.*?)$', r'<li>\1</li>', text, flags=re.MULTILINE)
-    
-    # 색상 표시 강조 - 주요 소식에서 사용할 수 있는 색상 강조 기능
-    text = re.sub(r'\[강조\](.*?)\[\/강조\]', r'<span style="color:#e74c3c; font-weight:bold;">\1</span>', text)
-    
-    # 줄바꿈을 <br>과 <p>로 변환
-    paragraphs = text.split('\n\n')
-    for i, paragraph in enumerate(paragraphs):
-        if not paragraph.startswith('<h') and not paragraph.startswith('<li') and not paragraph.startswith('<div'):
-            # 이미 HTML 태그가 아닌 경우만 <p> 태그로 감싸기
-            if '<li>' in paragraph:
-                # 리스트 항목이 있는 경우 <ul> 태그로 감싸기
-                paragraph = f'<ul>{paragraph}</ul>'
-            else:
-                paragraph = f'<p>{paragraph}</p>'
-        paragraphs[i] = paragraph.replace('\n', '<br>')
-    
-    return ''.join(paragraphs)
+# 섹션 생성 동시 실행 수
+SECTION_MAX_WORKERS = 6
+
+# 근접 중복 기사를 빼고도 섹션을 채울 수 있도록 가져오는 후보 수
+NAVER_NEWS_CANDIDATES = 10
+AI_USE_CASE_CANDIDATES = 6
+
+# 뉴스레터 섹션 목록 (템플릿에 들어가는 순서와 무관)
+NEWSLETTER_SECTIONS = ('main_news', 'aidt_tips', 'success_story', 'naver_news', 'naver_trends', 'ai_use_case')
+
+# OpenAI로 생성하는 섹션 (완성 캐시를 무시하고 다시 생성할 수 있는 섹션)
+LLM_SECTIONS = ('main_news', 'aidt_tips', 'success_story', 'ai_use_case')
+
+# 스트리밍 미리보기에 표시할 섹션 제목 (화면 표시 순서)
+SECTION_PREVIEW_TITLES = {
+    'main_news': "글로벌 AI 뉴스",
+    'naver_news': "국내 AI 뉴스",
+    'naver_trends': "국내 AI 트렌드",
+    'aidt_tips': "이번 주 AT/DT 팁",
+    'success_story': "성공 사례",
+    'ai_use_case': "AI 활용사례",
+}
+
+# 응답 캐시를 거쳐 데이터를 가져오는 함수
+def cached_fetch(source, key_parts, fetch):
+    """응답 캐시에서 값을 찾고, 없으면 fetch()로 가져와 저장합니다.
+    여러 이슈나 세션이 같은 검색어를 요청하면 한 번만 API를 호출합니다. 빈 결과는 저장하지 않습니다.
+    공급자 회로가 열려 있으면(CircuitOpenError) 유효 시간이 지난 캐시 값이라도 있으면 그것을 반환합니다."""
+    cache = get_response_cache()
+    cache_key = source + ":" + hashlib.md5(json.dumps(key_parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+    value = cache.get(cache_key, source)
+    if value is None:
+        try:
+            value = fetch()
+        except CircuitOpenError:
+            stale = cache.get(cache_key, source, allow_stale=True)
+            if stale is None:
+                raise
+            print(f"{source} 회로가 열려 있어 유효 시간이 지난 캐시 결과를 사용합니다.")
+            return stale
+        if value:
+            cache.set(cache_key, source, value)
+    return value
 
 # NewsAPI를 사용하여 실시간 뉴스를 가져오는 함수
 def fetch_real_time_news(api_key, query="AI digital transformation", days=7, language="en"):
-    """
-    NewsAPI를 사용하여 실시간 뉴스를 가져옵니다.
-    무료 플랜은 최근 1개월(실제로는 더 짧을 수 있음) 데이터만 접근 가능합니다.
-    """
-    # 날짜 범위 계산 (API 제한으로 인해 기간을 줄임)
-    end_date = datetime.now()
-    # 무료 플랜 제한을 고려하여 기간을 줄임
-    start_date = end_date - timedelta(days=min(days, 7))  # 최대 7일로 제한
-    
-    # NewsAPI 요청
-    url = "https://newsapi.org/v2/everything"
-    params = {
-        'q': query,
-        'from': start_date.strftime('%Y-%m-%d'),
-        'to': end_date.strftime('%Y-%m-%d'),
-        'sortBy': 'publishedAt',
-        'language': language,
-        'apiKey': api_key
-    }
-    
-    response = requests.get(url, params=params)
-    
-    if response.status_code == 200:
-        news_data = response.json()
-        return news_data['articles']
-    else:
-        raise Exception(f"뉴스 가져오기 실패: {response.status_code} - {response.text}")
+    """NewsAPI에서 지난번 이후의 새 기사만 가져와 기사 저장소에 합친 뒤 최근 기사를 반환합니다. (news_feed 참고)
+    기사 저장소가 결과를 재사용하므로 응답 캐시는 거치지 않습니다."""
+    return fetch_news_api_incremental(api_key, query, days, language)
 
 # 네이버 API를 사용하여 뉴스를 가져오는 함수
 def fetch_naver_news(client_id, client_secret, query, display=5, days=7):
-    """
-    네이버 검색 API를 사용하여 뉴스를 가져옵니다.
-    최근 지정된 일수(기본 7일) 이내의 뉴스만 필터링합니다.
-    """
-    url = "https://openapi.naver.com/v1/search/news.json"
-    headers = {
-        "X-Naver-Client-Id": client_id,
-        "X-Naver-Client-Secret": client_secret
-    }
-    params = {
-        "query": query,
-        "display": 100,  # 더 많은 데이터를 가져와서 필터링 (최대 100개)
-        "sort": "date"  # 최신순으로 정렬
-    }
-    
-    response = requests.get(url, headers=headers, params=params)
-    
-    if response.status_code == 200:
-        result = response.json()
-        
-        # 최근 days일 내의 뉴스만 필터링
-        filtered_items = []
-        current_date = datetime.now()
-        cutoff_date = current_date - timedelta(days=days)
-        
-        for item in result['items']:
-            # 네이버 뉴스 API는 pubDate를 제공하지만 형식이 RFC 822 형식
-            try:
-                pub_date_str = item.get('pubDate')
-                if pub_date_str:
-                    pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %z')
-                    pub_date = pub_date.replace(tzinfo=None)
-                    
-                    if pub_date >= cutoff_date:
-                        filtered_items.append(item)
-            except Exception:
-                # 날짜 파싱에 실패하면 일단 포함시킴
-                filtered_items.append(item)
-        
-        # display 개수만큼만 반환
-        return filtered_items[:display]
-    else:
-        raise Exception(f"네이버 뉴스 가져오기 실패: {response.status_code} - {response.text}")
+    """네이버 뉴스에서 지난번 이후의 새 뉴스만 가져와 기사 저장소에 합친 뒤
+    최근 days일 이내의 뉴스를 display개까지 반환합니다. (news_feed 참고)
+    기사 저장소가 결과를 재사용하므로 응답 캐시는 거치지 않습니다."""
+    return fetch_naver_news_incremental(client_id, client_secret, query, display, days)
 
-def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사례", display=3, days=30):
+async def fetch_ai_use_cases_async(naver_client_id, naver_client_secret, query="AI 활용사례", display=3, days=30):
     """
     네이버 검색 API를 사용하여 AI 활용사례를 가져옵니다.
+    여러 검색어를 동시에 요청합니다.
     """
     url = "https://openapi.naver.com/v1/search/blog.json"  # 블로그 검색으로 변경
     headers = {
@@ -193,9 +101,7 @@ def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사
         f"{query} 프롬프트"
     ]
     
-    all_items = []
-    
-    for search_query in search_queries:
+    async def search(search_query):
         params = {
             "query": search_query,
             "display": display,
@@ -203,33 +109,48 @@ def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = await async_get(url, headers=headers, params=params)
             
             if response.status_code == 200:
                 result = response.json()
-                all_items.extend(result['items'])
+                return result['items']
             else:
                 print(f"API 오류: {response.status_code} - {response.text}")
+        except CircuitOpenError:
+            # 회로가 열려 있으면 빈 결과 대신 오류를 올려 캐시나 기본 콘텐츠로 대체하게 함
+            raise
         except Exception as e:
             print(f"검색 중 오류 발생: {str(e)}")
+        return []
     
-    # 중복 제거 (title 기준)
-    unique_items = []
-    unique_titles = set()
-    
-    for item in all_items:
-        clean_title = item['title'].replace("<b>", "").replace("</b>", "")
-        if clean_title not in unique_titles:
-            unique_titles.add(clean_title)
-            unique_items.append(item)
+    all_items = []
+    for items in await asyncio.gather(*(search(search_query) for search_query in search_queries)):
+        all_items.extend(items)
     
-    # 최대 display 개수만큼만 반환
-    return unique_items[:display]
+    # 근접 중복 제거 (제목+요약 기준) 후 최대 display 개수만큼만 반환
+    return drop_near_duplicates(all_items, NearDuplicateIndex(), limit=display)
 
-def generate_ai_use_case_content(openai_api_key, use_case_data):
+def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사례", display=3, days=30):
+    """fetch_ai_use_cases_async의 동기 버전입니다. 결과는 응답 캐시에 저장됩니다."""
+    return cached_fetch(
+        "naver_blog", ["ai_use_cases", query, display, days],
+        lambda: run_sync(fetch_ai_use_cases_async(naver_client_id, naver_client_secret, query, display, days))
+    )
+
+# 스트리밍 토큰으로 섹션 미리보기를 갱신하는 콜백을 만드는 함수
+def make_section_stream(section, on_section_update):
+    """섹션 HTML이 바뀔 때마다 on_section_update(섹션, HTML)를 호출하는 on_delta 콜백을 반환합니다.
+    on_section_update가 없으면 None을 반환하여 일반(비스트리밍) 요청을 사용하게 합니다."""
+    if on_section_update is None:
+        return None
+    return make_streaming_callback(lambda html: on_section_update(section, html))
+
+def generate_ai_use_case_content(openai_api_key, use_case_data, on_delta=None, force_refresh=False):
     """
     OpenAI를 사용하여 AI 활용사례 콘텐츠를 생성합니다.
     '사례 확인해보기→' 링크를 포함합니다.
+    on_delta가 있으면 응답을 스트리밍으로 받아 토큰 조각마다 호출합니다.
+    force_refresh가 참이면 완성 캐시를 무시하고 새로 생성합니다.
     SOURCE_URL과 SOURCE_NAME 제거됨
     """
     if not openai_api_key or not use_case_data:
@@ -257,53 +178,31 @@ def generate_ai_use_case_content(openai_api_key, use_case_data):
     selected_source = ""
     selected_link = ""
     
-    # 검색 데이터를 기반으로 OpenAI 프롬프트 구성
-    use_case_info = "AI 활용사례 검색 결과:\n\n"
-    
-    for i, item in enumerate(use_case_data):
-        # HTML 태그 제거
-        title = item['title'].replace("<b>", "").replace("</b>", "")
-        description = item['description'].replace("<b>", "").replace("</b>", "")
-        
-        use_case_info += f"{i+1}. 제목: {title}\n"
-        use_case_info += f"   설명: {description}\n"
-        use_case_info += f"   링크: {item['link']}\n"
-        use_case_info += f"   블로그명: {item.get('bloggername', '알 수 없음')}\n\n"
+    # 검색 데이터를 기반으로 OpenAI 프롬프트 구성 (결과마다 설명을 항목별 토큰 예산 안으로 줄임)
+    use_case_items = [
+        format_prompt_item(i + 1, [
+            ("제목", item['title']),
+            ("설명", item['description']),
+            ("링크", item['link']),
+            ("블로그명", item.get('bloggername', '알 수 없음')),
+        ], "설명")
+        for i, item in enumerate(use_case_data)
+    ]
     
     client = OpenAI(api_key=openai_api_key)
     
     try:
-        prompt = f"""
-        AIDT Weekly 뉴스레터의 'AI 활용사례' 섹션을 생성해주세요.
-        아래는 검색된 실제 AI 활용사례 정보입니다:
-        
-        {use_case_info}
-        
-        위 검색 결과 중에서 가장 유용하고 구체적인 활용사례를 선택하여 다음 형식으로 내용을 작성해주세요:
-        
-        ## [활용사례 제목] - 제목은 1줄로 명확하게
+        prompt = build_ai_use_case_prompt(use_case_items)
         
-        **요약:** 배경과 중요성을 2-3문장으로 간결하게 설명해주세요.
-        
-        **단계별 방법:** AI 솔루션을 상세히 설명합니다. 어떤 기술을 사용했는지, 어떻게 구현했는지, 특별한 접근 방식은 무엇이었는지 등을 포함하여 3~4줄로 작성해주세요.
-        
-        **추천 프롬프트:** 이 활용사례를 더 효과적으로 활용하기 위한 구체적이고 명확한 프롬프트 예시를 작성해주세요.
-        
-        모든 내용은 반드시 제공된 검색 결과에서만 추출해야 합니다. 가상의 정보나 사실이 아닌 내용은 절대 포함하지 마세요.
-        내용은 마크다운 형식으로 작성해주세요.
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": "AI 디지털 트랜스포메이션 활용사례 콘텐츠 생성 전문가. 정확하고 구체적인 정보만 포함합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
+        content = create_chat_completion(
+            client,
+            "AI 디지털 트랜스포메이션 활용사례 콘텐츠 생성 전문가. 정확하고 구체적인 정보만 포함합니다.",
+            prompt,
+            on_delta=on_delta,
+            force_refresh=force_refresh,
+            section='ai_use_case'
         )
         
-        content = response.choices[0].message.content
-        
         # 링크가 없는 경우 첫 번째 항목의 링크 사용
         if not selected_link and use_case_data:
             selected_link = use_case_data[0]['link']
@@ -342,112 +241,263 @@ def generate_ai_use_case_content(openai_api_key, use_case_data):
         <p style="font-size: 8pt; text-align: right; color: #666;">출처: IBM Watson</p>
         """
 
-# 통합된 뉴스레터 생성 함수
-def generate_combined_newsletter(openai_api_key, news_api_key, naver_client_id, naver_client_secret, 
-                             news_query_en, news_query_ko, language="en", custom_success_story=None, 
-                             issue_num=1, highlight_settings=None):
-    """OpenAI, NewsAPI, 네이버 API를 모두 사용하여 통합된 뉴스레터를 생성합니다.
-    사용 가능한 API만 활용합니다."""
+# NewsAPI 기사 목록을 프롬프트용 항목으로 정리하는 함수
+def format_news_items(articles):
+    """NewsAPI 기사 목록을 OpenAI 프롬프트에 넣을 항목 텍스트 목록으로 변환합니다.
+    기사마다 요약을 줄여 항목별 토큰 예산(PROMPT_ITEM_TOKENS) 안에 맞춥니다."""
+    items = []
+    for i, article in enumerate(articles):
+        pub_date = datetime.fromisoformat(article['publishedAt'].replace('Z', '+00:00')).strftime('%Y년 %m월 %d일')
+        items.append(format_prompt_item(i + 1, [
+            ("제목", article['title']),
+            ("날짜", pub_date),
+            ("요약", article['description']),
+            ("출처", article['source']['name']),
+            ("URL", article['url']),
+        ], "요약"))
+    return items
+
+# AI 활용사례 섹션 프롬프트를 만드는 함수
+def build_ai_use_case_prompt(use_case_items):
+    """검색 결과 항목 목록(format_prompt_item)으로 'AI 활용사례' 섹션 프롬프트를 만듭니다."""
+    # 섹션 입력 토큰 예산을 넘으면 뒤쪽 검색 결과부터 뺌
+    return fit_prompt(lambda use_case_info: f"""
+    AIDT Weekly 뉴스레터의 'AI 활용사례' 섹션을 생성해주세요.
+    아래는 검색된 실제 AI 활용사례 정보입니다:
+    
+    AI 활용사례 검색 결과:
+    
+    {use_case_info}
+    
+    위 검색 결과 중에서 가장 유용하고 구체적인 활용사례를 선택하여 다음 형식으로 내용을 작성해주세요:
+    
+    ## [활용사례 제목] - 제목은 1줄로 명확하게
+    
+    **요약:** 배경과 중요성을 2-3문장으로 간결하게 설명해주세요.
+    
+    **단계별 방법:** AI 솔루션을 상세히 설명합니다. 어떤 기술을 사용했는지, 어떻게 구현했는지, 특별한 접근 방식은 무엇이었는지 등을 포함하여 3~4줄로 작성해주세요.
+    
+    **추천 프롬프트:** 이 활용사례를 더 효과적으로 활용하기 위한 구체적이고 명확한 프롬프트 예시를 작성해주세요.
+    
+    모든 내용은 반드시 제공된 검색 결과에서만 추출해야 합니다. 가상의 정보나 사실이 아닌 내용은 절대 포함하지 마세요.
+    내용은 마크다운 형식으로 작성해주세요.
+    """, use_case_info=use_case_items)
+
+# 주요 소식 섹션 프롬프트를 만드는 함수
+def build_main_news_prompt(date, news_info, openai_news_info):
+    """일반 뉴스와 OpenAI 관련 뉴스 항목 목록(format_news_items)으로 '주요 소식' 섹션 프롬프트를 만듭니다.
+    수집에 실패한 쪽은 항목 목록 대신 안내 문자열을 받습니다."""
+    # 섹션 입력 토큰 예산을 넘으면 기사가 더 많은 쪽의 뒤쪽(오래된) 기사부터 뺌
+    return fit_prompt(lambda news_info, openai_news_info: f"""
+    AIDT Weekly 뉴스레터의 '주요 소식' 섹션을 생성해주세요.
+    오늘 날짜는 {date}입니다. 아래는 두 종류의 뉴스 기사입니다:
+    
+    === OpenAI 관련 뉴스 ===
+    최근 7일 내 수집된 OpenAI 관련 뉴스 기사:
+    
+    {openai_news_info}
+    
+    === 일반 뉴스 ===
+    최근 7일 내 수집된 실제 뉴스 기사:
+    
+    {news_info}
+    
+    총 2개의 주요 소식을 다음 형식으로 작성해주세요:
+    
+    1. 먼저 OpenAI 관련 뉴스에서 가장 중요하고 관련성 높은 1개의 소식을 선택하여 작성하세요.
+    2. 그 다음 일반 뉴스에서 가장 중요하고 관련성 높은 1개의 소식을 선택하여 작성하세요.
+    
+    각 소식은 다음 형식으로 작성해주세요:
+    ## [주제]의 [핵심 강점/특징]은 [주목할만합니다/확인됐습니다/중요합니다].
+    
+    간략한 내용을 1-2문장으로 작성하세요. 내용은 특정 기술이나 서비스, 기업의 최신 소식을 다루고, 
+    핵심 내용만 포함해주세요. 그리고 왜 중요한지를 강조해주세요.
+    
+    구체적인 수치나 인용구가 있다면 추가해주세요.
+    
+    각 소식의 마지막에는 뉴스 기사의 발행일과 출처를 반드시 "[출처 제목](출처 URL)" 형식으로 포함하세요.
+    
+    모든 주제는 반드시 제공된 실제 뉴스 기사에서만 추출해야 합니다. 가상의 정보나 사실이 아닌 내용은 절대 포함하지 마세요.
+    각 소식 사이에 충분한 공백을 두어 가독성을 높여주세요.
+    """, news_info=news_info, openai_news_info=openai_news_info)
+
+# 네이버 뉴스 목록을 섹션 HTML로 변환하는 함수
+def render_naver_news_section(title, news_items, empty_message):
+    """네이버 뉴스 검색 결과로 국내 뉴스 섹션 HTML을 생성합니다."""
+    content = f"<h2>{title}</h2>"
+    
+    if not news_items:
+        return content + f"<p>{empty_message}</p>"
+    
+    for i, article in enumerate(news_items):
+        # HTML 태그 제거
+        news_title = article['title'].replace("<b>", "").replace("</b>", "")
+        description = article['description'].replace("<b>", "").replace("</b>", "")
+        
+        # 날짜 표시 추가
+        pub_date_str = article.get('pubDate', '')
+        pub_date_display = ""
+        try:
+            if pub_date_str:
+                pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %z')
+                pub_date_display = pub_date.strftime('%Y년 %m월 %d일')
+        except Exception:
+            pub_date_display = "날짜 정보 없음"
+        
+        content += f"<h3>{news_title}</h3>"
+        content += f"<p><small>게시일: {pub_date_display}</small></p>"
+        content += f"<p>{description}</p>"
+        content += f"<p><a href='{article['link']}' target='_blank'>원문 보기</a> | 출처: {article.get('originallink', article['link'])}</p>"
+        
+        if i < len(news_items) - 1:  # 마지막 뉴스가 아닌 경우 구분선 추가
+            content += "<hr>"
+    
+    return content
+
+# 이슈 기록 구분 키
+def issue_series(news_query_en, news_query_ko, language):
+    """뉴스레터 이름을 따로 정하지 않았을 때 이슈 기록을 구분할 키를 검색어 조합으로 만듭니다.
+    호수는 팀마다 따로 매기므로, 같은 호수라도 검색어가 다른 이슈의 기록은 섞이지 않습니다."""
+    return json.dumps([news_query_en, news_query_ko, language], ensure_ascii=False)
+
+# 뉴스레터 콘텐츠 생성 함수 (수집 + 생성, 템플릿 제외)
+def generate_newsletter_content(openai_api_key, news_api_key, naver_client_id, naver_client_secret, 
+                                news_query_en, news_query_ko, language="en", custom_success_story=None, 
+                                issue_num=1, on_section_update=None, force_sections=(), tip_week=None,
+                                run_deadline=DEFAULT_RUN_DEADLINE, series=None):
+    """OpenAI, NewsAPI, 네이버 API를 모두 사용하여 뉴스레터 섹션 콘텐츠를 생성하고 이슈 아티팩트로 반환합니다.
+    사용 가능한 API만 활용하며, 서로 독립적인 섹션은 병렬로 생성합니다.
+    on_section_update가 있으면 OpenAI 응답을 스트리밍으로 받아 섹션 HTML이 바뀔 때마다
+    on_section_update(섹션, HTML)를 호출합니다. (워커 스레드에서도 호출됨)
+    같은 입력의 OpenAI 완성 결과는 캐시에서 재사용하며, force_sections에 포함된 섹션만 새로 생성합니다.
+    tip_week로 AT/DT 팁 주제를 고를 주차를 지정할 수 있습니다. (기본값은 이슈 번호)
+    모든 외부 호출(재시도 포함)은 run_deadline초 안에 끝나며, 마감 후의 호출은 실패 처리되어 기본 콘텐츠로 대체됩니다.
+    최근 이슈에 실은 기사는 같은 뉴스레터(series, 생략 시 검색어 조합)의 앞선 호수에서만 찾습니다."""
+    if series is None:
+        series = issue_series(news_query_en, news_query_ko, language)
     
     date = datetime.now().strftime('%Y년 %m월 %d일')
-    issue_number = issue_num
     
     # 뉴스레터 콘텐츠를 저장할 딕셔너리
     newsletter_content = {}
     
+    # 섹션 의존성 그래프 - 각 노드는 독립적으로 실행 가능한 시점에 병렬로 실행됨
+    graph = SectionGraph()
+    # 실패 시 화면에 오류를 표시할 노드와 메시지
+    error_labels = {}
+    
     # OpenAI API 관련 작업
+    client = None
     if openai_api_key:
         try:
             # OpenAI 클라이언트 초기화
             os.environ["OPENAI_API_KEY"] = openai_api_key
             client = OpenAI(api_key=openai_api_key)
+        except Exception as e:
+            st.error(f"OpenAI API 오류: {str(e)}")
+    
+    # 기사 수집 노드 - 선택 순서대로 (노드 이름, 소스, 섹션에 쓸 기사 수, 수집 함수)
+    article_feeds = []
+    if client and news_api_key:
+        article_feeds.append(('openai_news_articles', 'news_api', 3, lambda: fetch_real_time_news(
+            news_api_key, query="OpenAI", days=7, language=language)))
+        article_feeds.append(('news_articles', 'news_api', 5, lambda: fetch_real_time_news(
+            news_api_key, query=news_query_en, days=7, language=language)))
+    if naver_client_id and naver_client_secret:
+        article_feeds.append(('naver_news_articles', 'naver_news', 2, lambda: fetch_naver_news(
+            naver_client_id, naver_client_secret, news_query_ko, display=NAVER_NEWS_CANDIDATES, days=7)))
+        article_feeds.append(('naver_trend_articles', 'naver_news', 2, lambda: fetch_naver_news(
+            naver_client_id, naver_client_secret, "AI 트렌드", display=NAVER_NEWS_CANDIDATES, days=7)))
+        article_feeds.append(('ai_use_case_items', 'naver_blog', 3, lambda: fetch_ai_use_cases(
+            naver_client_id, naver_client_secret, "AI 활용사례", display=AI_USE_CASE_CANDIDATES, days=30)))
+    for name, _, _, fetch in article_feeds:
+        # 실패하면 오류를 결과로 남겨 다른 소스의 기사 선택은 계속하고, 그 기사를 쓰는 섹션에서 같은 오류로 처리
+        graph.add(name, fetch, fallback=lambda e: e)
+    
+    def select_articles(**fetched):
+        # 모든 수집이 끝난 뒤 정해진 순서로 거르므로 실행 순서와 관계없이 같은 기사가 선택됨
+        dedup = IssueDeduplicator(series, issue_num)
+        selection = {}
+        for name, source, limit, _ in article_feeds:
+            articles = fetched[name]
+            selection[name] = articles if isinstance(articles, Exception) else dedup.select(source, articles, limit)
+        dedup.record()
+        return selection
+    
+    if article_feeds:
+        # 앞 섹션이나 최근 이슈에 실은 기사와 근접 중복인 기사를 빼고 섹션별 기사 선택
+        graph.add('selected_articles', select_articles, deps=[name for name, *_ in article_feeds])
+    
+    def selected(selection, name):
+        articles = selection[name]
+        if isinstance(articles, Exception):
+            raise articles
+        return articles
+    
+    if client:
+        # 현재 주차 계산 (따로 지정하지 않으면 이슈 번호를 주차로 사용)
+        current_week = tip_week or issue_num
+        
+        # AI 팁 주제 데이터베이스 - 여러 주제를 순환하여 제공
+        ai_tip_topics = [
+            "효과적인 프롬프트 작성의 기본 원칙 (Chain of Thought, Chain of Draft)",
+            "특정 업무별 최적의 프롬프트 템플릿",
+            "AI를 활용한 데이터 분석 프롬프트 기법",
+            "창의적 작업을 위한 AI 프롬프트 전략",
+            "AI와 협업하여 문제 해결하기",
+            "다양한 AI 도구 활용법 비교",
+            "업무 자동화를 위한 AI 프롬프트 설계",
+            "AI를 활용한 의사결정 지원 기법"
+        ]
+        
+        # 현재 주차에 해당하는 주제 선택 (순환)
+        current_topic = ai_tip_topics[(current_week - 1) % len(ai_tip_topics)]
+        
+        def generate_section(prompt, section):
+            content = create_chat_completion(
+                client,
+                "AI 디지털 트랜스포메이션 뉴스레터 콘텐츠 생성 전문가. 간결하고 핵심적인 내용만 포함한 뉴스레터를 작성합니다.",
+                prompt,
+                on_delta=make_section_stream(section, on_section_update),
+                force_refresh=section in force_sections,
+                section=section
+            )
+            return convert_markdown_to_html(content)
+        
+        def section_error(e):
+            return f"<p>콘텐츠 생성 오류: {e}</p>"
+        
+        def section_fallback(default_content):
+            # OpenAI 회로가 열려 있으면 오류 대신 기본 콘텐츠로 바로 대체
+            return lambda e: default_content() if isinstance(e, CircuitOpenError) else section_error(e)
+        
+        if news_api_key:
+            # NewsAPI 뉴스 - 일반 뉴스와 OpenAI 관련 뉴스는 동시에 요청하고, 선택된 기사로 프롬프트 작성
+            graph.add(
+                'news_info',
+                lambda selected_articles: format_news_items(selected(selected_articles, 'news_articles')),
+                deps=('selected_articles',),
+                fallback=lambda e: "NewsAPI에서 뉴스를 가져오는데 실패했습니다."
+            )
+            graph.add(
+                'openai_news_info',
+                lambda selected_articles: format_news_items(selected(selected_articles, 'openai_news_articles')),
+                deps=('selected_articles',),
+                fallback=lambda e: "NewsAPI에서 OpenAI 관련 뉴스를 가져오는데 실패했습니다."
+            )
+            error_labels['news_info'] = "News API 오류"
+            error_labels['openai_news_info'] = "News API 오류"
             
-            # 현재 주차 계산 (이슈 번호를 주차로 사용)
-            current_week = issue_num
-            
-            # AI 팁 주제 데이터베이스 - 여러 주제를 순환하여 제공
-            ai_tip_topics = [
-                "효과적인 프롬프트 작성의 기본 원칙 (Chain of Thought, Chain of Draft)",
-                "특정 업무별 최적의 프롬프트 템플릿",
-                "AI를 활용한 데이터 분석 프롬프트 기법",
-                "창의적 작업을 위한 AI 프롬프트 전략",
-                "AI와 협업하여 문제 해결하기",
-                "다양한 AI 도구 활용법 비교",
-                "업무 자동화를 위한 AI 프롬프트 설계",
-                "AI를 활용한 의사결정 지원 기법"
-            ]
-            
-            # 현재 주차에 해당하는 주제 선택 (순환)
-            current_topic = ai_tip_topics[(current_week - 1) % len(ai_tip_topics)]
-            
-            # NewsAPI로 뉴스 가져오기 (있는 경우에만)
-            news_info = ""
-            openai_news_info = ""
-            
-            if news_api_key:
-                try:
-                    # 일반 뉴스 가져오기
-                    news_articles = fetch_real_time_news(news_api_key, query=news_query_en, days=7, language=language)
-                    top_news = news_articles[:5]
-                    
-                    news_info = "최근 7일 내 수집된 실제 뉴스 기사:\n\n"
-                    for i, article in enumerate(top_news):
-                        pub_date = datetime.fromisoformat(article['publishedAt'].replace('Z', '+00:00')).strftime('%Y년 %m월 %d일')
-                        news_info += f"{i+1}. 제목: {article['title']}\n"
-                        news_info += f"   날짜: {pub_date}\n"
-                        news_info += f"   요약: {article['description']}\n"
-                        news_info += f"   출처: {article['source']['name']}\n"
-                        news_info += f"   URL: {article['url']}\n\n"
-                    
-                    # OpenAI 관련 뉴스 가져오기
-                    openai_articles = fetch_real_time_news(news_api_key, query="OpenAI", days=7, language=language)
-                    top_openai_news = openai_articles[:3]
-                    
-                    openai_news_info = "최근 7일 내 수집된 OpenAI 관련 뉴스 기사:\n\n"
-                    for i, article in enumerate(top_openai_news):
-                        pub_date = datetime.fromisoformat(article['publishedAt'].replace('Z', '+00:00')).strftime('%Y년 %m월 %d일')
-                        openai_news_info += f"{i+1}. 제목: {article['title']}\n"
-                        openai_news_info += f"   날짜: {pub_date}\n"
-                        openai_news_info += f"   요약: {article['description']}\n"
-                        openai_news_info += f"   출처: {article['source']['name']}\n"
-                        openai_news_info += f"   URL: {article['url']}\n\n"
-                except Exception as e:
-                    st.error(f"News API 오류: {str(e)}")
-                    news_info = "NewsAPI에서 뉴스를 가져오는데 실패했습니다."
-                    openai_news_info = "NewsAPI에서 OpenAI 관련 뉴스를 가져오는데 실패했습니다."
+            def generate_main_news(news_info, openai_news_info):
+                prompt = build_main_news_prompt(date, news_info, openai_news_info)
+                return generate_section(prompt, 'main_news')
             
-            # OpenAI를 사용하여 콘텐츠 생성
-            prompts = {
-                'main_news': f"""
-                AIDT Weekly 뉴스레터의 '주요 소식' 섹션을 생성해주세요.
-                오늘 날짜는 {date}입니다. 아래는 두 종류의 뉴스 기사입니다:
-                
-                === OpenAI 관련 뉴스 ===
-                {openai_news_info}
-                
-                === 일반 뉴스 ===
-                {news_info}
-                
-                총 2개의 주요 소식을 다음 형식으로 작성해주세요:
-                
-                1. 먼저 OpenAI 관련 뉴스에서 가장 중요하고 관련성 높은 1개의 소식을 선택하여 작성하세요.
-                2. 그 다음 일반 뉴스에서 가장 중요하고 관련성 높은 1개의 소식을 선택하여 작성하세요.
-                
-                각 소식은 다음 형식으로 작성해주세요:
-                ## [주제]의 [핵심 강점/특징]은 [주목할만합니다/확인됐습니다/중요합니다].
-                
-                간략한 내용을 1-2문장으로 작성하세요. 내용은 특정 기술이나 서비스, 기업의 최신 소식을 다루고, 
-                핵심 내용만 포함해주세요. 그리고 왜 중요한지를 강조해주세요.
-                
-                구체적인 수치나 인용구가 있다면 추가해주세요.
-                
-                각 소식의 마지막에는 뉴스 기사의 발행일과 출처를 반드시 "[출처 제목](출처 URL)" 형식으로 포함하세요.
-                
-                모든 주제는 반드시 제공된 실제 뉴스 기사에서만 추출해야 합니다. 가상의 정보나 사실이 아닌 내용은 절대 포함하지 마세요.
-                각 소식 사이에 충분한 공백을 두어 가독성을 높여주세요.
-                """ if news_api_key else "뉴스 API 키가 제공되지 않아 글로벌 뉴스를 가져올 수 없습니다.",
-
-                'aidt_tips': f"""
+            graph.add('main_news', generate_main_news, deps=('news_info', 'openai_news_info'), fallback=section_error)
+        else:
+            # 전역 뉴스가 없는 경우 생성하지 않음
+            newsletter_content['main_news'] = f"<p>News API 키가 제공되지 않아 글로벌 뉴스를 가져올 수 없습니다.</p>"
+        
+        aidt_tips_prompt = f"""
                 AIDT Weekly 뉴스레터의 '이번 주 AT/DT 팁' 섹션을 생성해주세요.
                 
                 이번 주 팁 주제는 "{current_topic}"입니다.
@@ -475,9 +525,15 @@ def generate_combined_newsletter(openai_api_key, news_api_key, naver_client_id,
                 이 팁을 활용했을 때의 업무 효율성 향상이나 결과물 품질 개선 등 구체적인 이점을 한 문장으로 작성해주세요.
                 
                 다음 주에는 다른 AI 기본기 팁을 알려드리겠습니다.
-                """,
-
-                'success_story': """
+                """
+        graph.add('aidt_tips', lambda: generate_section(aidt_tips_prompt, 'aidt_tips'),
+                  fallback=section_fallback(get_default_tips_content))
+        
+        if custom_success_story:
+            # 사용자가 입력한 성공 사례가 있으면 생성 건너뛰기
+            newsletter_content['success_story'] = convert_markdown_to_html(custom_success_story)
+        else:
+            success_story_prompt = """
                 AIDT Weekly 뉴스레터의 '성공 사례' 섹션을 생성해주세요.
                 한국 기업 사례 1개와 외국 기업 사례 1개를 생성해야 합니다.
                 각 사례는 제목과 3개의 단락으로 구성되어야 합니다.
@@ -502,146 +558,125 @@ def generate_combined_newsletter(openai_api_key, news_api_key, naver_client_id,
                 
                 세 번째 단락에서는 AI 도입 후 얻은 구체적인 성과와 결과를 설명합니다. 가능한 한 정량적인 수치(비용 절감, 효율성 증가, 고객 만족도 향상 등)를 포함하여 3~4줄로 작성해주세요.
                 """
-            }
-            
-            # OpenAI를 사용하여 콘텐츠 생성
-            for section, prompt in prompts.items():
-                try:
-                    # 사용자가 입력한 성공 사례가 있으면 생성 건너뛰기
-                    if section == 'success_story' and custom_success_story:
-                        newsletter_content[section] = convert_markdown_to_html(custom_success_story)
-                        continue
-                    
-                    # 전역 뉴스가 없는 경우 생성하지 않음
-                    if section == 'main_news' and not news_api_key:
-                        newsletter_content[section] = f"<p>News API 키가 제공되지 않아 글로벌 뉴스를 가져올 수 없습니다.</p>"
-                        continue
-                        
-                    response = client.chat.completions.create(
-                        model="gpt-4-turbo-preview",
-                        messages=[
-                            {"role": "system", "content": "AI 디지털 트랜스포메이션 뉴스레터 콘텐츠 생성 전문가. 간결하고 핵심적인 내용만 포함한 뉴스레터를 작성합니다."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.7
-                    )
-                    newsletter_content[section] = convert_markdown_to_html(response.choices[0].message.content)
-                except Exception as e:
-                    newsletter_content[section] = f"<p>콘텐츠 생성 오류: {e}</p>"
-        except Exception as e:
-            st.error(f"OpenAI API 오류: {str(e)}")
-            # OpenAI API 실패했을 때 기본 내용 추가
-            newsletter_content['aidt_tips'] = get_default_tips_content()
-            newsletter_content['success_story'] = get_default_success_story()
+            graph.add('success_story', lambda: generate_section(success_story_prompt, 'success_story'),
+                      fallback=section_fallback(get_default_success_story))
     else:
-        # OpenAI API 키가 없는 경우 기본 콘텐츠 사용
+        # OpenAI API 키가 없거나 초기화에 실패한 경우 기본 콘텐츠 사용
         newsletter_content['aidt_tips'] = get_default_tips_content()
         newsletter_content['success_story'] = get_default_success_story()
     
     # 네이버 API 관련 작업
     if naver_client_id and naver_client_secret:
-        try:
-            # 네이버 뉴스 가져오기 - 일반 AI 뉴스
-            ai_news_items = fetch_naver_news(naver_client_id, naver_client_secret, news_query_ko, display=2, days=7)
-            
-            # 네이버 뉴스 섹션 콘텐츠 생성
-            naver_news_content = "<h2>국내 AI 주요 소식</h2>"
-            
-            if not ai_news_items:
-                naver_news_content += "<p>최근 7일 이내의 관련 뉴스가 없습니다.</p>"
-            else:
-                for i, article in enumerate(ai_news_items):
-                    # HTML 태그 제거
-                    title = article['title'].replace("<b>", "").replace("</b>", "")
-                    description = article['description'].replace("<b>", "").replace("</b>", "")
-                    
-                    # 날짜 표시 추가
-                    pub_date_str = article.get('pubDate', '')
-                    pub_date_display = ""
-                    try:
-                        if pub_date_str:
-                            pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %z')
-                            pub_date_display = pub_date.strftime('%Y년 %m월 %d일')
-                    except Exception:
-                        pub_date_display = "날짜 정보 없음"
-                    
-                    naver_news_content += f"<h3>{title}</h3>"
-                    naver_news_content += f"<p><small>게시일: {pub_date_display}</small></p>"
-                    naver_news_content += f"<p>{description}</p>"
-                    naver_news_content += f"<p><a href='{article['link']}' target='_blank'>원문 보기</a> | 출처: {article.get('originallink', article['link'])}</p>"
-                    
-                    if i < len(ai_news_items) - 1:  # 마지막 뉴스가 아닌 경우 구분선 추가
-                        naver_news_content += "<hr>"
-            
-            newsletter_content['naver_news'] = naver_news_content
-            
-            # 네이버 AI 트렌드 뉴스 가져오기
-            trend_news_items = fetch_naver_news(naver_client_id, naver_client_secret, "AI 트렌드", display=2, days=7)
-            
-            # AI 트렌드 섹션 콘텐츠 생성
-            trend_news_content = "<h2>국내 AI 트렌드 소식</h2>"
-            
-            if not trend_news_items:
-                trend_news_content += "<p>최근 7일 이내의 AI 트렌드 관련 뉴스가 없습니다.</p>"
-            else:
-                for i, article in enumerate(trend_news_items):
-                    # HTML 태그 제거
-                    title = article['title'].replace("<b>", "").replace("</b>", "")
-                    description = article['description'].replace("<b>", "").replace("</b>", "")
-                    
-                    # 날짜 표시 추가
-                    pub_date_str = article.get('pubDate', '')
-                    pub_date_display = ""
-                    try:
-                        if pub_date_str:
-                            pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %z')
-                            pub_date_display = pub_date.strftime('%Y년 %m월 %d일')
-                    except Exception:
-                        pub_date_display = "날짜 정보 없음"
-                    
-                    trend_news_content += f"<h3>{title}</h3>"
-                    trend_news_content += f"<p><small>게시일: {pub_date_display}</small></p>"
-                    trend_news_content += f"<p>{description}</p>"
-                    trend_news_content += f"<p><a href='{article['link']}' target='_blank'>원문 보기</a> | 출처: {article.get('originallink', article['link'])}</p>"
-                    
-                    if i < len(trend_news_items) - 1:  # 마지막 뉴스가 아닌 경우 구분선 추가
-                        trend_news_content += "<hr>"
-            
-            newsletter_content['naver_trends'] = trend_news_content
-            
-            # AI 활용사례 가져오기
-            try:
-                # AI 활용사례 검색
-                ai_use_cases = fetch_ai_use_cases(naver_client_id, naver_client_secret, "AI 활용사례", display=3, days=30)
-                
-                # AI 활용사례 콘텐츠 생성
-                ai_use_case_content = generate_ai_use_case_content(openai_api_key, ai_use_cases)
-                
-                newsletter_content['ai_use_case'] = ai_use_case_content
-            except Exception as e:
-                st.error(f"AI 활용사례 가져오기 오류: {str(e)}")
-                newsletter_content['ai_use_case'] = get_default_ai_use_case()
-            
-        except Exception as e:
-            st.error(f"네이버 API 오류: {str(e)}")
-            newsletter_content['naver_news'] = f"<p>네이버 뉴스를 가져오는 중 오류가 발생했습니다: {str(e)}</p>"
-            newsletter_content['naver_trends'] = f"<p>네이버 AI 트렌드 뉴스를 가져오는 중 오류가 발생했습니다: {str(e)}</p>"
+        # 네이버 뉴스 - 일반 AI 뉴스
+        graph.add(
+            'naver_news',
+            lambda selected_articles: render_naver_news_section(
+                "국내 AI 주요 소식",
+                selected(selected_articles, 'naver_news_articles'),
+                "최근 7일 이내의 관련 뉴스가 없습니다."
+            ),
+            deps=('selected_articles',),
+            fallback=lambda e: f"<p>네이버 뉴스를 가져오는 중 오류가 발생했습니다: {str(e)}</p>"
+        )
+        
+        # 네이버 AI 트렌드 뉴스
+        graph.add(
+            'naver_trends',
+            lambda selected_articles: render_naver_news_section(
+                "국내 AI 트렌드 소식",
+                selected(selected_articles, 'naver_trend_articles'),
+                "최근 7일 이내의 AI 트렌드 관련 뉴스가 없습니다."
+            ),
+            deps=('selected_articles',),
+            fallback=lambda e: f"<p>네이버 AI 트렌드 뉴스를 가져오는 중 오류가 발생했습니다: {str(e)}</p>"
+        )
+        error_labels['naver_news'] = "네이버 API 오류"
+        error_labels['naver_trends'] = "네이버 API 오류"
+        
+        # AI 활용사례 검색 결과로 콘텐츠 생성
+        graph.add(
+            'ai_use_case',
+            lambda selected_articles: generate_ai_use_case_content(
+                openai_api_key,
+                selected(selected_articles, 'ai_use_case_items'),
+                on_delta=make_section_stream('ai_use_case', on_section_update),
+                force_refresh='ai_use_case' in force_sections
+            ),
+            deps=('selected_articles',),
+            fallback=lambda e: get_default_ai_use_case()
+        )
+        error_labels['ai_use_case'] = "AI 활용사례 가져오기 오류"
     else:
         # 네이버 API가 없는 경우 AI 활용사례 기본 콘텐츠 추가
         newsletter_content['ai_use_case'] = get_default_ai_use_case()
     
-    # 하이라이트 설정 기본값
-    if highlight_settings is None:
-        highlight_settings = {
-            "title": "중부Infra AT/DT 뉴스레터 개시",
-            "subtitle": "AI, 어떻게 시작할지 막막하다면?",
-            "link_text": "AT/DT 추진방향 →",
-            "link_url": "#"
-        }
+    initializer = None
+    on_finish = None
+    if on_section_update is not None:
+        # 생성 없이 정해진 섹션은 바로 표시
+        for section, content in newsletter_content.items():
+            on_section_update(section, content)
+        
+        # 워커 스레드에서도 화면을 갱신할 수 있도록 현재 스크립트 실행 컨텍스트를 연결
+        script_ctx = get_script_run_ctx()
+        initializer = lambda: add_script_run_ctx(threading.current_thread(), script_ctx)
+        
+        def on_finish(name, value):
+            if name in NEWSLETTER_SECTIONS and value is not None:
+                on_section_update(name, value)
+    
+    # 독립적인 섹션을 병렬로 실행 - 모든 섹션의 외부 호출이 하나의 마감 시간을 공유
+    with deadline_scope(run_deadline):
+        section_run = graph.run(max_workers=SECTION_MAX_WORKERS, initializer=initializer, on_finish=on_finish)
+    
+    for name, error in section_run.errors.items():
+        if name in error_labels:
+            st.error(f"{error_labels[name]}: {str(error)}")
     
-    # HTML 템플릿 생성
-    html_content = generate_combined_html_template(newsletter_content, issue_number, date, highlight_settings)
-    return html_content
+    for section in NEWSLETTER_SECTIONS:
+        if section in section_run.results:
+            newsletter_content[section] = section_run.results[section]
+    
+    # 생성 입력값, 섹션별 소요 시간, 오류를 함께 기록
+    inputs = {
+        "news_query_en": news_query_en,
+        "news_query_ko": news_query_ko,
+        "language": language,
+        "custom_success_story": custom_success_story,
+        "tip_week": tip_week or issue_num,
+        "series": series,
+    }
+    return build_issue_artifact(newsletter_content, issue_num, date, inputs, section_run)
+
+# 하이라이트 설정 기본값
+DEFAULT_HIGHLIGHT_SETTINGS = {
+    "title": "중부Infra AT/DT 뉴스레터 개시",
+    "subtitle": "AI, 어떻게 시작할지 막막하다면?",
+    "link_text": "AT/DT 추진방향 →",
+    "link_url": "#"
+}
+
+# 이슈 아티팩트를 HTML로 렌더링하는 함수
+def render_issue_html(artifact, issue_number=None, highlight_settings=None):
+    """저장된 이슈 아티팩트를 HTML 템플릿으로 렌더링합니다.
+    호수를 지정하지 않으면 생성 당시의 호수를 사용합니다."""
+    if issue_number is None:
+        issue_number = artifact["issue_number"]
+    if highlight_settings is None:
+        highlight_settings = DEFAULT_HIGHLIGHT_SETTINGS
+    return generate_combined_html_template(artifact["sections"], issue_number, artifact["date"], highlight_settings)
+
+# 통합된 뉴스레터 생성 함수
+def generate_combined_newsletter(openai_api_key, news_api_key, naver_client_id, naver_client_secret, 
+                             news_query_en, news_query_ko, language="en", custom_success_story=None, 
+                             issue_num=1, highlight_settings=None, on_section_update=None, force_sections=()):
+    """콘텐츠를 생성하고 바로 HTML 템플릿까지 렌더링합니다. (generate_newsletter_content + render_issue_html)"""
+    artifact = generate_newsletter_content(
+        openai_api_key, news_api_key, naver_client_id, naver_client_secret,
+        news_query_en, news_query_ko, language, custom_success_story,
+        issue_num, on_section_update=on_section_update, force_sections=force_sections
+    )
+    return render_issue_html(artifact, issue_num, highlight_settings)
 
 # 기본 콘텐츠를 위한 헬퍼 함수들
 def get_default_tips_content():
@@ -719,285 +754,55 @@ def get_default_ai_use_case():
 
 # 통합된 뉴스레터를 위한 HTML 템플릿 생성 함수
 def generate_combined_html_template(newsletter_content, issue_number, date, highlight_settings):
-    """세 가지 API를 모두 사용한 뉴스레터 HTML 템플릿을 생성합니다."""
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>AIDT Weekly - 제{issue_number}호</title>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Arial, sans-serif;
-                line-height: 1.5;
-                color: #333;
-                margin: 0;
-                padding: 0;
-                background-color: #f9f9f9;
-            }}
-            .container {{
-                max-width: 600px;
-                margin: 0 auto;
-                background-color: #ffffff;
-            }}
-            .content {{
-                padding: 20px;
-            }}
-            .header {{
-                background-color: #333333;
-                color: white;
-                padding: 15px 20px;
-                text-align: left;
-            }}
-            .title {{
-                margin: 0;
-                font-size: 20px;
-                font-weight: bold;
-            }}
-            .issue-date {{
-                margin-top: 5px;
-                font-size: 10pt;
-            }}
-            .section {{
-                margin-bottom: 25px;
-                border-bottom: 1px solid #eee;
-                padding-bottom: 20px;
-            }}
-            .section:last-child {{
-                border-bottom: none;
-            }}
-            .section-title {{
-                color: #ffffff;
-                font-size: 16px;
-                font-weight: bold;
-                margin-bottom: 10px;
-                background-color: #3e3e3e;
-                padding: 8px 10px;
-                border-radius: 4px;
-            }}
-            .section-icon {{
-                margin-right: 8px;
-            }}
-            h2, h3 {{
-                font-size: 14px;
-                margin-bottom: 5px;
-                color: #333333;
-            }}
-            .main-news h2 {{
-                color: #ff5722;
-                font-size: 14px;
-                margin-top: 15px;
-                margin-bottom: 5px;
-                border-bottom: none;
-                padding-bottom: 0;
-            }}
-            .main-news a {{
-                color: #ff5722;
-                text-decoration: none;
-            }}
-            .main-news a:hover {{
-                text-decoration: underline;
-            }}
-            .main-news p, .success-case p, p, li {{
-                font-size: 10pt;
-                margin: 0 0 8px;
-            }}
-            ul {{
-                padding-left: 20px;
-                margin-top: 5px;
-                margin-bottom: 8px;
-            }}
-            li {{
-                margin-bottom: 3px;
-            }}
-            .footer {{
-                background-color: #f1f1f1;
-                padding: 10px;
-                text-align: center;
-                font-size: 9pt;
-                color: #666;
-            }}
-            .section-container {{
-                padding: 0 15px;
-            }}
-            .highlight-box {{
-                background-color: #fff9f5;
-                border: 1px solid #ffe0cc;
-                border-radius: 5px;
-                padding: 15px;
-                margin: 10px 0;
-            }}
-            .highlight-title {{
-                color: #ff5722;
-                font-size: 16px;
-                font-weight: bold;
-                margin-bottom: 10px;
-                text-align: center;
-            }}
-            .highlight-subtitle {{
-                color: #666;
-                font-size: 12px;
-                text-align: center;
-                margin-bottom: 15px;
-            }}
-            
-            /* AT/DT 팁 섹션 스타일 */
-            .aidt-tips {{
-                font-size: 10pt;
-            }}
-
-            .tip-title {{
-                background-color: #f2f2f2;
-                padding: 8px 10px;
-                margin-bottom: 10px;
-                border-radius: 4px;
-                font-weight: bold;
-            }}
-
-            .prompt-examples-title {{
-                background-color: #f2f2f2;
-                padding: 8px 10px;
-                margin: 15px 0 10px 0;
-                border-radius: 4px;
-                font-weight: bold;
-            }}
-
-            /* 프롬프트 템플릿 스타일 */
-            .prompt-template {{
-                margin-bottom: 20px; /* 템플릿 간 간격 */
-            }}
+    """세 가지 API를 모두 사용한 뉴스레터 HTML 템플릿을 생성합니다.
+    미리 컴파일한 템플릿(templates/aidt_newsletter.html)의 자리만 채웁니다."""
+    return render_aidt_newsletter(newsletter_content, issue_number, date, highlight_settings)
 
-            .template-title {{
-                color: #ff5722; /* 제목 색상 - 오렌지 계열 */
-                font-weight: bold;
-                margin-bottom: 0; /* 제목과 내용 사이 간격 없음 */
-                padding: 0;
-            }}
+def show_trace_sidebar(trace):
+    """지난 실행의 단계별 소요 시간을 사이드바에 폭포 차트로 표시합니다."""
+    with st.sidebar.expander("지난 실행 추적", expanded=True):
+        st.caption(f"{trace.name} - 전체 {trace.wall_time:.2f}s, 구간 {len(trace.spans)}개")
+        st.markdown(format_waterfall_html(trace, min_duration=0.01), unsafe_allow_html=True)
+        st.text(trace.format_kind_totals())
 
-            .template-content {{
-                margin-left: 15px;
-                margin-bottom: 10px; /* 내용 아래 여백 추가 */
-            }}
+def download_html_button(html_data, filename, label="뉴스레터 다운로드", key=None):
+    """HTML을 내려받는 버튼을 표시합니다.
+    문서는 미디어 파일로 등록되어 버튼을 누를 때 HTTP로 받으므로, data: URI 링크처럼
+    다시 실행할 때마다 base64로 부풀린 문서 전체를 웹소켓으로 보내지 않습니다."""
+    if isinstance(html_data, str):
+        html_data = html_data.encode("utf-8")
+    st.download_button(label, html_data, file_name=filename, mime="text/html", key=key, type="primary")
 
-            /* 예시와 프롬프트 스타일 */
-            .example-label, .prompt-label {{
-                font-weight: bold;
-                margin-top: 5px;
-                color: #333; /* 이미지와 일치하는 색상 */
-            }}
+# 여러 호 묶음 형식 (파일 확장자: MIME 형식)
+BUNDLE_FORMATS = {
+    "zip": "application/zip",
+    "tar.gz": "application/gzip",
+}
 
-            .example-content, .prompt-content {{
-                margin-left: 15px;
-                line-height: 1.3; /* 내용 줄간격 약간 줄임 */
-                margin-bottom: 8px; /* 내용 하단 여백 증가 */
-                color: #333; /* 이미지와 일치하는 색상 */
-            }}
-
-            .tip-footer {{
-                margin-top: 15px;
-                font-style: italic;
-                color: #666; /* 이미지와 일치하는 색상 */
-            }}
-            
-            /* 네이버 API 섹션 스타일 - 검은색으로 변경 */
-            .naver-section {{
-                background-color: #f8f8ff; /* 연한 파란색 배경 */
-                border-radius: 4px;
-                padding: 10px;
-                margin-bottom: 15px;
-            }}
-            
-            .naver-section h2, .naver-section h3 {{
-                color: #333333; /* 검은색으로 변경 */
-            }}
-            
-            /* AI 활용사례 섹션 스타일 */
-            .section ol {{
-                margin-left: 20px;
-                padding-left: 0;
-            }}
-            .section ol li {{
-                margin-bottom: 5px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div class="title">중부Infra AT/DT Weekly</div>
-                <div class="issue-info">제{issue_number}호 | {date}</div>
-            </div>
-            
-            <div class="content">
-                <div class="newsletter-intro">
-                    <p>중부Infra AT/DT 뉴스레터는 모두가 AI발전 속도에 뒤쳐지지 않고 업무에 적용할 수 있도록 가장 흥미로운 AI 활용법을 전합니다.</p>
-                </div>
-                
-                <div class="highlight-box">
-                    <div class="highlight-title">{highlight_settings['title']}</div>
-                    <div class="highlight-subtitle">{highlight_settings['subtitle']}</div>
-                    <p style="text-align: right; margin-top: 5px; font-size: 9pt;"><a href="{highlight_settings['link_url']}" style="color: #ff5722;">{highlight_settings['link_text']}</a></p>
-                </div>
-                
-                <!-- 글로벌 AI 뉴스 (OpenAI + NewsAPI) 섹션 -->
-                {f'''
-                <div class="section">
-                    <div class="section-title">글로벌 AI 뉴스</div>
-                    <div class="section-container main-news">
-                        {newsletter_content.get('main_news', '<p>글로벌 AI 뉴스를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                ''' if 'main_news' in newsletter_content else ""}
-                
-                <!-- 네이버 API 섹션 (색상 변경) -->
-                {f'''
-                <div class="section">
-                    <div class="section-title">국내 AI 뉴스</div>
-                    <div class="section-container main-news naver-section">
-                        {newsletter_content.get('naver_news', '<p>국내 AI 뉴스를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                ''' if 'naver_news' in newsletter_content else ""}
-                
-                <div class="section">
-                    <div class="section-title">이번 주 AT/DT 팁</div>
-                    <div class="section-container aidt-tips">
-                        {newsletter_content.get('aidt_tips', '<p>AT/DT 팁을 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                
-                <!-- AI 활용사례 섹션 (새로 추가) -->
-                <div class="section">
-                    <div class="section-title">AI 활용사례</div>
-                    <div class="section-container">
-                        {newsletter_content.get('ai_use_case', '<p>AI 활용사례를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                
-                <div class="section success-case">
-                    <div class="section-title">성공 사례</div>
-                    <div class="section-container">
-                        {newsletter_content.get('success_story', '<p>성공 사례를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p>© {datetime.now().year} 중부Infra All rights reserved. | 뉴스레터 구독에 감사드립니다.</p>
-                <p>문의사항이나 제안이 있으시면 언제든지 연락해 주세요^^.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
-
-def create_download_link(html_content, filename):
-    """HTML 콘텐츠를 다운로드할 수 있는 링크를 생성합니다."""
-    b64 = base64.b64encode(html_content.encode()).decode()
-    href = f'<a href="data:text/html;base64,{b64}" download="{filename}" style="display: inline-block; margin-top: 20px; padding: 10px 20px; background-color: #ff5722; color: white; text-decoration: none; border-radius: 5px; font-weight: bold;">뉴스레터 다운로드</a>'
-    return href
+def build_issue_bundle(issue_paths, highlight_settings=None, bundle_format="zip", include_email=False):
+    """저장된 이슈들을 각자의 호수로 렌더링해 zip 또는 tar.gz 묶음(bytes)으로 만듭니다.
+    이슈를 하나씩 렌더링해 바로 압축하므로 한 번에 문서 하나만 메모리에 둡니다."""
+    buffer = io.BytesIO()
+    if bundle_format == "zip":
+        archive = zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED)
+        add = archive.writestr
+    elif bundle_format == "tar.gz":
+        archive = tarfile.open(fileobj=buffer, mode="w:gz")
+        def add(name, data):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = time.time()
+            archive.addfile(info, io.BytesIO(data))
+    else:
+        raise ValueError(f"지원하지 않는 묶음 형식입니다: {bundle_format}")
+    with archive:
+        for path in issue_paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            html_content = render_issue_html(load_issue(path), highlight_settings=highlight_settings)
+            add(f"{name}.html", html_content.encode("utf-8"))
+            if include_email:
+                add(f"{name}.email.html", prepare_email_html(html_content)["html"].encode("utf-8"))
+    return buffer.getvalue()
 
 def main():
     st.title("중부Infra AT/DT 뉴스레터 생성기")
@@ -1046,6 +851,12 @@ def main():
         highlight_subtitle = st.text_input("하이라이트 부제목", value="AI, 어떻게 시작할지 막막하다면?")
         highlight_link_text = st.text_input("링크 텍스트", value="AT/DT 추진방향 →")
         highlight_link_url = st.text_input("링크 URL", value="#")
+    highlight_settings = {
+        "title": highlight_title,
+        "subtitle": highlight_subtitle,
+        "link_text": highlight_link_text,
+        "link_url": highlight_link_url
+    }
     
     # 성공 사례 사용자 입력 옵션
     with st.expander("성공 사례 직접 입력"):
@@ -1076,6 +887,23 @@ def main():
             
             custom_success_story = st.text_area("성공 사례 직접 입력", height=400)
     
+    # 완성 캐시 무시 옵션 - 같은 입력이면 기본적으로 이전 생성 결과를 재사용함
+    force_sections = st.multiselect(
+        "다시 생성할 섹션",
+        options=list(LLM_SECTIONS),
+        format_func=lambda x: SECTION_PREVIEW_TITLES[x],
+        help="입력이 같으면 이전에 생성한 OpenAI 결과를 재사용합니다. 선택한 섹션은 캐시를 무시하고 새로 생성합니다."
+    )
+    
+    stream_preview = st.checkbox(
+        "생성 중인 섹션 실시간 미리보기",
+        value=True,
+        help="OpenAI 응답을 스트리밍으로 받아 섹션별로 생성되는 내용을 바로 보여줍니다."
+    )
+    
+    # 생성 버튼을 누른 실행은 생성부터 렌더링까지 한 추적으로 기록 (사이드바 '지난 실행 추적')
+    run_trace = ExitStack()
+    
     # 뉴스레터 생성 버튼
     if st.button("뉴스레터 생성"):
         # 필요한 API 키 확인
@@ -1092,18 +920,27 @@ def main():
         if not naver_client_id or not naver_client_secret:
             st.warning("네이버 API 키가 제공되지 않아 국내 뉴스 검색 기능이 제한됩니다.")
         
+        # 섹션별 미리보기 자리 표시자
+        on_section_update = None
+        if stream_preview:
+            preview = st.container(border=True)
+            placeholders = {}
+            for section, title in SECTION_PREVIEW_TITLES.items():
+                preview.markdown(f"#### {title}")
+                placeholders[section] = preview.empty()
+                placeholders[section].caption("생성 대기 중...")
+            
+            def on_section_update(section, html):
+                if section in placeholders:
+                    placeholders[section].markdown(html, unsafe_allow_html=True)
+        
         with st.spinner("뉴스레터 생성 중... (약 1-2분 소요될 수 있습니다)"):
             try:
-                # 하이라이트 설정 딕셔너리 생성
-                highlight_settings = {
-                    "title": highlight_title,
-                    "subtitle": highlight_subtitle,
-                    "link_text": highlight_link_text,
-                    "link_url": highlight_link_url
-                }
+                st.session_state.last_trace = run_trace.enter_context(
+                    start_trace("AIDT 뉴스레터 생성", issue_number=issue_number))
                 
-                # 사용 가능한 API로 뉴스레터 생성
-                html_content = generate_combined_newsletter(
+                # 사용 가능한 API로 뉴스레터 콘텐츠 생성
+                artifact = generate_newsletter_content(
                     openai_api_key,
                     news_api_key,
                     naver_client_id,
@@ -1113,16 +950,89 @@ def main():
                     language,
                     custom_success_story,
                     issue_number,
-                    highlight_settings
+                    on_section_update=on_section_update,
+                    force_sections=tuple(force_sections)
                 )
                 
-                filename = f"중부 ATDT Weekly-제{issue_number}호.html"
+                # 생성된 콘텐츠를 세션과 디스크에 저장 - 표시 설정만 바뀌면 이 콘텐츠로 다시 렌더링
+                st.session_state.issue_artifact = artifact
+                st.session_state.issue_path = save_issue(artifact)
                 
                 st.success("✅ 뉴스레터가 성공적으로 생성되었습니다!")
-                st.markdown(create_download_link(html_content, filename), unsafe_allow_html=True)
-                
+
             except Exception as e:
                 st.error(f"오류가 발생했습니다: {e}")
+    
+    # 저장된 이슈 불러오기
+    with st.expander("저장된 이슈 불러오기"):
+        issue_paths = list_issues()
+        if issue_paths:
+            selected_path = st.selectbox("이슈 파일", options=issue_paths, format_func=os.path.basename)
+            if st.button("불러오기"):
+                try:
+                    st.session_state.issue_artifact = load_issue(selected_path)
+                    st.session_state.issue_path = selected_path
+                except (OSError, ValueError) as e:
+                    st.error(f"이슈 파일을 불러오지 못했습니다: {e}")
+        else:
+            st.info("저장된 이슈가 없습니다.")
+    
+    # 저장된 여러 호를 현재 하이라이트 박스 설정으로 렌더링해 한 파일로 묶어 받기 (묶음은 버튼을 누를 때만 만듦)
+    with st.expander("여러 호 묶어 받기"):
+        bundle_paths = st.multiselect("묶을 이슈 파일", options=issue_paths, format_func=os.path.basename)
+        bundle_format = st.radio("묶음 형식", options=list(BUNDLE_FORMATS), horizontal=True)
+        include_email = st.checkbox("이메일용 HTML 포함")
+        if st.button("묶음 만들기", disabled=not bundle_paths):
+            try:
+                st.session_state.issue_bundle = (
+                    build_issue_bundle(bundle_paths, highlight_settings, bundle_format, include_email),
+                    f"중부 ATDT Weekly-{len(bundle_paths)}개 호.{bundle_format}",
+                    BUNDLE_FORMATS[bundle_format],
+                )
+            except (OSError, ValueError) as e:
+                st.error(f"묶음을 만들지 못했습니다: {e}")
+        if st.session_state.get('issue_bundle'):
+            bundle_data, bundle_filename, bundle_mime = st.session_state.issue_bundle
+            st.download_button(f"묶음 다운로드 ({len(bundle_data) / 1024:.0f}KB)", bundle_data,
+                               file_name=bundle_filename, mime=bundle_mime)
+    
+    with run_trace:
+        # 생성했거나 불러온 이슈를 현재 표시 설정(호수, 하이라이트 박스)으로 렌더링
+        # 템플릿만 다시 적용하므로 API 호출 없이 바로 반영됨
+        artifact = st.session_state.get('issue_artifact')
+        if artifact is not None:
+            render_key = (st.session_state.issue_path, issue_number, tuple(highlight_settings.values()))
+            if st.session_state.get('rendered_key') != render_key:
+                # 렌더링할 때 한 번만 인코딩하고 세션에는 바이트만 보관
+                html_content = render_issue_html(artifact, issue_number, highlight_settings)
+                email_report = prepare_email_html(html_content)
+                st.session_state.rendered_html = html_content.encode("utf-8")
+                st.session_state.email_html = email_report.pop("html").encode("utf-8")
+                st.session_state.email_report = email_report
+                st.session_state.rendered_key = render_key
+            email_report = st.session_state.email_report
+        
+            filename = f"중부 ATDT Weekly-제{issue_number}호.html"
+            st.caption(f"이슈 파일: {os.path.basename(st.session_state.issue_path)} (생성일: {artifact['date']})")
+            if issue_number != artifact['issue_number']:
+                st.caption(f"AT/DT 팁 주제는 생성 당시 호수(제{artifact['issue_number']}호) 기준입니다.")
+            download_html_button(st.session_state.rendered_html, filename)
+        
+            # 메일 본문에 붙여 넣을 이메일용 HTML (CSS를 요소에 옮기고 공백을 줄임)
+            email_filename = f"중부 ATDT Weekly-제{issue_number}호 (이메일).html"
+            download_html_button(st.session_state.email_html, email_filename, "이메일용 HTML 다운로드")
+            if email_report["within_budget"]:
+                st.caption(format_size_report(email_report))
+            else:
+                st.warning(format_size_report(email_report))
+        
+            # 섹션별 생성 시간 표시
+            if artifact.get('timings'):
+                with st.expander("섹션별 생성 시간"):
+                    st.text(artifact['timings'])
+    
+    if st.session_state.get('last_trace') is not None:
+        show_trace_sidebar(st.session_state.last_trace)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,16 +1,24 @@
 import streamlit as st
 from openai import OpenAI
-from datetime import datetime, timedelta
-import base64
+from datetime import datetime
 import os
 import re
-import requests
 import pandas as pd
 import hashlib
 import time
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from concurrent.futures import as_completed
 from io import BytesIO
+from http_client import async_get, get_semaphore, run_sync, single_flight, submit
+from keyword_matcher import KeywordMatcher
+from resilience import DEFAULT_RUN_DEADLINE, CircuitOpenError, deadline_scope
+from response_cache import get_response_cache
+from llm_client import create_chat_completion
+from html_template import render_learning_newsletter
+from markdown_renderer import convert_markdown_to_html, make_streaming_callback
+from news_feed import fetch_news_api_incremental
+from tracing import format_waterfall_html, start_trace, traced
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,9 +31,6 @@ st.set_page_config(
     layout="wide"
 )
 
-# 캐시 시간 설정 (24시간)
-CACHE_EXPIRATION = 60 * 60 * 24
-
 # 세션 상태 초기화
 if 'naver_api_configured' not in st.session_state:
     st.session_state.naver_api_configured = False
@@ -35,10 +40,6 @@ if 'openai_api_configured' not in st.session_state:
     st.session_state.openai_api_configured = False
 if 'news_api_configured' not in st.session_state:
     st.session_state.news_api_configured = False
-if 'cache' not in st.session_state:
-    st.session_state.cache = {}
-if 'cache_timestamp' not in st.session_state:
-    st.session_state.cache_timestamp = {}
 if 'selected_materials' not in st.session_state:
     st.session_state.selected_materials = {}
 
@@ -50,6 +51,12 @@ SEARCH_SOURCES = {
     "youtube": {"name": "유튜브", "icon": "▶️", "weight": 1.1, "lang": "both"}
 }
 
+# 학습 자료 검색에 사용하는 소스
+LEARNING_MATERIAL_SOURCES = ["naver_blog", "naver_web", "youtube"]
+
+# 업스트림 API별 전역 동시 요청 수 제한 - 모든 세션과 주제의 검색 요청이 같은 제한을 공유
+API_CONCURRENCY_LIMITS = {"naver": 8, "youtube": 4}
+
 # 캐시 키 생성 함수
 def get_cache_key(query, source):
     return hashlib.md5(f"{query}_{source}".encode()).hexdigest()
@@ -58,77 +65,95 @@ def get_cache_key(query, source):
 # API 호출 및 검색 기능
 # ------------------------------------------------------------
 
+# 네이버 검색 API 엔드포인트
+NAVER_ENDPOINTS = {
+    "blog": "https://openapi.naver.com/v1/search/blog.json",
+    "web": "https://openapi.naver.com/v1/search/webkr.json",
+    "news": "https://openapi.naver.com/v1/search/news.json"
+}
+
+# 네이버 API 비동기 호출 함수 (캐시와 세션 상태를 사용하지 않음)
+async def call_naver_api_async(query, api_type, client_id, client_secret, display=5, sort="sim"):
+    """네이버 API를 비동기로 호출하여 결과를 반환하는 함수"""
+    if api_type not in NAVER_ENDPOINTS:
+        raise ValueError(f"지원하지 않는 API 타입: {api_type}")
+    
+    url = NAVER_ENDPOINTS[api_type]
+    headers = {
+        "X-Naver-Client-Id": client_id,
+        "X-Naver-Client-Secret": client_secret
+    }
+    params = {
+        "query": query,
+        "display": display,
+        "sort": sort
+    }
+    
+    response = await async_get(url, headers=headers, params=params)
+    response.raise_for_status()
+    result = response.json()
+    
+    # 검색 소스 정보 추가
+    for item in result.get("items", []):
+        item["source_type"] = f"naver_{api_type}"
+    
+    return result
+
+# 공급자 회로가 열려 있을 때 캐시 결과로 대체하는 함수
+def get_stale_result(cache, cache_key, source, error):
+    """error가 CircuitOpenError이면 유효 시간이 지난 캐시 결과라도 찾아 반환합니다. 없으면 None을 반환합니다."""
+    if not isinstance(error, CircuitOpenError):
+        return None
+    stale = cache.get(cache_key, source, allow_stale=True)
+    if stale is not None:
+        logger.warning(f"{source} 회로가 열려 있어 유효 시간이 지난 캐시 결과를 사용합니다.")
+    return stale
+
 # 네이버 API 호출 함수
 def call_naver_api(query, api_type, display=5, sort="sim"):
     """네이버 API를 호출하여 결과를 반환하는 함수"""
     st.write(f"네이버 API 호출: {api_type} - 쿼리: {query}")  # 디버깅용
 
-    """네이버 API를 호출하여 결과를 반환하는 함수"""
     if not st.session_state.get('naver_api_configured', False):
         return {"error": "네이버 API 키가 설정되지 않았습니다."}
     
-    # 캐시 확인
+    # 캐시 확인 (세션과 재시작 사이에서 공유)
+    cache = get_response_cache()
     cache_key = get_cache_key(query, f"naver_{api_type}")
-    if cache_key in st.session_state.cache:
-        timestamp = st.session_state.cache_timestamp.get(cache_key, 0)
-        if time.time() - timestamp < CACHE_EXPIRATION:
-            return st.session_state.cache[cache_key]
-    
-    # API 엔드포인트 설정
-    endpoints = {
-        "blog": "https://openapi.naver.com/v1/search/blog.json",
-        "web": "https://openapi.naver.com/v1/search/webkr.json",
-        "news": "https://openapi.naver.com/v1/search/news.json"
-    }
+    cached = cache.get(cache_key, f"naver_{api_type}")
+    if cached is not None:
+        return cached
     
-    if api_type not in endpoints:
+    if api_type not in NAVER_ENDPOINTS:
         return {"error": f"지원하지 않는 API 타입: {api_type}"}
     
-    url = endpoints[api_type]
-    headers = {
-        "X-Naver-Client-Id": st.session_state.naver_client_id,
-        "X-Naver-Client-Secret": st.session_state.naver_client_secret
-    }
-    params = {
-        "query": query,
-        "display": display,
-        "sort": sort
-    }
-    
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        result = response.json()
-        
-        # 검색 소스 정보 추가
-        for item in result.get("items", []):
-            item["source_type"] = f"naver_{api_type}"
+        result = run_sync(call_naver_api_async(
+            query,
+            api_type,
+            st.session_state.naver_client_id,
+            st.session_state.naver_client_secret,
+            display=display,
+            sort=sort
+        ))
         
         # 캐시에 저장
-        st.session_state.cache[cache_key] = result
-        st.session_state.cache_timestamp[cache_key] = time.time()
+        cache.set(cache_key, f"naver_{api_type}", result)
         
         return result
     except Exception as e:
+        stale = get_stale_result(cache, cache_key, f"naver_{api_type}", e)
+        if stale is not None:
+            return stale
         logger.error(f"네이버 API 호출 오류: {api_type} - {str(e)}")
         return {"error": f"API 호출 중 오류 발생: {str(e)}"}
 
-# 유튜브 API 호출 함수
-def call_youtube_api(query, max_results=5, lang=None):
-    """유튜브 API를 호출하여 결과를 반환하는 함수"""
-    if not st.session_state.get('youtube_api_configured', False):
-        return {"error": "유튜브 API 키가 설정되지 않았습니다."}
-    
-    # 캐시 확인
-    cache_key = get_cache_key(query, "youtube")
-    if cache_key in st.session_state.cache:
-        timestamp = st.session_state.cache_timestamp.get(cache_key, 0)
-        if time.time() - timestamp < CACHE_EXPIRATION:
-            return st.session_state.cache[cache_key]
-    
+# 유튜브 API 비동기 호출 함수 (캐시와 세션 상태를 사용하지 않음)
+async def call_youtube_api_async(query, api_key, max_results=5, lang=None):
+    """유튜브 API를 비동기로 호출하여 결과를 반환하는 함수"""
     url = "https://www.googleapis.com/youtube/v3/search"
     params = {
-        "key": st.session_state.youtube_api_key,
+        "key": api_key,
         "q": query,
         "part": "snippet",
         "maxResults": max_results,
@@ -137,37 +162,59 @@ def call_youtube_api(query, max_results=5, lang=None):
         "relevanceLanguage": lang if lang else "en"
     }
     
+    response = await async_get(url, params=params)
+    response.raise_for_status()
+    result = response.json()
+    
+    # 결과 형식 변환
+    items = []
+    for item in result.get("items", []):
+        video_id = item["id"]["videoId"]
+        snippet = item["snippet"]
+        items.append({
+            "title": snippet["title"],
+            "description": snippet["description"],
+            "link": f"https://www.youtube.com/watch?v={video_id}",
+            "thumbnail": snippet["thumbnails"]["medium"]["url"],
+            "publishedAt": snippet["publishedAt"],
+            "channelTitle": snippet["channelTitle"],
+            "source_type": "youtube"
+        })
+    
+    return {
+        "items": items,
+        "total": len(items)
+    }
+
+# 유튜브 API 호출 함수
+def call_youtube_api(query, max_results=5, lang=None):
+    """유튜브 API를 호출하여 결과를 반환하는 함수"""
+    if not st.session_state.get('youtube_api_configured', False):
+        return {"error": "유튜브 API 키가 설정되지 않았습니다."}
+    
+    # 캐시 확인 (세션과 재시작 사이에서 공유)
+    cache = get_response_cache()
+    cache_key = get_cache_key(query, "youtube")
+    cached = cache.get(cache_key, "youtube")
+    if cached is not None:
+        return cached
+    
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        result = response.json()
-        
-        # 결과 형식 변환
-        items = []
-        for item in result.get("items", []):
-            video_id = item["id"]["videoId"]
-            snippet = item["snippet"]
-            items.append({
-                "title": snippet["title"],
-                "description": snippet["description"],
-                "link": f"https://www.youtube.com/watch?v={video_id}",
-                "thumbnail": snippet["thumbnails"]["medium"]["url"],
-                "publishedAt": snippet["publishedAt"],
-                "channelTitle": snippet["channelTitle"],
-                "source_type": "youtube"
-            })
-        
-        formatted_result = {
-            "items": items,
-            "total": len(items)
-        }
+        formatted_result = run_sync(call_youtube_api_async(
+            query,
+            st.session_state.youtube_api_key,
+            max_results=max_results,
+            lang=lang
+        ))
         
         # 캐시에 저장
-        st.session_state.cache[cache_key] = formatted_result
-        st.session_state.cache_timestamp[cache_key] = time.time()
+        cache.set(cache_key, "youtube", formatted_result)
         
         return formatted_result
     except Exception as e:
+        stale = get_stale_result(cache, cache_key, "youtube", e)
+        if stale is not None:
+            return stale
         logger.error(f"유튜브 API 호출 오류: {str(e)}")
         return {"error": f"유튜브 API 호출 중 오류 발생: {str(e)}"}
 
@@ -176,113 +223,189 @@ def fetch_real_time_news(api_key, query="AI digital transformation", days=7, lan
     """
     NewsAPI를 사용하여 실시간 뉴스를 가져옵니다.
     무료 플랜은 최근 1개월(실제로는 더 짧을 수 있음) 데이터만 접근 가능합니다.
+    지난번 이후의 새 기사만 가져와 기사 저장소에 합칩니다. (news_feed 참고)
+    기사 저장소가 결과를 재사용하므로 응답 캐시는 거치지 않습니다.
     """
     if not st.session_state.get('news_api_configured', False):
         return {"error": "News API 키가 설정되지 않았습니다."}
-        
-    # 캐시 확인
-    cache_key = get_cache_key(query, "news_api")
-    if cache_key in st.session_state.cache:
-        timestamp = st.session_state.cache_timestamp.get(cache_key, 0)
-        if time.time() - timestamp < CACHE_EXPIRATION:
-            return st.session_state.cache[cache_key]
-    
-    # 날짜 범위 계산 (API 제한으로 인해 기간을 줄임)
-    end_date = datetime.now()
-    # 무료 플랜 제한을 고려하여 기간을 줄임
-    start_date = end_date - timedelta(days=min(days, 7))  # 최대 7일로 제한
-    
-    # NewsAPI 요청
-    url = "https://newsapi.org/v2/everything"
-    params = {
-        'q': query,
-        'from': start_date.strftime('%Y-%m-%d'),
-        'to': end_date.strftime('%Y-%m-%d'),
-        'sortBy': 'publishedAt',
-        'language': language,
-        'apiKey': api_key
-    }
     
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        news_data = response.json()
-        
-        # 캐시에 저장
-        st.session_state.cache[cache_key] = news_data["articles"]
-        st.session_state.cache_timestamp[cache_key] = time.time()
-        
-        return news_data["articles"]
+        return fetch_news_api_incremental(api_key, query, days, language)
     except Exception as e:
         logger.error(f"News API 호출 오류: {str(e)}")
         return {"error": f"News API 호출 중 오류 발생: {str(e)}"}
 
+# HTML 태그 패턴 (모듈 로드 시 한 번만 컴파일)
+HTML_TAG_PATTERN = re.compile('<.*?>')
+
 # HTML 태그 제거 함수
 def remove_html_tags(text):
     if not text:
         return ""
-    clean = re.compile('<.*?>')
-    text = re.sub(clean, '', text)
+    text = HTML_TAG_PATTERN.sub('', text)
     # HTML 엔티티 처리
     text = text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"')
     return text
 
-# 병렬 검색 함수
-def parallel_search(query, sources=None, korean_query=None):
-    """여러 검색 소스를 병렬로 호출하는 함수"""
-    if sources is None:
-        sources = ["naver_blog", "naver_web", "youtube"]
-    
-    all_results = {}
-    errors = []
+def normalize_texts(texts):
+    """텍스트 목록 각각을 소문자로 바꾸고 HTML 태그를 제거합니다. (remove_html_tags(text.lower())와 같음)
+    소문자 변환, 태그 패턴, 엔티티 처리는 줄바꿈을 넘어 영향을 주지 않으므로 줄바꿈으로 이어 붙여 한 번에 처리합니다."""
+    cleaned = remove_html_tags("\n".join(texts).lower()).split("\n")
+    if len(cleaned) != len(texts):
+        # 줄바꿈이 들어 있는 텍스트가 있으면 하나씩 처리
+        return [remove_html_tags(text.lower()) for text in texts]
+    return cleaned
+
+# 검색 소스별 API 요청 목록
+def plan_source_requests(source, query, korean_query=None):
+    """검색 소스 하나를 검색하는 데 필요한 API 요청 목록을 반환합니다.
+    요청은 (캐시 소스, 쿼리, 결과 수, 언어) 튜플입니다."""
+    if source == "naver_blog":
+        # 쿼리 단순화 - "스트림릿"만 검색
+        return [("naver_blog", "스트림릿", 8, None)]
+    elif source == "naver_web":
+        # 쿼리 단순화 - "스트림릿"만 검색
+        return [("naver_web", "스트림릿", 8, None)]
+    elif source == "naver_news":
+        return [("naver_news", "스트림릿", 5, None)]
+    elif source == "youtube":
+        # 간단한 쿼리로 변경, 더 많은 결과 요청
+        return [("youtube", "스트림릿", 4, "ko"), ("youtube", "streamlit", 4, "en")]
+    return []
+
+# 세션 상태에서 검색 API 인증 정보 읽기
+def get_search_credentials():
+    """검색 API별 인증 정보를 반환합니다. 설정되지 않은 API는 None입니다.
+    세션 상태는 스크립트 스레드에서만 읽을 수 있으므로 요청을 보내기 전에 호출합니다."""
+    credentials = {"naver": None, "youtube": None}
+    if st.session_state.get('naver_api_configured', False):
+        credentials["naver"] = (st.session_state.naver_client_id, st.session_state.naver_client_secret)
+    if st.session_state.get('youtube_api_configured', False):
+        credentials["youtube"] = st.session_state.youtube_api_key
+    return credentials
+
+# API 요청 하나를 비동기로 보내는 함수
+async def fetch_search_request_async(request, credentials):
+    """API 요청 하나를 API별 전역 동시 요청 제한 안에서 보냅니다.
+    다른 세션이나 실행에서 같은 요청(엔드포인트, 쿼리, 옵션)이 진행 중이면 그 응답을 함께 사용합니다."""
+    source, query, count, lang = request
+    
+    async def fetch():
+        if source == "youtube":
+            async with get_semaphore("youtube", API_CONCURRENCY_LIMITS["youtube"]):
+                return await call_youtube_api_async(query, credentials["youtube"], max_results=count, lang=lang)
+        
+        client_id, client_secret = credentials["naver"]
+        async with get_semaphore("naver", API_CONCURRENCY_LIMITS["naver"]):
+            return await call_naver_api_async(query, source[len("naver_"):], client_id, client_secret, display=count)
+    
+    return await single_flight(("search",) + request, fetch)
+
+# API 요청 목록을 한꺼번에 보내는 함수
+def fetch_search_requests(requests, on_progress=None):
+    """API 요청 목록을 공유 이벤트 루프에서 한꺼번에 보내고 {요청: 결과}를 반환합니다.
+    중복된 요청과 캐시에 있는 요청은 보내지 않고, 실패한 요청의 결과는 {"error": 메시지}입니다.
+    on_progress가 있으면 요청이 끝날 때마다 호출한 스레드에서 on_progress(완료 수, 전체 수)를 호출합니다."""
+    credentials = get_search_credentials()
+    cache = get_response_cache()
+    results = {}
+    futures = {}
+    
+    # 같은 요청은 한 번만 보냄 (여러 주제가 같은 쿼리로 검색하는 경우)
+    unique_requests = list(dict.fromkeys(requests))
+    if len(unique_requests) < len(requests):
+        logger.info(f"검색 요청 {len(requests)}개 중 중복을 제외한 {len(unique_requests)}개만 처리합니다.")
+    
+    for request in unique_requests:
+        source, query = request[0], request[1]
+        api = "youtube" if source == "youtube" else "naver"
+        cached = cache.get(get_cache_key(query, source), source)
+        if cached is not None:
+            results[request] = cached
+        elif credentials[api] is None:
+            api_name = "유튜브" if api == "youtube" else "네이버"
+            results[request] = {"error": f"{api_name} API 키가 설정되지 않았습니다."}
+        else:
+            futures[submit(fetch_search_request_async(request, credentials))] = request
     
-    # 영어 쿼리와 한국어 쿼리 처리
-    if not korean_query:
-        korean_query = query
-    english_query = f"Streamlit {query}"  # 영어 쿼리는 항상 Streamlit을 포함
+    done, total = len(unique_requests) - len(futures), len(unique_requests)
+    if on_progress is not None:
+        on_progress(done, total)
     
-    def search_source(source):
+    for future in as_completed(futures):
+        request = futures[future]
+        source, query = request[0], request[1]
         try:
-            if source == "naver_blog":
-                # 쿼리 단순화 - "스트림릿"만 검색
-                return source, call_naver_api(f"스트림릿", "blog", display=8)
-            elif source == "naver_web":
-                # 쿼리 단순화 - "스트림릿"만 검색
-                return source, call_naver_api(f"스트림릿", "web", display=8)
-            elif source == "naver_news":
-                return source, call_naver_api(f"스트림릿", "news", display=5)
-            elif source == "youtube":
-                # 간단한 쿼리로 변경, 더 많은 결과 요청
-                kr_results = call_youtube_api(f"스트림릿", max_results=4, lang="ko")
-                en_results = call_youtube_api("streamlit", max_results=4, lang="en")
-                
-                # 결과 합치기
-                combined_items = []
-                if "items" in kr_results and not "error" in kr_results:
-                    combined_items.extend(kr_results["items"])
-                if "items" in en_results and not "error" in en_results:
-                    combined_items.extend(en_results["items"])
-                
-                return source, {"items": combined_items, "total": len(combined_items)}
+            result = future.result()
+            # 캐시에 저장
+            cache.set(get_cache_key(query, source), source, result)
         except Exception as e:
-            return source, {"error": str(e)}
+            result = get_stale_result(cache, get_cache_key(query, source), source, e)
+            if result is None:
+                logger.error(f"검색 API 호출 오류: {source} - {str(e)}")
+                result = {"error": f"API 호출 중 오류 발생: {str(e)}"}
+        results[request] = result
+        done += 1
+        if on_progress is not None:
+            on_progress(done, total)
+    
+    return results
+
+# 소스별 API 요청 결과를 합치는 함수
+def combine_source_results(source, request_results):
+    """검색 소스의 API 요청 결과를 parallel_search의 소스별 결과 형식으로 합칩니다."""
+    if not request_results:
+        return {"error": f"지원하지 않는 검색 소스: {source}"}
+    
+    if source == "youtube":
+        # 결과 합치기 - 한국어/영어 검색 중 실패한 쪽은 건너뜀
+        combined_items = []
+        for result in request_results:
+            if "items" in result and not "error" in result:
+                combined_items.extend(result["items"])
+        return {"items": combined_items, "total": len(combined_items)}
+    
+    return request_results[0]
+
+# 여러 주제 병렬 검색 함수
+def search_topics(topics, sources=None, on_progress=None):
+    """여러 주제를 한꺼번에 검색하고 {주제 이름: parallel_search 결과}를 반환합니다.
+    모든 주제의 API 요청을 공유 이벤트 루프에서 동시에 보내므로 주제 수와 관계없이 한 번의 왕복 시간 안에 끝납니다."""
+    if sources is None:
+        sources = LEARNING_MATERIAL_SOURCES
+    
+    plans = {}
+    for topic_dict in topics:
+        topic = topic_dict["name"]
+        korean_topic = topic_dict.get("korean_name") or topic
+        plans[topic] = {source: plan_source_requests(source, topic, korean_topic) for source in sources}
+    
+    requests = [request for plan in plans.values() for source_requests in plan.values() for request in source_requests]
+    responses = fetch_search_requests(requests, on_progress)
     
-    # 병렬로 검색
-    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
-        futures = [executor.submit(search_source, source) for source in sources]
-        for future in futures:
-            source, result = future.result()
+    all_results = {}
+    for topic, plan in plans.items():
+        topic_results = {}
+        errors = []
+        for source, source_requests in plan.items():
+            result = combine_source_results(source, [responses[request] for request in source_requests])
             if "error" in result:
                 errors.append(f"{source}: {result['error']}")
             else:
-                all_results[source] = result
-    
-    # 오류가 있으면 로깅
-    if errors:
-        logger.warning(f"검색 오류: {errors}")
+                topic_results[source] = result
+        
+        # 오류가 있으면 로깅
+        if errors:
+            logger.warning(f"검색 오류 ({topic}): {errors}")
+        all_results[topic] = topic_results
     
     return all_results
 
+# 병렬 검색 함수
+def parallel_search(query, sources=None, korean_query=None):
+    """여러 검색 소스를 병렬로 호출하는 함수"""
+    return search_topics([{"name": query, "korean_name": korean_query}], sources)[query]
+
 # ------------------------------------------------------------
 # 교육적 가치 평가 및 콘텐츠 선별
 # ------------------------------------------------------------
@@ -314,75 +437,88 @@ TOPIC_KEYWORDS = {
     "배포": ["deploy", "배포", "share", "공유", "cloud", "클라우드", "docker", "도커"]
 }
 
+# 스트림릿 언급 키워드 (제목/설명 위치에 따라 점수가 다름)
+STREAMLIT_KEYWORDS = ["streamlit", "스트림릿"]
+
+# 제목에 있으면 감점하는 키워드 (질문/오류 관련 글)
+NEGATIVE_KEYWORDS = [
+    "?", "궁금", "문제", "에러", "오류", "해결", "질문", "안되", "않아", 
+    "실패", "이슈", "버그", "도와", "조언", "help", "error", "issue", "bug", "problem"
+]
+
+# 소스 유형별 점수 가중치 (약간 완화: youtube 1.2 -> 1.1, naver_web 1.1 -> 1.05)
+SOURCE_SCORE_WEIGHTS = {"youtube": 1.1, "naver_blog": 1.0, "naver_web": 1.05}
+
+# 소스별 최대 선택 개수 (제한 완화) - 목록에 없는 소스는 선택하지 않음
+SOURCE_LIMITS = {
+    "youtube": 3,     # 2 -> 3으로 증가
+    "naver_blog": 2,  # 1 -> 2로 증가
+    "naver_web": 2,   # 1 -> 2로 증가
+    "naver_news": 1   # 0 -> 1로 증가
+}
+
+# 이 점수 미만인 항목은 선택하지 않음 (원래 기준보다 더 낮게 설정)
+MIN_MATERIAL_SCORE = 5
+
+# 평가용 키워드 매처 (모듈 로드 시 한 번만 생성)
+EDUCATION_MATCHER = KeywordMatcher(EDUCATION_KEYWORDS, weights={"high": 6, "medium": 4, "low": 2})
+NEGATIVE_MATCHER = KeywordMatcher({"negative": NEGATIVE_KEYWORDS})
+
+@lru_cache(maxsize=256)
+def get_topic_matcher(topic_lower):
+    """주제와 관련된 TOPIC_KEYWORDS 키워드의 매처를 반환합니다. (키워드 하나당 5점)"""
+    return KeywordMatcher(
+        {key: keywords for key, keywords in TOPIC_KEYWORDS.items()
+         if key.lower() in topic_lower or topic_lower in key.lower()},
+        weights=dict.fromkeys(TOPIC_KEYWORDS, 5)
+    )
+
 # 교육적 가치 평가 함수
 # 교육적 가치 평가 함수 수정 - 필터링 조건 완화
 def evaluate_educational_value(item, topic=None):
     """검색 결과의 교육적 가치를 평가하는 함수 - 완화된 버전"""
-    score = 10  # 기본 점수를 더 높게 시작 (원래 0에서 시작)
-    title = item.get("title", "").lower()
-    description = item.get("description", "").lower()
-    source_type = item.get("source_type", "")
-    
     # HTML 태그 제거
-    title = remove_html_tags(title)
-    description = remove_html_tags(description)
+    title = remove_html_tags(item.get("title", "").lower())
+    description = remove_html_tags(item.get("description", "").lower())
+    topic_lower = topic.lower() if topic else None
+    return score_material(title, description, item.get("source_type", ""), topic_lower)
+
+def score_material(title, description, source_type, topic_lower=None):
+    """소문자로 바꾸고 HTML 태그를 제거한 제목/설명으로 교육적 가치 점수를 계산합니다."""
+    score = 10  # 기본 점수를 더 높게 시작 (원래 0에서 시작)
     
     # 전체 텍스트
-    full_text = f"{title} {description}".lower()
+    full_text = f"{title} {description}"
     
     # 1. 교육 관련 키워드 점수 (점수 증가)
-    for keyword in EDUCATION_KEYWORDS["high"]:
-        if keyword.lower() in full_text:
-            score += 6  # 8 -> 6으로 감소 (이미 기본 점수가 높아짐)
-        elif keyword.lower() in title:
-            score += 8  # 10 -> 8로 감소
-    
-    for keyword in EDUCATION_KEYWORDS["medium"]:
-        if keyword.lower() in full_text:
-            score += 4  # 5 -> 4로 감소
-    
-    for keyword in EDUCATION_KEYWORDS["low"]:
-        if keyword.lower() in full_text:
-            score += 2  # 3 -> 2로 감소
+    # high 6점(8 -> 6), medium 4점(5 -> 4), low 2점(3 -> 2)
+    # high 키워드는 제목에만 있어도 전체 텍스트에 포함되므로 제목 가산점(8점)은 적용되지 않음
+    score += EDUCATION_MATCHER.score(full_text)
     
     # 2. 주제별 키워드 점수 (점수 유지)
-    if topic:
-        topic_lower = topic.lower()
+    if topic_lower:
         # 주제와 정확히 일치하면 점수 추가
         if topic_lower in full_text:
             score += 8  # 10 -> 8로 감소
         
-        # 주제 관련 키워드 확인
-        for key, keywords in TOPIC_KEYWORDS.items():
-            if key.lower() in topic_lower or topic_lower in key.lower():
-                for keyword in keywords:
-                    if keyword.lower() in full_text:
-                        score += 5  # 7 -> 5로 감소
+        # 주제 관련 키워드 확인 - 키워드 하나당 5점 (7 -> 5로 감소)
+        score += get_topic_matcher(topic_lower).score(full_text)
     
     # 3. 스트림릿 언급 점수 (필수 항목이므로 점수 유지)
-    for keyword in ["streamlit", "스트림릿"]:
-        if keyword in title.lower():
+    for keyword in STREAMLIT_KEYWORDS:
+        if keyword in title:
             score += 10  # 12 -> 10으로 감소
-        elif keyword in description.lower():
+        elif keyword in description:
             score += 5  # 6 -> 5로 감소
     
     # 4. 소스 유형별 가중치 (약간 완화)
-    if source_type == "youtube":
-        score *= 1.1  # 1.2 -> 1.1로 감소
-    elif source_type == "naver_blog":
-        score *= 1.0  # 변경 없음
-    elif source_type == "naver_web":
-        score *= 1.05  # 1.1 -> 1.05로 감소
+    if source_type in SOURCE_SCORE_WEIGHTS:
+        score *= SOURCE_SCORE_WEIGHTS[source_type]
     
     # 5. 부정적 요소 감점 (감점 완화)
-    negative_patterns = [
-        r"\?", "궁금", "문제", "에러", "오류", "해결", "질문", "안되", "않아", 
-        "실패", "이슈", "버그", "도와", "조언", "help", "error", "issue", "bug", "problem"
-    ]
-    
-    for pattern in negative_patterns:
-        if re.search(pattern, title):
-            score -= 2  # 5 -> 2로 감소
+    # 가중치를 곱한 뒤의 실수 점수이므로 기존과 같은 결과가 나오도록 한 번에 빼지 않고 하나씩 뺌
+    for _ in range(NEGATIVE_MATCHER.count(title)):
+        score -= 2  # 5 -> 2로 감소
     
     # 6. 설명 길이 평가 (감점 완화)
     if len(description) < 30:
@@ -392,16 +528,13 @@ def evaluate_educational_value(item, topic=None):
     
     return score
 
-# 최적의 교육 자료 선별 함수 수정 - 필터링 기준 완화
-def select_best_materials(search_results, topic=None, max_total=4):
-    """검색 결과에서 최적의 교육 자료를 선별하는 함수 - 완화된 버전"""
-    if not search_results:
-        logger.warning(f"검색 결과가 없습니다: {topic}")
-        return []
-    
-    all_scored_items = []
-    
-    # 각 소스별 결과 평가
+# 검색 결과 일괄 평가
+# parallel_search 결과 전체의 제목/설명을 normalize_texts로 한 번에 정규화한 뒤 항목별로 점수를 계산합니다.
+# 후보는 보통 수십 개라 데이터프레임이나 키워드 적중 행렬을 만드는 비용이 점수 계산보다 커서
+# 평범한 리스트로 처리합니다. (benchmarks/bench_materials.py 참고)
+def collect_material_items(search_results):
+    """parallel_search 결과의 항목을 평가용 목록으로 모읍니다. (소스 순서, 소스 내 순서 유지)"""
+    items = []
     for source, result in search_results.items():
         if "items" not in result or "error" in result:
             logger.warning(f"소스 {source}에 유효한 결과가 없습니다: {result.get('error', '알 수 없는 오류')}")
@@ -411,59 +544,61 @@ def select_best_materials(search_results, topic=None, max_total=4):
             logger.warning(f"소스 {source}의 검색 결과가 비어 있습니다.")
             continue
         
-        for item in result.get("items", []):
-            score = evaluate_educational_value(item, topic)
-            logger.info(f"항목 평가: '{remove_html_tags(item.get('title', '제목 없음'))[:30]}...' - 점수: {score}")
-            all_scored_items.append((score, item))
+        items.extend(result["items"])
+    return items
+
+def evaluate_educational_value_batch(items, topic=None):
+    """항목 목록의 점수를 같은 순서의 리스트로 반환합니다.
+    항목별 점수는 evaluate_educational_value와 같습니다."""
+    titles = normalize_texts([item.get("title", "") for item in items])
+    descriptions = normalize_texts([item.get("description", "") for item in items])
+    topic_lower = topic.lower() if topic else None
+    return [
+        score_material(title, description, item.get("source_type", ""), topic_lower)
+        for item, title, description in zip(items, titles, descriptions)
+    ]
+
+# 최적의 교육 자료 선별 함수 수정 - 필터링 기준 완화
+@traced()
+def select_best_materials(search_results, topic=None, max_total=4):
+    """검색 결과에서 최적의 교육 자료를 선별하는 함수 - 완화된 버전"""
+    if not search_results:
+        logger.warning(f"검색 결과가 없습니다: {topic}")
+        return []
+    
+    items = collect_material_items(search_results)
     
     # 결과가 있는지 확인
-    if not all_scored_items:
+    if not items:
         logger.warning(f"주제 '{topic}'에 대한 평가된 항목이 없습니다.")
         return []
     
-    # 점수에 따라 정렬
-    all_scored_items.sort(reverse=True)
-    
-    # 소스별 제한 설정 (제한 완화)
-    source_limits = {
-        "youtube": 3,     # 2 -> 3으로 증가
-        "naver_blog": 2,  # 1 -> 2로 증가
-        "naver_web": 2,   # 1 -> 2로 증가
-        "naver_news": 1   # 0 -> 1로 증가
-    }
+    # 점수 내림차순 정렬 - 동점이면 검색 결과 순서 유지
+    scores = evaluate_educational_value_batch(items, topic)
+    order = sorted(range(len(items)), key=scores.__getitem__, reverse=True)
     
+    # 점수 기준을 넘는 항목 중 소스별로 상위 SOURCE_LIMITS개씩, 전체 순위대로 최대 max_total개 선택
     source_counters = {}
     selected_items = []
-    
-    # 각 소스의 제한을 지키면서 선택
-    for score, item in all_scored_items:
-        source_type = item.get("source_type", "unknown")
-        
-        # 해당 소스에서 이미 충분히 선택했으면 스킵
-        if source_counters.get(source_type, 0) >= source_limits.get(source_type, 0):
-            continue
-        
-        # 점수가 너무 낮은 항목은 필터링 (점수 기준 완화)
-        if score < 5:  # 원래 기준보다 더 낮게 설정
-            logger.info(f"낮은 점수로 제외: {remove_html_tags(item.get('title', '제목 없음'))[:30]}... - 점수: {score}")
-            continue
-        
-        # 선택된 아이템에 추가
-        selected_items.append(item)
-        source_counters[source_type] = source_counters.get(source_type, 0) + 1
-        
-        # 최대 개수에 도달하면 종료
-        if len(selected_items) >= max_total:
+    for index in order:
+        if scores[index] < MIN_MATERIAL_SCORE or len(selected_items) >= max_total:
             break
+        item = items[index]
+        source_type = item.get("source_type", "")
+        if source_counters.get(source_type, 0) < SOURCE_LIMITS.get(source_type, 0):
+            selected_items.append(item)
+            source_counters[source_type] = source_counters.get(source_type, 0) + 1
+    excluded = sum(score < MIN_MATERIAL_SCORE for score in scores)
+    logger.info(f"주제 '{topic}': {len(items)}개 항목 평가, 낮은 점수로 제외 {excluded}개")
     
     # 선택된 항목이 없거나 너무 적으면 점수 기준을 무시하고 최상위 항목 선택
-    if len(selected_items) < 2 and all_scored_items:
+    if len(selected_items) < 2:
         logger.warning(f"선택된 항목이 너무 적습니다. 점수 기준을 무시하고 상위 항목을 선택합니다.")
-        add_count = min(2 - len(selected_items), len(all_scored_items))
+        add_count = min(2 - len(selected_items), len(items))
         
         # 이미 선택된 항목을 제외하고 추가
         already_selected = set(item.get('link', '') for item in selected_items)
-        for score, item in all_scored_items:
+        for item in (items[index] for index in order):
             if item.get('link', '') not in already_selected:
                 selected_items.append(item)
                 add_count -= 1
@@ -474,13 +609,12 @@ def select_best_materials(search_results, topic=None, max_total=4):
     return selected_items
 
 # 주제에 대한 최적의 학습 자료 검색
-def get_best_learning_materials(topic, korean_topic=None):
-    """주제에 대한 최적의 학습 자료를 검색하는 함수 - 수정됨"""
-    # 검색 소스 결정
-    sources = ["naver_blog", "naver_web", "youtube"]
-    
+def get_best_learning_materials(topic, korean_topic=None, search_results=None):
+    """주제에 대한 최적의 학습 자료를 검색하는 함수 - 수정됨
+    search_results(parallel_search 결과)가 있으면 다시 검색하지 않고 그 결과에서 선별합니다."""
     # 병렬 검색 실행
-    search_results = parallel_search(topic, sources, korean_topic)
+    if search_results is None:
+        search_results = parallel_search(topic, LEARNING_MATERIAL_SOURCES, korean_topic)
     
     # 최적의 교육 자료 선별
     materials = select_best_materials(search_results, topic, max_total=4)
@@ -493,18 +627,22 @@ def get_best_learning_materials(topic, korean_topic=None):
     return materials
 
 # 여러 주제에 대한 학습 자료 검색
+@traced("study_materials", kind="section")
 def get_learning_materials_for_topics(topics):
-    """여러 주제에 대한 학습 자료를 검색하는 함수"""
-    all_materials = {}
+    """여러 주제에 대한 학습 자료를 검색하는 함수
+    모든 주제의 검색 요청을 한꺼번에 보내고 진행 상황은 진행 표시줄 하나로 보여줍니다."""
+    progress = st.progress(0.0, text="학습 자료 검색 중...")
     
+    def on_progress(done, total):
+        progress.progress(done / total if total else 1.0, text=f"학습 자료 검색 중... ({done}/{total})")
+    
+    search_results = search_topics(topics, LEARNING_MATERIAL_SOURCES, on_progress)
+    progress.empty()
+    
+    all_materials = {}
     for topic_dict in topics:
         topic = topic_dict["name"]
-        with st.spinner(f"'{topic}' 관련 학습 자료 검색 중..."):
-            # 영어와 한국어 주제 설정
-            korean_topic = topic_dict.get("korean_name", topic)  # 한국어 이름이 있으면 사용
-            
-            materials = get_best_learning_materials(topic, korean_topic)
-            all_materials[topic] = materials
+        all_materials[topic] = get_best_learning_materials(topic, search_results=search_results[topic])
     
     return all_materials
 
@@ -552,104 +690,12 @@ def get_weekly_content(week_number):
 # OpenAI 통합 기능
 # ------------------------------------------------------------
 
-# 마크다운 텍스트를 HTML로 변환하는 함수
-def convert_markdown_to_html(text):
-    """마크다운 텍스트를 HTML로 변환합니다."""
-    # AT/DT 팁 섹션 특별 처리
-    if "이번 주 팁:" in text or "핵심 프롬프트 예시" in text:
-        # "이번 주 팁:" 제목을 특별 클래스로 처리
-        text = re.sub(r'^## 이번 주 팁: (.*?)$', r'<div class="tip-title">이번 주 팁: \1</div>', text, flags=re.MULTILINE)
-        
-        # "핵심 프롬프트 예시:" 부분을 특별 클래스로 처리
-        text = re.sub(r'\*\*핵심 프롬프트 예시:\*\*', r'<div class="prompt-examples-title">핵심 프롬프트 예시:</div>', text)
-        
-        # 프롬프트 템플릿 처리 (Chain of Thought/Chain of Draft 등)
-        # 각 템플릿은 제목(색상 강조), 예시, 내용으로 구성됨
-        
-        # 첫 번째 템플릿 (Chain of Thought)
-        text = re.sub(
-            r'- (첫 번째 프롬프트 템플릿 \(Chain of Thought 활용\):)(.*?)(?=- 두 번째 프롬프트|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 두 번째 템플릿 (Chain of Draft)
-        text = re.sub(
-            r'- (두 번째 프롬프트 템플릿 \(Chain of Draft 활용\):)(.*?)(?=- 세 번째 프롬프트|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 세 번째 템플릿 (Chain of Thought와 Chain of Draft 결합)
-        text = re.sub(
-            r'- (세 번째 프롬프트 템플릿 \(Chain of Thought와 Chain of Draft 결합\):)(.*?)(?=이 팁을|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 각 템플릿 내에서 예시와 프롬프트 순서 바꾸기
-        # 예시: 로 시작하는 부분을 <div class="example-label">예시:</div><div class="example-content">내용</div> 로 변환
-        text = re.sub(
-            r'<div class="template-content">(.*?)예시:(.*?)프롬프트:(.*?)</div>',
-            r'<div class="template-content"><div class="example-label">예시:</div><div class="example-content">\2</div><div class="prompt-label">프롬프트:</div><div class="prompt-content">\3</div></div>',
-            text,
-            flags=re.DOTALL
-        )
-        
-        # 마지막 문장 스타일 적용 (약간의 여백과 이탤릭체)
-        if "다음 주에는" in text:
-            text = re.sub(r'(다음 주에는.*?\.)', r'<div class="tip-footer">\1</div>', text)
-    
-    # 제목 변환 (# 제목)
-    text = re.sub(r'^# (.*)$', r'<h1>\1</h1>', text, flags=re.MULTILINE)
-    text = re.sub(r'^## (.*)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
-    text = re.sub(r'^### (.*)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
-    
-    # 굵은 텍스트 (**텍스트**)
-    text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
-    
-    # 기울임 텍스트 (*텍스트*)
-    text = re.sub(r'\*(.*?)\*', r'<em>\1</em>', text)
-    
-    # 링크 변환 ([텍스트](URL))
-    text = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', text)
-    
-# 일반적인 글머리 기호 (- 항목) 처리 (이미 처리된 AT/DT 팁 예시는 제외)
-    if "prompt-template" not in text:
-        text = re.sub(r'^\- (.*?)$', r'<li>\1</li>', text, flags=re.MULTILINE)
-    
-    # 색상 표시 강조 - 주요 소식에서 사용할 수 있는 색상 강조 기능
-    text = re.sub(r'\[강조\](.*?)\[\/강조\]', r'<span style="color:#e74c3c; font-weight:bold;">\1</span>', text)
-    
-    # 줄바꿈을 <br>과 <p>로 변환
-    paragraphs = text.split('\n\n')
-    for i, paragraph in enumerate(paragraphs):
-        if not paragraph.startswith('<h') and not paragraph.startswith('<li') and not paragraph.startswith('<div'):
-            # 이미 HTML 태그가 아닌 경우만 <p> 태그로 감싸기
-            if '<li>' in paragraph:
-                # 리스트 항목이 있는 경우 <ul> 태그로 감싸기
-                paragraph = f'<ul>{paragraph}</ul>'
-            else:
-                paragraph = f'<p>{paragraph}</p>'
-        paragraphs[i] = paragraph.replace('\n', '<br>')
-    
-    return ''.join(paragraphs)
-
 # OpenAI를 사용하여 스트림릿 학습 팁 생성
-def generate_streamlit_learning_tip(openai_api_key, topic, level):
-    """OpenAI를 사용하여 주제별 스트림릿 학습 팁 생성 - 포맷 수정"""
+@traced("learning_tip", kind="section")
+def generate_streamlit_learning_tip(openai_api_key, topic, level, on_delta=None, force_refresh=False):
+    """OpenAI를 사용하여 주제별 스트림릿 학습 팁 생성 - 포맷 수정
+    on_delta가 있으면 응답을 스트리밍으로 받아 토큰 조각마다 호출합니다.
+    force_refresh가 참이면 완성 캐시를 무시하고 새로 생성합니다."""
     if not openai_api_key:
         return "OpenAI API 키가 설정되지 않았습니다."
     
@@ -689,23 +735,24 @@ def generate_streamlit_learning_tip(openai_api_key, topic, level):
         참고: 모든 텍스트는 간결하게 작성하고, 각 포인트 사이에 적절한 줄바꿈을 포함해주세요.
         """
         
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": "스트림릿 교육 콘텐츠 생성 전문가. 간결하고 실용적인 학습 팁을 제공합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
+        return create_chat_completion(
+            client,
+            "스트림릿 교육 콘텐츠 생성 전문가. 간결하고 실용적인 학습 팁을 제공합니다.",
+            prompt,
+            on_delta=on_delta,
+            force_refresh=force_refresh,
+            section='learning_tip'
         )
-        
-        return response.choices[0].message.content
     except Exception as e:
         logger.error(f"OpenAI API 오류: {str(e)}")
         return f"팁 생성 중 오류가 발생했습니다: {str(e)}"
 
 # OpenAI로 학습 프로젝트 아이디어 생성
-def generate_project_ideas(openai_api_key, topics, level):
-    """OpenAI를 사용하여 주제별 학습 프로젝트 아이디어 생성 - 단일 예시만 생성하도록 수정"""
+@traced("project_ideas", kind="section")
+def generate_project_ideas(openai_api_key, topics, level, on_delta=None, force_refresh=False):
+    """OpenAI를 사용하여 주제별 학습 프로젝트 아이디어 생성 - 단일 예시만 생성하도록 수정
+    on_delta가 있으면 응답을 스트리밍으로 받아 토큰 조각마다 호출합니다.
+    force_refresh가 참이면 완성 캐시를 무시하고 새로 생성합니다."""
     if not openai_api_key:
         return "OpenAI API 키가 설정되지 않았습니다."
     
@@ -741,23 +788,24 @@ def generate_project_ideas(openai_api_key, topics, level):
         난이도는 {level} 수준에 적합해야 하며, 모든 내용은 간결하게 작성해주세요.
         """
         
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": "스트림릿 교육 콘텐츠 생성 전문가. 실용적이고 간결한 프로젝트 아이디어를 제공합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
+        return create_chat_completion(
+            client,
+            "스트림릿 교육 콘텐츠 생성 전문가. 실용적이고 간결한 프로젝트 아이디어를 제공합니다.",
+            prompt,
+            on_delta=on_delta,
+            force_refresh=force_refresh,
+            section='project_ideas'
         )
-        
-        return response.choices[0].message.content
     except Exception as e:
         logger.error(f"OpenAI API 오류: {str(e)}")
         return f"프로젝트 아이디어 생성 중 오류가 발생했습니다: {str(e)}"
 
 # 스트림릿 관련 최신 소식 생성
-def generate_streamlit_news(openai_api_key, news_api_key):
-    """OpenAI와 News API를 사용해 스트림릿 관련 최신 소식 생성"""
+@traced("streamlit_news", kind="section")
+def generate_streamlit_news(openai_api_key, news_api_key, on_delta=None, force_refresh=False):
+    """OpenAI와 News API를 사용해 스트림릿 관련 최신 소식 생성
+    on_delta가 있으면 응답을 스트리밍으로 받아 토큰 조각마다 호출합니다.
+    force_refresh가 참이면 완성 캐시를 무시하고 새로 생성합니다."""
     if not openai_api_key or not news_api_key:
         return "API 키가 설정되지 않았습니다."
     
@@ -813,16 +861,14 @@ def generate_streamlit_news(openai_api_key, news_api_key):
         모든 소식은 반드시 제공된 실제 뉴스 기사에서만 추출해야 합니다. 가상의 정보나 사실이 아닌 내용은 절대 포함하지 마세요.
         """
         
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": "스트림릿 교육 콘텐츠 생성 전문가. 최신 소식을 교육적 관점에서 분석합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
+        return create_chat_completion(
+            client,
+            "스트림릿 교육 콘텐츠 생성 전문가. 최신 소식을 교육적 관점에서 분석합니다.",
+            prompt,
+            on_delta=on_delta,
+            force_refresh=force_refresh,
+            section='streamlit_news'
         )
-        
-        return response.choices[0].message.content
     except Exception as e:
         logger.error(f"최신 소식 생성 오류: {str(e)}")
         return f"최신 소식 생성 중 오류가 발생했습니다: {str(e)}"
@@ -832,8 +878,12 @@ def generate_streamlit_news(openai_api_key, news_api_key):
 # ------------------------------------------------------------
 
 # 학습 뉴스레터 생성 함수
-def generate_learning_newsletter(week_number, openai_api_key=None, news_api_key=None, selected_topics=None):
-    """스트림릿 학습 뉴스레터 콘텐츠 생성 함수"""
+def generate_learning_newsletter(week_number, openai_api_key=None, news_api_key=None, selected_topics=None,
+                                 on_section_update=None, force_refresh=False):
+    """스트림릿 학습 뉴스레터 콘텐츠 생성 함수
+    on_section_update가 있으면 OpenAI 응답을 스트리밍으로 받아 섹션 HTML이 바뀔 때마다
+    on_section_update(섹션, HTML)를 호출합니다.
+    같은 입력의 OpenAI 완성 결과는 캐시에서 재사용하며, force_refresh가 참이면 새로 생성합니다."""
     # 주차 정보 가져오기
     week_content = get_weekly_content(week_number)
     level = week_content["level"]
@@ -848,6 +898,11 @@ def generate_learning_newsletter(week_number, openai_api_key=None, news_api_key=
     # 뉴스레터 콘텐츠를 저장할 딕셔너리
     newsletter_content = {}
     
+    def section_stream(section):
+        if on_section_update is None:
+            return None
+        return make_streaming_callback(lambda html: on_section_update(section, html))
+    
     # 1. 학습 자료 검색
     materials = get_learning_materials_for_topics(topics)
     
@@ -857,17 +912,32 @@ def generate_learning_newsletter(week_number, openai_api_key=None, news_api_key=
             # 첫 번째 주제에 대한 팁 생성
             main_topic = topics[0]["name"]
             korean_topic = topics[0].get("korean_name", main_topic)
-            learning_tip = generate_streamlit_learning_tip(openai_api_key, korean_topic, level)
+            learning_tip = generate_streamlit_learning_tip(
+                openai_api_key, korean_topic, level,
+                on_delta=section_stream('learning_tip'), force_refresh=force_refresh
+            )
             newsletter_content['learning_tip'] = convert_markdown_to_html(learning_tip)
+            if on_section_update is not None:
+                on_section_update('learning_tip', newsletter_content['learning_tip'])
             
             # 프로젝트 아이디어 생성
-            project_ideas = generate_project_ideas(openai_api_key, topics, level)
+            project_ideas = generate_project_ideas(
+                openai_api_key, topics, level,
+                on_delta=section_stream('project_ideas'), force_refresh=force_refresh
+            )
             newsletter_content['project_ideas'] = convert_markdown_to_html(project_ideas)
+            if on_section_update is not None:
+                on_section_update('project_ideas', newsletter_content['project_ideas'])
             
             # 최신 소식 생성 (News API가 있는 경우)
             if news_api_key:
-                streamlit_news = generate_streamlit_news(openai_api_key, news_api_key)
+                streamlit_news = generate_streamlit_news(
+                    openai_api_key, news_api_key,
+                    on_delta=section_stream('streamlit_news'), force_refresh=force_refresh
+                )
                 newsletter_content['streamlit_news'] = convert_markdown_to_html(streamlit_news)
+                if on_section_update is not None:
+                    on_section_update('streamlit_news', newsletter_content['streamlit_news'])
         except Exception as e:
             st.error(f"OpenAI API 오류: {str(e)}")
             newsletter_content['learning_tip'] = "<p>학습 팁을 생성하지 못했습니다.</p>"
@@ -958,377 +1028,9 @@ def generate_learning_newsletter(week_number, openai_api_key=None, news_api_key=
 
 # 학습 뉴스레터 HTML 템플릿 생성 함수
 def generate_learning_newsletter_html(newsletter_content, week_number, date, title, level, topics):
-    """스트림릿 학습 뉴스레터 HTML 템플릿을 생성합니다 - 스타일 수정"""
-    # 주제 목록 생성
-    topic_list = ""
-    for topic in topics:
-        korean_name = topic.get("korean_name", topic["name"])
-        topic_list += f"<li>{korean_name} ({topic['name']})</li>"
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>스트림릿 학습 뉴스레터 - 제{week_number}주차</title>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Arial, sans-serif;
-                line-height: 1.5;
-                color: #333;
-                margin: 0;
-                padding: 0;
-                background-color: #f9f9f9;
-            }}
-            .container {{
-                max-width: 800px;
-                margin: 0 auto;
-                background-color: #ffffff;
-            }}
-            .content {{
-                padding: 20px;
-            }}
-            .header {{
-                background-color: #F63366;
-                color: white;
-                padding: 15px 20px;
-                text-align: left;
-            }}
-            .title {{
-                margin: 0;
-                font-size: 20px;
-                font-weight: bold;
-            }}
-            .issue-date {{
-                margin-top: 5px;
-                font-size: 10pt;
-            }}
-            .section {{
-                margin-bottom: 25px;
-                border-bottom: 1px solid #eee;
-                padding-bottom: 20px;
-            }}
-            .section:last-child {{
-                border-bottom: none;
-            }}
-            .section-title {{
-                color: #ffffff;
-                font-size: 16px;
-                font-weight: bold;
-                margin-bottom: 10px;
-                background-color: #F63366;
-                padding: 8px 10px;
-                border-radius: 4px;
-            }}
-            .section-icon {{
-                margin-right: 8px;
-            }}
-            h2, h3 {{
-                font-size: 16px;
-                margin-bottom: 10px;
-                color: #F63366;
-                border-bottom: 1px solid #eee;
-                padding-bottom: 5px;
-            }}
-            h4 {{
-                font-size: 14px;
-                margin-bottom: 5px;
-                color: #333;
-            }}
-            /* 모든 글자 크기 10pt로 통일 */
-            p, li, .card-description, .card-title, .project-content, .learning-tip-content {{
-                font-size: 10pt !important;
-                margin: 0 0 8px;
-            }}
-            ul {{
-                padding-left: 20px;
-                margin-top: 5px;
-                margin-bottom: 15px;
-            }}
-            li {{
-                margin-bottom: 5px;
-            }}
-            a {{
-                color: #F63366;
-                text-decoration: none;
-            }}
-            a:hover {{
-                text-decoration: underline;
-            }}
-            .footer {{
-                background-color: #f1f1f1;
-                padding: 10px;
-                text-align: center;
-                font-size: 10pt;
-                color: #666;
-            }}
-            .level-badge {{
-                display: inline-block;
-                background-color: #F63366;
-                color: white;
-                font-size: 10pt;
-                padding: 3px 8px;
-                border-radius: 10px;
-                margin-left: 8px;
-            }}
-            
-            /* 학습 팁 섹션 스타일 - 수정됨 */
-            .tip-title {{
-                background-color: #f2f2f2;
-                padding: 8px 10px;
-                margin-bottom: 10px;
-                border-radius: 4px;
-                font-weight: bold;
-                font-size: 10pt;
-            }}
-            .learning-point {{
-                margin-bottom: 15px; /* 포인트 사이 간격 */
-            }}
-            .learning-point-title {{
-                font-weight: bold;
-                margin-bottom: 5px;
-                font-size: 10pt;
-            }}
-            .example-label, .prompt-label {{
-                font-weight: bold;
-                margin-top: 5px;
-                color: #333;
-                font-size: 10pt;
-            }}
-            .example-content, .prompt-content {{
-                margin-left: 15px;
-                line-height: 1.3;
-                margin-bottom: 0; /* 내부 간격 제거 */
-                color: #333;
-                background-color: #f9f9f9;
-                padding: 8px;
-                border-radius: 4px;
-                font-family: monospace;
-                font-size: 10pt;
-            }}
-            .explanation {{
-                margin-top: 5px;
-                margin-bottom: 0; /* 내부 간격 제거 */
-                font-size: 10pt;
-            }}
-            
-            /* 학습 자료 카드 스타일 */
-            .materials-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-                gap: 20px;
-                margin-top: 15px;
-                margin-bottom: 20px;
-            }}
-            .material-card {{
-                border: 1px solid #eee;
-                border-radius: 8px;
-                padding: 15px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-                transition: transform 0.2s ease, box-shadow 0.2s ease;
-            }}
-            .material-card:hover {{
-                transform: translateY(-3px);
-                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-            }}
-            .video-card {{
-                border-left: 4px solid #ff0000;
-            }}
-            .doc-card {{
-                border-left: 4px solid #4285f4;
-            }}
-            .card-header {{
-                display: flex;
-                align-items: center;
-                margin-bottom: 10px;
-            }}
-            .card-icon {{
-                margin-right: 8px;
-                font-size: 10pt;
-            }}
-            .card-type {{
-                font-size: 9pt;
-                color: #666;
-                background-color: #f1f1f1;
-                padding: 2px 6px;
-                border-radius: 4px;
-            }}
-            .card-title {{
-                font-size: 10pt !important;
-                margin: 0 0 10px 0;
-                line-height: 1.3;
-            }}
-            .card-description {{
-                font-size: 10pt !important;
-                color: #555;
-                margin-bottom: 15px;
-                line-height: 1.4;
-                display: -webkit-box;
-                -webkit-line-clamp: 3;
-                -webkit-box-orient: vertical;
-                overflow: hidden;
-            }}
-            .card-footer {{
-                font-size: 9pt;
-                color: #666;
-                border-top: 1px solid #eee;
-                padding-top: 8px;
-            }}
-            .card-source {{
-                font-style: italic;
-            }}
-            
-            /* 프로젝트 아이디어 스타일 - 수정됨 */
-            .project-idea {{
-                background-color: #f9f9f9;
-                border-radius: 8px;
-                padding: 15px;
-                margin-bottom: 20px;
-                font-size: 10pt;
-            }}
-            .project-idea h3 {{
-                color: #F63366;
-                border-bottom: 1px solid #ddd;
-                padding-bottom: 8px;
-                font-size: 12pt;
-            }}
-            .project-goal {{
-                font-weight: bold;
-                margin-top: 10px;
-                font-size: 10pt;
-            }}
-            .project-steps {{
-                background-color: #fff;
-                padding: 10px;
-                border-radius: 4px;
-                border-left: 3px solid #F63366;
-                margin: 10px 0;
-                font-size: 10pt;
-            }}
-            .project-content p, .project-content li {{
-                font-size: 10pt !important;
-                margin-bottom: 5px;
-            }}
-            
-            /* 최신 소식 스타일 */
-            .news-item {{
-                border-bottom: 1px solid #eee;
-                padding-bottom: 15px;
-                margin-bottom: 15px;
-            }}
-            .news-item:last-child {{
-                border-bottom: none;
-            }}
-            .news-source {{
-                font-size: 9pt;
-                color: #666;
-                text-align: right;
-                font-style: italic;
-            }}
-            
-            /* 커리큘럼 개요 스타일 */
-            .curriculum-overview {{
-                background-color: #f5f5ff;
-                border-radius: 8px;
-                padding: 15px;
-                margin-bottom: 20px;
-            }}
-            .curriculum-overview ul {{
-                margin-bottom: 0;
-            }}
-            
-            /* 기본 더미 자료 스타일 */
-            .dummy-material {{
-                background-color: #f5f5f5;
-                padding: 12px;
-                border-radius: 6px;
-                margin-bottom: 15px;
-                border-left: 4px solid #F63366;
-            }}
-            .dummy-title {{
-                font-weight: bold;
-                margin-bottom: 5px;
-                font-size: 10pt;
-            }}
-            .dummy-description {{
-                color: #555;
-                margin-bottom: 8px;
-                font-size: 10pt;
-            }}
-            .dummy-source {{
-                font-size: 9pt;
-                color: #666;
-                text-align: right;
-                font-style: italic;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div class="title">스트림릿 학습 뉴스레터</div>
-                <div class="issue-info">제{week_number}주차 | {date}</div>
-            </div>
-            
-            <div class="content">
-                <div class="newsletter-intro">
-                    <h2>{title} <span class="level-badge">{level}</span></h2>
-                    <p>안녕하세요! 이번 주 스트림릿 학습 뉴스레터에서는 <strong>{title}</strong>에 대해 다루고 있습니다. 
-                    주요 학습 주제와 유용한 자료들을 모아 보내드립니다.</p>
-                    
-                    <div class="curriculum-overview">
-                        <h3>이번 주 학습 주제</h3>
-                        <ul>
-                            {topic_list}
-                        </ul>
-                    </div>
-                </div>
-                
-                <!-- 추천 학습 자료 섹션 -->
-                <div class="section">
-                    <div class="section-title"><span class="section-icon">📚</span>추천 학습 자료</div>
-                    <div class="section-container">
-                        {newsletter_content.get('study_materials', '<p>학습 자료를 찾을 수 없습니다.</p>')}
-                    </div>
-                </div>
-                
-                <!-- 이번 주 학습 팁 섹션 -->
-                <div class="section">
-                    <div class="section-title"><span class="section-icon">💡</span>이번 주 학습 팁</div>
-                    <div class="section-container learning-tip-content">
-                        {newsletter_content.get('learning_tip', '<p>학습 팁을 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                
-                <!-- 실습 프로젝트 아이디어 섹션 -->
-                <div class="section">
-                    <div class="section-title"><span class="section-icon">🔨</span>실습 프로젝트 아이디어</div>
-                    <div class="section-container project-content">
-                        {newsletter_content.get('project_ideas', '<p>프로젝트 아이디어를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                
-                <!-- 최신 스트림릿 소식 섹션 -->
-                {f'''
-                <div class="section">
-                    <div class="section-title"><span class="section-icon">📰</span>최신 스트림릿 소식</div>
-                    <div class="section-container">
-                        {newsletter_content.get('streamlit_news', '<p>최신 소식을 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                ''' if 'streamlit_news' in newsletter_content else ""}
-            </div>
-            
-            <div class="footer">
-                <p>© {datetime.now().year} 스트림릿 학습 뉴스레터 | 이 뉴스레터는 자동 생성되었습니다.</p>
-                <p>구독을 원하지 않으시면 답장으로 알려주세요. | 문의사항: example@example.com</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
+    """스트림릿 학습 뉴스레터 HTML 템플릿을 생성합니다.
+    미리 컴파일한 템플릿(templates/learning_newsletter.html)의 자리만 채웁니다."""
+    return render_learning_newsletter(newsletter_content, week_number, date, title, level, topics)
 
 # 더미 학습 자료 반환 함수 추가
 def get_dummy_materials():
@@ -1358,12 +1060,22 @@ def get_dummy_materials():
     ]
 
 
-# 다운로드 링크 생성 함수
-def create_download_link(html_content, filename):
-    """HTML 콘텐츠를 다운로드할 수 있는 링크를 생성합니다."""
-    b64 = base64.b64encode(html_content.encode()).decode()
-    href = f'<a href="data:text/html;base64,{b64}" download="{filename}" style="display: inline-block; margin-top: 20px; padding: 10px 20px; background-color: #F63366; color: white; text-decoration: none; border-radius: 5px; font-weight: bold;">뉴스레터 다운로드</a>'
-    return href
+# 다운로드 버튼 표시 함수
+def download_html_button(html_data, filename, label="뉴스레터 다운로드", key=None):
+    """HTML을 내려받는 버튼을 표시합니다.
+    문서는 미디어 파일로 등록되어 버튼을 누를 때 HTTP로 받으므로, data: URI 링크처럼
+    다시 실행할 때마다 base64로 부풀린 문서 전체를 웹소켓으로 보내지 않습니다."""
+    if isinstance(html_data, str):
+        html_data = html_data.encode("utf-8")
+    st.download_button(label, html_data, file_name=filename, mime="text/html", key=key, type="primary")
+
+# 지난 실행 추적 표시 함수
+def show_trace_sidebar(trace):
+    """지난 실행의 단계별 소요 시간을 사이드바에 폭포 차트로 표시합니다."""
+    with st.sidebar.expander("지난 실행 추적", expanded=True):
+        st.caption(f"{trace.name} - 전체 {trace.wall_time:.2f}s, 구간 {len(trace.spans)}개")
+        st.markdown(format_waterfall_html(trace, min_duration=0.01), unsafe_allow_html=True)
+        st.text(trace.format_kind_totals())
 
 # ------------------------------------------------------------
 # 메인 앱 인터페이스
@@ -1414,25 +1126,51 @@ def main():
             for topic in topic_names:
                 st.write(f"- {topic}")
         
+        force_refresh = st.checkbox(
+            "AI 콘텐츠 다시 생성",
+            help="입력이 같으면 이전에 생성한 OpenAI 결과를 재사용합니다. 선택하면 캐시를 무시하고 새로 생성합니다."
+        )
+        
         # 뉴스레터 생성 버튼
         if st.button("뉴스레터 생성", type="primary"):
             # API 키 확인
             if not st.session_state.get('naver_api_configured', False) and not st.session_state.get('youtube_api_configured', False):
                 st.error("네이버 API 또는 유튜브 API 중 최소한 하나는 설정해야 합니다.")
             else:
+                # 섹션별 미리보기 자리 표시자 - 생성 중인 내용을 토큰 단위로 표시
+                preview = st.container(border=True)
+                placeholders = {}
+                for section, section_title in (
+                    ('learning_tip', "이번 주 학습 팁"),
+                    ('project_ideas', "실습 프로젝트 아이디어"),
+                    ('streamlit_news', "최신 스트림릿 소식"),
+                ):
+                    preview.markdown(f"#### {section_title}")
+                    placeholders[section] = preview.empty()
+                    placeholders[section].caption("생성 대기 중...")
+                
+                def on_section_update(section, html):
+                    placeholders[section].markdown(html, unsafe_allow_html=True)
+                
                 with st.spinner("AI 기반 학습 뉴스레터 생성 중... (약 30-60초 소요)"):
                     try:
-                        # 뉴스레터 생성
-                        html_content = generate_learning_newsletter(
-                            week_number,
-                            st.session_state.get('openai_api_key', None),
-                            st.session_state.get('news_api_key', None)
-                        )
+                        # 뉴스레터 생성 - 모든 외부 호출(재시도 포함)이 하나의 마감 시간을 공유
+                        # 수집, LLM 호출, 변환 단계는 추적해 사이드바에 폭포 차트로 표시
+                        with deadline_scope(DEFAULT_RUN_DEADLINE), \
+                                start_trace("스트림릿 학습 뉴스레터 생성", week=week_number) as trace:
+                            st.session_state.last_trace = trace
+                            html_content = generate_learning_newsletter(
+                                week_number,
+                                st.session_state.get('openai_api_key', None),
+                                st.session_state.get('news_api_key', None),
+                                on_section_update=on_section_update,
+                                force_refresh=force_refresh
+                            )
                         
-                        # 다운로드 링크 생성
+                        # 다운로드 버튼은 버튼을 눌러 다시 실행되어도 남도록 세션에 바이트로 보관
                         filename = f"스트림릿_학습_뉴스레터_제{week_number}주차.html"
+                        st.session_state.learning_newsletter = (html_content.encode("utf-8"), filename)
                         st.success("✅ 뉴스레터가 성공적으로 생성되었습니다!")
-                        st.markdown(create_download_link(html_content, filename), unsafe_allow_html=True)
                         
                         # 미리보기
                         with st.expander("뉴스레터 미리보기", expanded=True):
@@ -1440,6 +1178,11 @@ def main():
                         
                     except Exception as e:
                         st.error(f"뉴스레터 생성 중 오류가 발생했습니다: {str(e)}")
+        
+        # 생성한 뉴스레터 다운로드
+        if st.session_state.get('learning_newsletter'):
+            html_data, filename = st.session_state.learning_newsletter
+            download_html_button(html_data, filename)
     
     with tab2:
         st.header("API 설정")
@@ -1491,7 +1234,21 @@ def main():
                     st.success("News API 설정이 저장되었습니다!")
                 else:
                     st.error("API 키를 입력하세요.")
-    
+
+        # 응답 캐시 상태 (모든 세션이 공유)
+        with st.expander("응답 캐시"):
+            cache_stats = get_response_cache().stats()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("저장 항목", cache_stats["entries"])
+            col2.metric("적중률", f"{cache_stats['hit_rate']:.0%}")
+            col3.metric("크기", f"{cache_stats['bytes'] / 1024:.1f} KB")
+            if cache_stats["by_source"]:
+                st.table(pd.DataFrame(cache_stats["by_source"]).T)
+
+            if st.button("캐시 비우기"):
+                get_response_cache().clear()
+                st.success("응답 캐시를 비웠습니다.")
+
     with tab3:
         st.header("정보")
         st.markdown("""
@@ -1513,6 +1270,9 @@ def main():
         
         각 API는 선택적으로 사용할 수 있으며, 최소 하나 이상의 API를 설정해야 합니다.
         """)
+    
+    if st.session_state.get('last_trace') is not None:
+        show_trace_sidebar(st.session_state.last_trace)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,184 +1,29 @@
 import streamlit as st
 from openai import OpenAI
-from datetime import datetime, timedelta
-import base64
+from datetime import datetime
 import os
-import re
-import requests
-
-def convert_markdown_to_html(text):
-    """마크다운 텍스트를 HTML로 변환합니다."""
-    # AT/DT 팁 섹션 특별 처리
-    if "이번 주 팁:" in text or "핵심 프롬프트 예시" in text:
-        # "이번 주 팁:" 제목을 특별 클래스로 처리
-        text = re.sub(r'^## 이번 주 팁: (.*?)$', r'<div class="tip-title">이번 주 팁: \1</div>', text, flags=re.MULTILINE)
-        
-        # "핵심 프롬프트 예시:" 부분을 특별 클래스로 처리
-        text = re.sub(r'\*\*핵심 프롬프트 예시:\*\*', r'<div class="prompt-examples-title">핵심 프롬프트 예시:</div>', text)
-        
-        # 프롬프트 템플릿 처리 (Chain of Thought/Chain of Draft 등)
-        # 각 템플릿은 제목(색상 강조), 예시, 내용으로 구성됨
-        
-        # 첫 번째 템플릿 (Chain of Thought)
-        text = re.sub(
-            r'- (첫 번째 프롬프트 템플릿 \(Chain of Thought 활용\):)(.*?)(?=- 두 번째 프롬프트|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 두 번째 템플릿 (Chain of Draft)
-        text = re.sub(
-            r'- (두 번째 프롬프트 템플릿 \(Chain of Draft 활용\):)(.*?)(?=- 세 번째 프롬프트|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 세 번째 템플릿 (Chain of Thought와 Chain of Draft 결합)
-        text = re.sub(
-            r'- (세 번째 프롬프트 템플릿 \(Chain of Thought와 Chain of Draft 결합\):)(.*?)(?=이 팁을|$)',
-            r'<div class="prompt-template">'
-            r'<div class="template-title">\1</div>'
-            r'<div class="template-content">\2</div>'
-            r'</div>',
-            text, 
-            flags=re.DOTALL
-        )
-        
-        # 각 템플릿 내에서 예시와 프롬프트 순서 바꾸기
-        # 예시: 로 시작하는 부분을 <div class="example-label">예시:</div><div class="example-content">내용</div> 로 변환
-        text = re.sub(
-            r'<div class="template-content">(.*?)예시:(.*?)프롬프트:(.*?)</div>',
-            r'<div class="template-content"><div class="example-label">예시:</div><div class="example-content">\2</div><div class="prompt-label">프롬프트:</div><div class="prompt-content">\3</div></div>',
-            text,
-            flags=re.DOTALL
-        )
-        
-        # 마지막 문장 스타일 적용 (약간의 여백과 이탤릭체)
-        if "다음 주에는" in text:
-            text = re.sub(r'(다음 주에는.*?\.)', r'<div class="tip-footer">\1</div>', text)
-    
-    # 제목 변환 (# 제목)
-    text = re.sub(r'^# (.*)$', r'<h1>\1</h1>', text, flags=re.MULTILINE)
-    text = re.sub(r'^## (.*)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
-    text = re.sub(r'^### (.*)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
-    
-    # 굵은 텍스트 (**텍스트**)
-    text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
-    
-    # 기울임 텍스트 (*텍스트*)
-    text = re.sub(r'\*(.*?)\*', r'<em>\1</em>', text)
-    
-    # 링크 변환 ([텍스트](URL))
-    text = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', text)
-    
-    # 일반적인 글머리 기호 (- 항목) 처리 (이미 처리된 AT/DT 팁 예시는 제외)
-    if "prompt-template" not in text:
-        text = re.sub(r'^\- (.*?)$', r'<li>\1</li>', text, flags=re.MULTILINE)
-    
-    # 색상 표시 강조 - 주요 소식에서 사용할 수 있는 색상 강조 기능
-    text = re.sub(r'\[강조\](.*?)\[\/강조\]', r'<span style="color:#e74c3c; font-weight:bold;">\1</span>', text)
-    
-    # 줄바꿈을 <br>과 <p>로 변환
-    paragraphs = text.split('\n\n')
-    for i, paragraph in enumerate(paragraphs):
-        if not paragraph.startswith('<h') and not paragraph.startswith('<li') and not paragraph.startswith('<div'):
-            # 이미 HTML 태그가 아닌 경우만 <p> 태그로 감싸기
-            if '<li>' in paragraph:
-                # 리스트 항목이 있는 경우 <ul> 태그로 감싸기
-                paragraph = f'<ul>{paragraph}</ul>'
-            else:
-                paragraph = f'<p>{paragraph}</p>'
-        paragraphs[i] = paragraph.replace('\n', '<br>')
-    
-    return ''.join(paragraphs)
+import asyncio
+from http_client import async_get, run_sync
+from llm_client import create_chat_completion
+from markdown_renderer import convert_markdown_to_html
+from html_template import render_aidt_newsletter
+from news_feed import fetch_naver_news_incremental, fetch_news_api_incremental
 
 # NewsAPI를 사용하여 실시간 뉴스를 가져오는 함수
 def fetch_real_time_news(api_key, query="AI digital transformation", days=7, language="en"):
-    """
-    NewsAPI를 사용하여 실시간 뉴스를 가져옵니다.
-    무료 플랜은 최근 1개월(실제로는 더 짧을 수 있음) 데이터만 접근 가능합니다.
-    """
-    # 날짜 범위 계산 (API 제한으로 인해 기간을 줄임)
-    end_date = datetime.now()
-    # 무료 플랜 제한을 고려하여 기간을 줄임
-    start_date = end_date - timedelta(days=min(days, 7))  # 최대 7일로 제한
-    
-    # NewsAPI 요청
-    url = "https://newsapi.org/v2/everything"
-    params = {
-        'q': query,
-        'from': start_date.strftime('%Y-%m-%d'),
-        'to': end_date.strftime('%Y-%m-%d'),
-        'sortBy': 'publishedAt',
-        'language': language,
-        'apiKey': api_key
-    }
-    
-    response = requests.get(url, params=params)
-    
-    if response.status_code == 200:
-        news_data = response.json()
-        return news_data['articles']
-    else:
-        raise Exception(f"뉴스 가져오기 실패: {response.status_code} - {response.text}")
+    """NewsAPI에서 지난번 이후의 새 기사만 가져와 기사 저장소에 합친 뒤 최근 기사를 반환합니다. (news_feed 참고)"""
+    return fetch_news_api_incremental(api_key, query, days, language)
 
 # 네이버 API를 사용하여 뉴스를 가져오는 함수
 def fetch_naver_news(client_id, client_secret, query, display=5, days=7):
-    """
-    네이버 검색 API를 사용하여 뉴스를 가져옵니다.
-    최근 지정된 일수(기본 7일) 이내의 뉴스만 필터링합니다.
-    """
-    url = "https://openapi.naver.com/v1/search/news.json"
-    headers = {
-        "X-Naver-Client-Id": client_id,
-        "X-Naver-Client-Secret": client_secret
-    }
-    params = {
-        "query": query,
-        "display": 100,  # 더 많은 데이터를 가져와서 필터링 (최대 100개)
-        "sort": "date"  # 최신순으로 정렬
-    }
-    
-    response = requests.get(url, headers=headers, params=params)
-    
-    if response.status_code == 200:
-        result = response.json()
-        
-        # 최근 days일 내의 뉴스만 필터링
-        filtered_items = []
-        current_date = datetime.now()
-        cutoff_date = current_date - timedelta(days=days)
-        
-        for item in result['items']:
-            # 네이버 뉴스 API는 pubDate를 제공하지만 형식이 RFC 822 형식
-            try:
-                pub_date_str = item.get('pubDate')
-                if pub_date_str:
-                    pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %z')
-                    pub_date = pub_date.replace(tzinfo=None)
-                    
-                    if pub_date >= cutoff_date:
-                        filtered_items.append(item)
-            except Exception:
-                # 날짜 파싱에 실패하면 일단 포함시킴
-                filtered_items.append(item)
-        
-        # display 개수만큼만 반환
-        return filtered_items[:display]
-    else:
-        raise Exception(f"네이버 뉴스 가져오기 실패: {response.status_code} - {response.text}")
+    """네이버 뉴스에서 지난번 이후의 새 뉴스만 가져와 기사 저장소에 합친 뒤
+    최근 days일 이내의 뉴스를 display개까지 반환합니다. (news_feed 참고)"""
+    return fetch_naver_news_incremental(client_id, client_secret, query, display, days)
 
-def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사례", display=3, days=30):
+async def fetch_ai_use_cases_async(naver_client_id, naver_client_secret, query="AI 활용사례", display=3, days=30):
     """
     네이버 검색 API를 사용하여 AI 활용사례를 가져옵니다.
+    여러 검색어를 동시에 요청합니다.
     """
     url = "https://openapi.naver.com/v1/search/blog.json"  # 블로그 검색으로 변경
     headers = {
@@ -193,9 +38,7 @@ def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사
         f"{query} 프롬프트"
     ]
     
-    all_items = []
-    
-    for search_query in search_queries:
+    async def search(search_query):
         params = {
             "query": search_query,
             "display": display,
@@ -203,15 +46,20 @@ def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = await async_get(url, headers=headers, params=params)
             
             if response.status_code == 200:
                 result = response.json()
-                all_items.extend(result['items'])
+                return result['items']
             else:
                 print(f"API 오류: {response.status_code} - {response.text}")
         except Exception as e:
             print(f"검색 중 오류 발생: {str(e)}")
+        return []
+    
+    all_items = []
+    for items in await asyncio.gather(*(search(search_query) for search_query in search_queries)):
+        all_items.extend(items)
     
     # 중복 제거 (title 기준)
     unique_items = []
@@ -226,6 +74,10 @@ def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사
     # 최대 display 개수만큼만 반환
     return unique_items[:display]
 
+def fetch_ai_use_cases(naver_client_id, naver_client_secret, query="AI 활용사례", display=3, days=30):
+    """fetch_ai_use_cases_async의 동기 버전입니다."""
+    return run_sync(fetch_ai_use_cases_async(naver_client_id, naver_client_secret, query, display, days))
+
 def generate_ai_use_case_content(openai_api_key, use_case_data):
     """
     OpenAI를 사용하여 AI 활용사례 콘텐츠를 생성합니다.
@@ -293,17 +145,14 @@ def generate_ai_use_case_content(openai_api_key, use_case_data):
         내용은 마크다운 형식으로 작성해주세요.
         """
         
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": "AI 디지털 트랜스포메이션 활용사례 콘텐츠 생성 전문가. 정확하고 구체적인 정보만 포함합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
+        content = create_chat_completion(
+            client,
+            "AI 디지털 트랜스포메이션 활용사례 콘텐츠 생성 전문가. 정확하고 구체적인 정보만 포함합니다.",
+            prompt,
+            use_cache=False,
+            section='ai_use_case'
         )
         
-        content = response.choices[0].message.content
-        
         # 링크가 없는 경우 첫 번째 항목의 링크 사용
         if not selected_link and use_case_data:
             selected_link = use_case_data[0]['link']
@@ -517,15 +366,14 @@ def generate_combined_newsletter(openai_api_key, news_api_key, naver_client_id,
                         newsletter_content[section] = f"<p>News API 키가 제공되지 않아 글로벌 뉴스를 가져올 수 없습니다.</p>"
                         continue
                         
-                    response = client.chat.completions.create(
-                        model="gpt-4-turbo-preview",
-                        messages=[
-                            {"role": "system", "content": "AI 디지털 트랜스포메이션 뉴스레터 콘텐츠 생성 전문가. 간결하고 핵심적인 내용만 포함한 뉴스레터를 작성합니다."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.7
+                    content = create_chat_completion(
+                        client,
+                        "AI 디지털 트랜스포메이션 뉴스레터 콘텐츠 생성 전문가. 간결하고 핵심적인 내용만 포함한 뉴스레터를 작성합니다.",
+                        prompt,
+                        use_cache=False,
+                        section=section
                     )
-                    newsletter_content[section] = convert_markdown_to_html(response.choices[0].message.content)
+                    newsletter_content[section] = convert_markdown_to_html(content)
                 except Exception as e:
                     newsletter_content[section] = f"<p>콘텐츠 생성 오류: {e}</p>"
         except Exception as e:
@@ -720,309 +568,24 @@ def get_default_ai_use_case():
 # 통합된 뉴스레터를 위한 HTML 템플릿 생성 함수
 # 통합된 뉴스레터를 위한 HTML 템플릿 생성 함수 (수정됨)
 def generate_combined_html_template(newsletter_content, issue_number, date, highlight_settings, selected_week=None):
-    """세 가지 API를 모두 사용한 뉴스레터 HTML 템플릿을 생성합니다. 선택적으로 Streamlit 학습 과정을 포함합니다."""
+    """세 가지 API를 모두 사용한 뉴스레터 HTML 템플릿을 생성합니다. 선택적으로 Streamlit 학습 과정을 포함합니다.
+    미리 컴파일한 템플릿(templates/aidt_newsletter.html)의 자리만 채웁니다."""
     
     # Streamlit 학습 과정 섹션 생성 (선택된 주차가 있는 경우)
     streamlit_challenge_section = ""
     if selected_week:
         streamlit_challenge_section = get_streamlit_challenge_section(selected_week)
     
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>AIDT Weekly - 제{issue_number}호</title>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Arial, sans-serif;
-                line-height: 1.5;
-                color: #333;
-                margin: 0;
-                padding: 0;
-                background-color: #f9f9f9;
-            }}
-            .container {{
-                max-width: 600px;
-                margin: 0 auto;
-                background-color: #ffffff;
-            }}
-            .content {{
-                padding: 20px;
-            }}
-            .header {{
-                background-color: #333333;
-                color: white;
-                padding: 15px 20px;
-                text-align: left;
-            }}
-            .title {{
-                margin: 0;
-                font-size: 20px;
-                font-weight: bold;
-            }}
-            .issue-date {{
-                margin-top: 5px;
-                font-size: 10pt;
-            }}
-            .section {{
-                margin-bottom: 25px;
-                border-bottom: 1px solid #eee;
-                padding-bottom: 20px;
-            }}
-            .section:last-child {{
-                border-bottom: none;
-            }}
-            .section-title {{
-                color: #ffffff;
-                font-size: 16px;
-                font-weight: bold;
-                margin-bottom: 10px;
-                background-color: #3e3e3e;
-                padding: 8px 10px;
-                border-radius: 4px;
-            }}
-            .section-icon {{
-                margin-right: 8px;
-            }}
-            h2, h3 {{
-                font-size: 14px;
-                margin-bottom: 5px;
-                color: #333333;
-            }}
-            .main-news h2 {{
-                color: #ff5722;
-                font-size: 14px;
-                margin-top: 15px;
-                margin-bottom: 5px;
-                border-bottom: none;
-                padding-bottom: 0;
-            }}
-            .main-news a {{
-                color: #ff5722;
-                text-decoration: none;
-            }}
-            .main-news a:hover {{
-                text-decoration: underline;
-            }}
-            .main-news p, .success-case p, p, li {{
-                font-size: 10pt;
-                margin: 0 0 8px;
-            }}
-            ul {{
-                padding-left: 20px;
-                margin-top: 5px;
-                margin-bottom: 8px;
-            }}
-            li {{
-                margin-bottom: 3px;
-            }}
-            .footer {{
-                background-color: #f1f1f1;
-                padding: 10px;
-                text-align: center;
-                font-size: 9pt;
-                color: #666;
-            }}
-            .section-container {{
-                padding: 0 15px;
-            }}
-            .highlight-box {{
-                background-color: #fff9f5;
-                border: 1px solid #ffe0cc;
-                border-radius: 5px;
-                padding: 15px;
-                margin: 10px 0;
-            }}
-            .highlight-title {{
-                color: #ff5722;
-                font-size: 16px;
-                font-weight: bold;
-                margin-bottom: 10px;
-                text-align: center;
-            }}
-            .highlight-subtitle {{
-                color: #666;
-                font-size: 12px;
-                text-align: center;
-                margin-bottom: 15px;
-            }}
-            
-            /* AT/DT 팁 섹션 스타일 */
-            .aidt-tips {{
-                font-size: 10pt;
-            }}
-
-            .tip-title {{
-                background-color: #f2f2f2;
-                padding: 8px 10px;
-                margin-bottom: 10px;
-                border-radius: 4px;
-                font-weight: bold;
-            }}
-
-            .prompt-examples-title {{
-                background-color: #f2f2f2;
-                padding: 8px 10px;
-                margin: 15px 0 10px 0;
-                border-radius: 4px;
-                font-weight: bold;
-            }}
-
-            /* 프롬프트 템플릿 스타일 */
-            .prompt-template {{
-                margin-bottom: 20px; /* 템플릿 간 간격 */
-            }}
-
-            .template-title {{
-                color: #ff5722; /* 제목 색상 - 오렌지 계열 */
-                font-weight: bold;
-                margin-bottom: 0; /* 제목과 내용 사이 간격 없음 */
-                padding: 0;
-            }}
-
-            .template-content {{
-                margin-left: 15px;
-                margin-bottom: 10px; /* 내용 아래 여백 추가 */
-            }}
-
-            /* 예시와 프롬프트 스타일 */
-            .example-label, .prompt-label {{
-                font-weight: bold;
-                margin-top: 5px;
-                color: #333; /* 이미지와 일치하는 색상 */
-            }}
-
-            .example-content, .prompt-content {{
-                margin-left: 15px;
-                line-height: 1.3; /* 내용 줄간격 약간 줄임 */
-                margin-bottom: 8px; /* 내용 하단 여백 증가 */
-                color: #333; /* 이미지와 일치하는 색상 */
-            }}
-
-            .tip-footer {{
-                margin-top: 15px;
-                font-style: italic;
-                color: #666; /* 이미지와 일치하는 색상 */
-            }}
-            
-            /* 네이버 API 섹션 스타일 - 검은색으로 변경 */
-            .naver-section {{
-                background-color: #f8f8ff; /* 연한 파란색 배경 */
-                border-radius: 4px;
-                padding: 10px;
-                margin-bottom: 15px;
-            }}
-            
-            .naver-section h2, .naver-section h3 {{
-                color: #333333; /* 검은색으로 변경 */
-            }}
-            
-            /* AI 활용사례 섹션 스타일 */
-            .section ol {{
-                margin-left: 20px;
-                padding-left: 0;
-            }}
-            .section ol li {{
-                margin-bottom: 5px;
-            }}
-            
-            /* Streamlit 학습 섹션 스타일 */
-            .streamlit-challenge {{
-                background-color: #f0f8ff; /* 연한 하늘색 배경 */
-                border-radius: 4px;
-                padding: 15px;
-                margin-bottom: 15px;
-            }}
-            
-            .streamlit-challenge h3 {{
-                color: #0066cc;
-                font-size: 16px;
-                margin-top: 0;
-                margin-bottom: 10px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div class="title">중부Infra AT/DT Weekly</div>
-                <div class="issue-info">제{issue_number}호 | {date}</div>
-            </div>
-            
-            <div class="content">
-                <div class="newsletter-intro">
-                    <p>중부Infra AT/DT 뉴스레터는 모두가 AI발전 속도에 뒤쳐지지 않고 업무에 적용할 수 있도록 가장 흥미로운 AI 활용법을 전합니다.</p>
-                </div>
-                
-                <div class="highlight-box">
-                    <div class="highlight-title">{highlight_settings['title']}</div>
-                    <div class="highlight-subtitle">{highlight_settings['subtitle']}</div>
-                    <p style="text-align: right; margin-top: 5px; font-size: 9pt;"><a href="{highlight_settings['link_url']}" style="color: #ff5722;">{highlight_settings['link_text']}</a></p>
-                </div>
-                
-                <!-- 글로벌 AI 뉴스 (OpenAI + NewsAPI) 섹션 -->
-                {f'''
-                <div class="section">
-                    <div class="section-title">글로벌 AI 뉴스</div>
-                    <div class="section-container main-news">
-                        {newsletter_content.get('main_news', '<p>글로벌 AI 뉴스를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                ''' if 'main_news' in newsletter_content else ""}
-                
-                <!-- 네이버 API 섹션 (색상 변경) -->
-                {f'''
-                <div class="section">
-                    <div class="section-title">국내 AI 뉴스</div>
-                    <div class="section-container main-news naver-section">
-                        {newsletter_content.get('naver_news', '<p>국내 AI 뉴스를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                ''' if 'naver_news' in newsletter_content else ""}
-                
-                <div class="section">
-                    <div class="section-title">이번 주 AT/DT 팁</div>
-                    <div class="section-container aidt-tips">
-                        {newsletter_content.get('aidt_tips', '<p>AT/DT 팁을 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                
-                <!-- AI 활용사례 섹션 (새로 추가) -->
-                <div class="section">
-                    <div class="section-title">AI 활용사례</div>
-                    <div class="section-container">
-                        {newsletter_content.get('ai_use_case', '<p>AI 활용사례를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                
-                <div class="section success-case">
-                    <div class="section-title">성공 사례</div>
-                    <div class="section-container">
-                        {newsletter_content.get('success_story', '<p>성공 사례를 불러올 수 없습니다.</p>')}
-                    </div>
-                </div>
-                
-                <!-- Streamlit 학습 과정 섹션 (새로 추가) -->
-                {streamlit_challenge_section}
-            </div>
-            
-            <div class="footer">
-                <p>© {datetime.now().year} 중부Infra All rights reserved. | 뉴스레터 구독에 감사드립니다.</p>
-                <p>문의사항이나 제안이 있으시면 언제든지 연락해 주세요^^.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
+    return render_aidt_newsletter(newsletter_content, issue_number, date, highlight_settings,
+                                  extra_sections=streamlit_challenge_section)
 
-def create_download_link(html_content, filename):
-    """HTML 콘텐츠를 다운로드할 수 있는 링크를 생성합니다."""
-    b64 = base64.b64encode(html_content.encode()).decode()
-    href = f'<a href="data:text/html;base64,{b64}" download="{filename}" style="display: inline-block; margin-top: 20px; padding: 10px 20px; background-color: #ff5722; color: white; text-decoration: none; border-radius: 5px; font-weight: bold;">뉴스레터 다운로드</a>'
-    return href
+def download_html_button(html_data, filename, label="뉴스레터 다운로드", key=None):
+    """HTML을 내려받는 버튼을 표시합니다.
+    문서는 미디어 파일로 등록되어 버튼을 누를 때 HTTP로 받으므로, data: URI 링크처럼
+    다시 실행할 때마다 base64로 부풀린 문서 전체를 웹소켓으로 보내지 않습니다."""
+    if isinstance(html_data, str):
+        html_data = html_data.encode("utf-8")
+    st.download_button(label, html_data, file_name=filename, mime="text/html", key=key, type="primary")
 
 
 # ✅ Streamlit 학습 과정 데이터
@@ -1192,15 +755,22 @@ def main():
                     
                     filename = f"중부 ATDT Weekly-제{issue_number}호.html"
                     
+                    # 다운로드 버튼은 버튼을 눌러 다시 실행되어도 남도록 세션에 바이트로 보관
+                    st.session_state.newsletter_download = (html_content.encode("utf-8"), filename)
+                    
                     streamlit_info = f" ({selected_week} 학습과정 포함)" if include_streamlit else ""
                     st.success(f"✅ 뉴스레터가 성공적으로 생성되었습니다!{streamlit_info}")
-                    st.markdown(create_download_link(html_content, filename), unsafe_allow_html=True)
                     
                 except Exception as e:
                     st.error(f"콘텐츠 생성 중 오류가 발생했습니다: {e}")
                 
             except Exception as e:
                 st.error(f"오류가 발생했습니다: {e}")
+    
+    # 생성한 뉴스레터 다운로드
+    if st.session_state.get('newsletter_download'):
+        html_data, filename = st.session_state.newsletter_download
+        download_html_button(html_data, filename)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,293 @@
+# 실행 추적
+# 뉴스레터를 한 번 생성하는 동안 수집(HTTP 요청), LLM 호출, 섹션, 마크다운 변환, 템플릿 렌더링 등
+# 단계마다 구간(span)의 시작/종료 시각을 단조 시계(time.perf_counter)로 기록해 시간이 어디에 쓰였는지 보여 줍니다.
+#   with start_trace("AIDT 뉴스레터") as trace:     # 실행 하나 (루트 구간)
+#       with span("GET openapi.naver.com", kind="fetch", url=url):
+#           ...
+# 현재 구간은 컨텍스트 변수로 전달되므로 섹션 그래프의 워커 스레드(section_engine)와
+# HTTP 이벤트 루프(http_client.submit)에서 만든 구간도 부모 구간 아래에 기록됩니다.
+# 추적 중이 아니면 span()은 아무것도 기록하지 않는 공용 객체를 돌려주므로 비용이 거의 없습니다.
+# NEWSLETTER_TRACE_FILE을 지정하면 실행이 끝날 때마다 OpenTelemetry OTLP/JSON 형식(resourceSpans)
+# 한 줄을 파일에 덧붙입니다. (OpenTelemetry Collector의 file 수신기 등으로 읽을 수 있음)
+import contextvars
+import functools
+import html
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# 실행이 끝날 때 추적을 덧붙일 파일 (OTLP/JSON Lines, 비우면 저장하지 않음)
+TRACE_FILE = os.environ.get("NEWSLETTER_TRACE_FILE")
+
+# 구간 종류별 폭포 차트 색
+KIND_COLORS = {
+    "run": "#9e9e9e",
+    "section": "#5c6bc0",
+    "fetch": "#26a69a",
+    "llm": "#ff7043",
+    "render": "#ab47bc",
+    "internal": "#78909c",
+}
+
+SERVICE_NAME = "newsletter"
+
+_current_span = contextvars.ContextVar("newsletter_span", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """추적 구간 하나 - 시작/종료 시각은 실행 시작부터의 초"""
+
+    __slots__ = ("trace", "name", "kind", "span_id", "parent_id", "start", "end", "attributes", "error", "thread")
+
+    def __init__(self, trace, name, kind, parent_id, attributes):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start = time.perf_counter() - trace.origin
+        self.end = None
+        self.attributes = attributes
+        self.error = None
+        self.thread = threading.current_thread().name
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter() - self.trace.origin) - self.start
+
+    def set(self, **attributes):
+        """구간에 속성을 추가합니다. (응답 상태 코드, 사용한 모델 등)"""
+        self.attributes.update(attributes)
+
+
+class _ActiveSpan:
+    """span()이 추적 중일 때 돌려주는 컨텍스트 관리자"""
+
+    __slots__ = ("span", "token")
+
+    def __init__(self, span):
+        self.span = span
+        self.token = None
+
+    def __enter__(self):
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.end = time.perf_counter() - span.trace.origin
+        if exc is not None:
+            span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self.token)
+        span.trace.add(span)
+        return False
+
+
+class _NoopSpan:
+    """추적 중이 아닐 때 span()이 돌려주는 아무것도 하지 않는 컨텍스트 관리자"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Trace:
+    """실행 하나의 구간 목록"""
+
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.trace_id = os.urandom(16).hex()
+        self.attributes = dict(attributes or {})
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def wall_time(self):
+        """루트 구간의 길이(초)"""
+        roots = [span for span in self.spans if span.parent_id is None]
+        return max((span.end for span in roots), default=0.0)
+
+    def sorted_spans(self):
+        """부모 바로 아래에 자식이 오도록 (구간, 깊이) 목록을 시작 순서로 반환합니다."""
+        children = {}
+        for span in sorted(self.spans, key=lambda span: span.start):
+            children.setdefault(span.parent_id, []).append(span)
+        ordered = []
+        stack = [(span, 0) for span in reversed(children.get(None, []))]
+        while stack:
+            span, depth = stack.pop()
+            ordered.append((span, depth))
+            stack.extend((child, depth + 1) for child in reversed(children.get(span.span_id, [])))
+        return ordered
+
+    def kind_totals(self):
+        """구간 종류별 (개수, 합계 시간, 가장 긴 구간 이름, 가장 긴 시간) - 병렬 구간은 겹쳐서 합산됩니다."""
+        totals = {}
+        for span in self.spans:
+            count, total, longest_name, longest = totals.get(span.kind, (0, 0.0, None, 0.0))
+            if span.duration > longest:
+                longest_name, longest = span.name, span.duration
+            totals[span.kind] = (count + 1, total + span.duration, longest_name, longest)
+        return totals
+
+    def format_report(self):
+        """구간을 들여쓰기한 트리와 종류별 합계를 문자열로 반환합니다."""
+        lines = []
+        for span, depth in self.sorted_spans():
+            status = f"  오류: {span.error}" if span.error else ""
+            label = "  " * depth + span.name
+            lines.append(f"{label:<40} {span.start:7.2f}s → {span.end:7.2f}s  ({span.duration:6.2f}s, {span.kind}){status}")
+        lines.append("")
+        lines.append(self.format_kind_totals())
+        return "\n".join(lines)
+
+    def format_kind_totals(self):
+        """구간 종류별 개수, 합계 시간, 가장 긴 구간을 합계가 큰 순서로 한 줄씩 반환합니다."""
+        lines = []
+        for kind, (count, total, longest_name, longest) in sorted(self.kind_totals().items(), key=lambda x: -x[1][1]):
+            lines.append(f"{kind:<8} {count:3d}개  합계 {total:6.2f}s  가장 긴 구간 {longest_name} ({longest:.2f}s)")
+        return "\n".join(lines)
+
+    def to_otlp(self):
+        """OpenTelemetry OTLP/JSON 형식(ExportTraceServiceRequest)의 딕셔너리를 반환합니다."""
+        base = int(self.started_at * 1e9)
+        spans = []
+        for span in self.spans:
+            record = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 3 if span.kind in ("fetch", "llm") else 1,  # SPAN_KIND_CLIENT / SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(base + int(span.start * 1e9)),
+                "endTimeUnixNano": str(base + int(span.end * 1e9)),
+                "attributes": _otlp_attributes({"newsletter.kind": span.kind, "thread.name": span.thread,
+                                                **span.attributes}),
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id is not None:
+                record["parentSpanId"] = span.parent_id
+            spans.append(record)
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME, **self.attributes})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]}
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def current_span():
+    """현재 구간을 반환합니다. 추적 중이 아니면 None입니다."""
+    return _current_span.get()
+
+
+@contextmanager
+def use_span(parent):
+    """블록 안에서 parent(또는 None)를 현재 구간으로 사용합니다. (다른 스레드/이벤트 루프로 추적을 넘길 때 사용)"""
+    token = _current_span.set(parent)
+    try:
+        yield parent
+    finally:
+        _current_span.reset(token)
+
+
+def span(name, kind="internal", **attributes):
+    """현재 구간 아래에 구간을 기록하는 컨텍스트 관리자를 반환합니다. 추적 중이 아니면 아무것도 하지 않습니다."""
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP
+    return _ActiveSpan(Span(parent.trace, name, kind, parent.span_id, attributes))
+
+
+def traced(name=None, kind="internal"):
+    """함수 호출 전체를 구간으로 기록하는 데코레이터"""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def start_trace(name, export_path=None, **attributes):
+    """실행 하나를 추적합니다. 블록 전체가 루트 구간이 되며, 끝나면 export_path(기본 TRACE_FILE)에 덧붙입니다."""
+    trace = Trace(name, attributes)
+    root = Span(trace, name, "run", None, {})
+    try:
+        with _ActiveSpan(root):
+            yield trace
+    finally:
+        path = export_path or TRACE_FILE
+        if path:
+            export_trace(trace, path)
+
+
+def export_trace(trace, path):
+    """추적을 OTLP/JSON 한 줄로 path에 덧붙입니다. 저장하지 못하면 경고만 남깁니다."""
+    line = json.dumps(trace.to_otlp(), ensure_ascii=False) + "\n"
+    try:
+        with _export_lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError as e:
+        logger.warning(f"실행 추적을 저장하지 못했습니다: {e}")
+
+
+def format_waterfall_html(trace, max_spans=80, min_duration=0.0):
+    """구간을 실행 시간 축 위의 막대로 그린 폭포 차트 HTML을 반환합니다. (스트림릿 사이드바 등)"""
+    wall = trace.wall_time or 1e-9
+    rows = []
+    shown = [(span, depth) for span, depth in trace.sorted_spans() if span.duration >= min_duration or depth == 0]
+    for span, depth in shown[:max_spans]:
+        left = span.start / wall * 100
+        width = max(span.duration / wall * 100, 0.5)
+        color = "#e53935" if span.error else KIND_COLORS.get(span.kind, KIND_COLORS["internal"])
+        title = html.escape(f"{span.name} ({span.kind}) {span.start:.2f}s → {span.end:.2f}s"
+                            + (f" - {span.error}" if span.error else ""), quote=True)
+        rows.append(
+            f'<div title="{title}" style="display:flex;align-items:center;font-size:11px;line-height:16px;">'
+            f'<div style="width:42%;padding-left:{depth * 8}px;white-space:nowrap;overflow:hidden;'
+            f'text-overflow:ellipsis;">{html.escape(span.name)}</div>'
+            f'<div style="position:relative;flex:1;height:10px;background:#f1f1f1;">'
+            f'<div style="position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:100%;background:{color};"></div>'
+            f'</div><div style="width:48px;text-align:right;">{span.duration:.2f}s</div></div>'
+        )
+    if len(shown) > max_spans:
+        rows.append(f'<div style="font-size:11px;color:#666;">… 구간 {len(shown) - max_spans}개 생략</div>')
+    legend = " ".join(f'<span style="color:{color};">■</span> {kind}' for kind, color in KIND_COLORS.items()
+                      if kind != "internal")
+    return f'<div style="font-size:11px;margin-bottom:4px;">{legend}</div>' + "".join(rows)